@@ -0,0 +1,188 @@
+"""
+구조화 로깅 (JSON 한 줄 로그, 요청 ID, 비밀값 가리기)
+
+요청 스레드는 로그 레코드를 큐에 넣기만 하고(QueueHandler), 별도 스레드(QueueListener)가
+포맷·비밀값 가리기·stdout 쓰기를 처리합니다. stdout 이 느려도 요청이 막히지 않습니다.
+- 요청 ID: 요청마다 set_request_id() 로 지정 (X-Request-ID 헤더가 있으면 그대로 사용)
+- 비밀값: GITHUB_TOKEN 등 환경 변수 값, GitHub 토큰 형식, Authorization 값, URL 의 비밀번호를 *** 로 바꿈
+- extra={...} 로 넘긴 값은 JSON 로그의 필드가 됨
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+REDACTED = '***'
+SECRET_ENV_VARS = ('GITHUB_TOKEN', 'SECRET_KEY', 'ADMIN_PASSWORD')
+SECRET_PATTERNS = (
+    re.compile(r'\b(?:gh[pousr]_[A-Za-z0-9]{20,}|github_pat_[A-Za-z0-9_]{20,})'),
+    re.compile(r'(?i)\b((?:token|bearer|basic)\s+)[A-Za-z0-9._~+/=-]{8,}'),
+    re.compile(r'(://[^:/@\s]+:)[^@\s]+(@)'),
+)
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord 기본 속성 - 이 밖의 속성은 extra 로 넘긴 구조화 필드
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+def new_request_id(incoming=None):
+    """들어온 X-Request-ID 가 안전한 형식이면 그대로, 아니면 새로 발급"""
+    if incoming and REQUEST_ID_PATTERN.match(incoming):
+        return incoming
+    return uuid.uuid4().hex[:16]
+
+
+def set_request_id(request_id):
+    """현재 스레드(컨텍스트)의 요청 ID 지정. reset_request_id() 에 넘길 토큰 반환"""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def redact(text, secrets=()):
+    """비밀값을 *** 로 바꿈"""
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, REDACTED)
+    text = SECRET_PATTERNS[0].sub(REDACTED, text)
+    text = SECRET_PATTERNS[1].sub(r'\1' + REDACTED, text)
+    return SECRET_PATTERNS[2].sub(r'\1' + REDACTED + r'\2', text)
+
+
+def _env_secrets():
+    # 짧은 값(기본 비밀번호 등)은 일반 단어까지 가려 버리므로 8자 이상만
+    return tuple(value for value in (os.environ.get(name) for name in SECRET_ENV_VARS) if value and len(value) >= 8)
+
+
+class RequestIdFilter(logging.Filter):
+    """레코드에 요청 ID 를 붙임 (요청 스레드에서, 큐에 넣기 전에 실행)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON: ts, level, logger, msg, request_id, extra 필드, exc"""
+
+    def __init__(self, secrets=()):
+        super().__init__()
+        self.secrets = tuple(secrets)
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return redact(json.dumps(entry, ensure_ascii=False, default=str), self.secrets)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽기 쉬운 한 줄 (로컬 개발용)"""
+
+    def __init__(self, secrets=()):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+        self.secrets = tuple(secrets)
+
+    def format(self, record):
+        if not hasattr(record, 'request_id') or record.request_id is None:
+            record.request_id = '-'
+        return redact(super().format(record), self.secrets)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """메시지만 미리 합쳐 큐에 넣고(인자가 나중에 바뀌어도 안전), 포맷은 리스너 스레드에서"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if _state['stopped'] == os.getpid():
+            # 종료 중(리스너가 멈춘 뒤)의 로그는 바로 씀
+            _state['target'].handle(record)
+            return
+        _ensure_listener()
+        self.queue.put_nowait(record)
+
+
+_lock = threading.Lock()
+_state = {'pid': None, 'listener': None, 'handler': None, 'target': None, 'stopped': None}
+
+
+def _ensure_listener():
+    """fork 된 자식(gunicorn --preload 등)에서는 리스너 스레드를 새로 시작"""
+    if _state['pid'] == os.getpid():
+        return
+    with _lock:
+        if _state['pid'] == os.getpid() or _state['handler'] is None:
+            return
+        _state['handler'].queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(_state['handler'].queue, _state['target'],
+                                                  respect_handler_level=True)
+        listener.start()
+        _state['listener'] = listener
+        _state['pid'] = os.getpid()
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 쓰고 리스너 종료"""
+    with _lock:
+        listener = _state['listener']
+        if listener is not None and _state['pid'] == os.getpid():
+            listener.stop()
+        _state['listener'] = None
+        _state['stopped'] = os.getpid()
+
+
+def setup_logging(level='INFO', fmt='json', stream=None):
+    """루트 로거에 QueueHandler 를 달고 리스너 스레드 시작 (여러 번 호출해도 한 번만)"""
+    with _lock:
+        if _state['handler'] is not None:
+            return _state['handler']
+        secrets = _env_secrets()
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(TextFormatter(secrets) if fmt == 'text' else JsonFormatter(secrets))
+
+        handler = _QueueHandler(queue.SimpleQueue())
+        handler.addFilter(RequestIdFilter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+        _state['handler'] = handler
+        _state['target'] = target
+    _ensure_listener()
+    atexit.register(stop_logging)
+    return handler
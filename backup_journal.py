@@ -0,0 +1,151 @@
+"""
+변경분 백업 저널 (JSON Lines)
+
+전체 스냅샷(teams.json 등) 이후에 바뀐 행만 테이블별 저널 파일에 한 줄씩 추가합니다.
+저널이 일정 크기/시간을 넘으면 전체 스냅샷으로 압축(compaction)하고 저널을 비웁니다.
+gunicorn 워커들이 같은 저널 파일을 쓰므로 추가/압축/비우기는 파일 잠금(flock) 안에서 하고,
+항목 수와 마지막 압축 시각도 프로세스 메모리가 아니라 파일에서 읽습니다.
+"""
+
+import json
+import os
+import time
+
+from json_storage import JsonStorage
+
+
+def journal_filename(table):
+    """테이블 저널 파일 이름 (로컬 백업 폴더와 GitHub json_backup/ 에서 같은 이름)"""
+    return f'{table}.journal.jsonl'
+
+
+def replay_lines(rows, lines, key='id'):
+    """스냅샷 행 목록에 저널 줄(JSON Lines)을 순서대로 적용한 결과 반환"""
+    merged = {row[key]: row for row in rows}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            # 비정상 종료로 잘린 마지막 줄은 건너뜀
+            continue
+        if entry['op'] == 'delete':
+            merged.pop(entry['id'], None)
+        else:
+            merged[entry['row'][key]] = entry['row']
+    return sorted(merged.values(), key=lambda row: row[key])
+
+
+class ChangeJournal:
+    """테이블별 변경분 저널 관리"""
+
+    def __init__(self, directory, compact_every=500, compact_seconds=3600):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.compact_seconds = compact_seconds
+        self._storage = JsonStorage(directory, lock_name='.journal.lock')
+        self._compacted_marker = os.path.join(directory, '.journal.compacted')
+        with self.locked():
+            if not os.path.exists(self._compacted_marker):
+                self._touch_compacted_marker()
+
+    def path(self, table):
+        """테이블 저널 파일 경로"""
+        return os.path.join(self.directory, journal_filename(table))
+
+    def locked(self):
+        """저널 잠금 (워커 프로세스 간 flock, 같은 스레드에서 중첩 가능)"""
+        return self._storage.locked()
+
+    def exclusive(self, func):
+        """함수 전체를 저널 잠금 안에서 실행하는 데코레이터 (백업 한 번을 다른 워커의 백업과 겹치지 않게)"""
+        return self._storage.exclusive(func)
+
+    def _touch_compacted_marker(self):
+        with open(self._compacted_marker, 'a', encoding='utf-8'):
+            pass
+        os.utime(self._compacted_marker)
+
+    @property
+    def entry_count(self):
+        """모든 워커가 추가한 저널 항목 수"""
+        with self.locked():
+            return self._count_existing_entries()
+
+    @property
+    def last_compacted_at(self):
+        """마지막 압축 시각 (어느 워커가 압축했든)"""
+        try:
+            return os.path.getmtime(self._compacted_marker)
+        except OSError:
+            return time.time()
+
+    def _count_existing_entries(self):
+        count = 0
+        if not os.path.isdir(self.directory):
+            return count
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.journal.jsonl'):
+                with open(os.path.join(self.directory, filename), 'r', encoding='utf-8') as f:
+                    count += sum(1 for line in f if line.strip())
+        return count
+
+    def append(self, table, entries):
+        """변경 항목들을 저널에 추가 ({'op': 'upsert', 'row': {...}} 또는 {'op': 'delete', 'id': n})"""
+        if not entries:
+            return 0
+        with self.locked():
+            with open(self.path(table), 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        return len(entries)
+
+    def needs_compaction(self):
+        """전체 스냅샷으로 압축할 시점인지 확인"""
+        entry_count = self.entry_count
+        if entry_count >= self.compact_every:
+            return True
+        return entry_count > 0 and time.time() - self.last_compacted_at >= self.compact_seconds
+
+    def reset(self):
+        """전체 스냅샷 저장 후 저널 비우기"""
+        with self.locked():
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.journal.jsonl'):
+                    os.remove(os.path.join(self.directory, filename))
+            self._touch_compacted_marker()
+
+    def files(self, tables):
+        """{저널 파일 이름: 내용} - 비어 있거나 없는 저널은 빈 문자열 (GitHub 에 올릴 때 사용)"""
+        contents = {}
+        with self.locked():
+            for table in tables:
+                try:
+                    with open(self.path(table), 'r', encoding='utf-8') as f:
+                        contents[journal_filename(table)] = f.read()
+                except FileNotFoundError:
+                    contents[journal_filename(table)] = ''
+        return contents
+
+    def load(self, tables_contents):
+        """복원한 저널 {테이블: 내용}으로 로컬 저널을 교체 (이후 추가분이 GitHub 저널 뒤에 이어지도록)"""
+        with self.locked():
+            for table, content in tables_contents.items():
+                if content:
+                    with open(self.path(table), 'w', encoding='utf-8') as f:
+                        f.write(content if content.endswith('\n') else content + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                elif os.path.exists(self.path(table)):
+                    os.remove(self.path(table))
+
+    def replay(self, table, rows, key='id'):
+        """스냅샷 행 목록에 로컬 저널 변경분을 순서대로 적용한 결과 반환"""
+        journal_path = self.path(table)
+        if not os.path.exists(journal_path):
+            return replay_lines(rows, [], key)
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            return replay_lines(rows, f, key)
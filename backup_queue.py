@@ -0,0 +1,168 @@
+"""
+백그라운드 백업 워커 (write-behind)
+
+요청 스레드는 백업을 예약만 하고 바로 응답합니다.
+워커 스레드가 디바운스 구간 동안 쌓인 예약을 하나로 합쳐 스냅샷을 한 번만 만듭니다.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+_STOP = object()
+
+
+class BackupWorker:
+    """디바운스 구간마다 백업 함수를 한 번 실행하는 백그라운드 워커"""
+
+    def __init__(self, backup_func, debounce_seconds=2.0, max_pending=100, on_complete=None):
+        self.backup_func = backup_func
+        # 백업 한 번이 끝날 때마다 on_complete(실행 초, 첫 예약부터 시작까지 대기 초, 성공 여부) 호출 (지표 수집용)
+        self.on_complete = on_complete
+        self.debounce_seconds = debounce_seconds
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+        self._pid = None
+        self._pending = 0
+
+        # 상태 정보
+        self.scheduled_count = 0
+        self.coalesced_count = 0
+        self.dropped_count = 0
+        self.run_count = 0
+        self.failure_count = 0
+        self.last_scheduled_at = None
+        self.last_success_at = None
+        self.last_failure_at = None
+        self.last_duration = None
+
+    def start(self):
+        """워커 스레드 시작 (gunicorn fork 이후에도 프로세스별로 한 번만)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # fork 된 자식 프로세스는 부모의 큐/스레드를 물려받지 않도록 새로 만든다
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._idle = threading.Event()
+                self._idle.set()
+                self._pending = 0
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='backup-worker', daemon=True)
+            self._thread.start()
+
+    def schedule(self, reason=''):
+        """백업 예약 (요청 스레드에서 호출, 블로킹 없음)"""
+        self.start()
+        with self._lock:
+            self.scheduled_count += 1
+            self.last_scheduled_at = datetime.now()
+            try:
+                self._queue.put_nowait((reason, time.monotonic()))
+            except queue.Full:
+                # 큐가 가득 찼다면 이미 대기 중인 스냅샷이 이 변경도 포함하게 된다
+                self.dropped_count += 1
+                return
+            self._pending += 1
+            self._idle.clear()
+
+    def flush(self, timeout=None):
+        """대기 중인 백업이 모두 끝날 때까지 기다림"""
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """남은 백업을 처리하고 워커 종료"""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def status(self):
+        """큐 길이와 마지막 성공 시각 등 상태 반환"""
+        def fmt(value):
+            return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+        return {
+            'queue_depth': self._queue.qsize(),
+            'running': not self._idle.is_set(),
+            'debounce_seconds': self.debounce_seconds,
+            'scheduled_count': self.scheduled_count,
+            'coalesced_count': self.coalesced_count,
+            'dropped_count': self.dropped_count,
+            'run_count': self.run_count,
+            'failure_count': self.failure_count,
+            'last_scheduled_at': fmt(self.last_scheduled_at),
+            'last_success_at': fmt(self.last_success_at),
+            'last_failure_at': fmt(self.last_failure_at),
+            'last_duration': self.last_duration,
+        }
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # 디바운스 구간 동안 들어온 예약은 하나로 합친다
+            first_queued_at = item[1]
+            consumed = 1
+            stop_requested = False
+            deadline = time.monotonic() + self.debounce_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_requested = True
+                    break
+                consumed += 1
+                self.coalesced_count += 1
+
+            self._execute(time.monotonic() - first_queued_at)
+
+            with self._lock:
+                self._pending -= consumed
+                if self._pending <= 0:
+                    self._idle.set()
+            if stop_requested:
+                break
+
+    def _execute(self, waited=0.0):
+        started = time.monotonic()
+        try:
+            success = self.backup_func()
+        except Exception as e:
+            logger.exception(f"❌ 백그라운드 백업 오류: {e}")
+            success = False
+        self.last_duration = round(time.monotonic() - started, 3)
+        self.run_count += 1
+        if success:
+            self.last_success_at = datetime.now()
+        else:
+            self.failure_count += 1
+            self.last_failure_at = datetime.now()
+        if self.on_complete is not None:
+            try:
+                self.on_complete(time.monotonic() - started, waited, bool(success))
+            except Exception:
+                pass
+
+
+def register_shutdown(worker, timeout=5.0):
+    """프로세스 종료 시 남은 백업을 마저 처리"""
+    atexit.register(worker.stop, timeout)
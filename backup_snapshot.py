@@ -0,0 +1,82 @@
+"""
+압축 바이너리 스냅샷 (json_backup/snapshot.bin)
+
+들여쓰기된 JSON 백업과 같은 내용을 훨씬 작게 저장하고, 복원 시 한 번에 일괄 삽입할 수 있는 형태로 읽습니다.
+
+형식: MAGIC + zlib 스트림 [ (4바이트 길이 + 레코드 JSON) ... ]
+- 레코드 하나 = {"table": 이름, "columns": [...], "rows": [[...], ...]} (최대 chunk_rows 행)
+- 열 이름은 레코드마다 한 번만, 행은 값 목록이라 키 반복이 없음
+- 레코드 단위로 읽으므로 전체를 한꺼번에 파싱하지 않음
+"""
+
+import io
+import json
+import struct
+import zlib
+
+MAGIC = b'MSESNAP1'
+_LENGTH = struct.Struct('>I')
+
+
+class SnapshotError(Exception):
+    """스냅샷 형식이 올바르지 않음"""
+
+
+def write_snapshot(fileobj, tables, chunk_rows=5000, level=6):
+    """tables: (테이블 이름, 열 목록, 행 iterable) 목록을 스냅샷으로 기록. 테이블별 행 수 반환"""
+    compressor = zlib.compressobj(level)
+    fileobj.write(MAGIC)
+    counts = {}
+
+    def emit(record):
+        data = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        fileobj.write(compressor.compress(_LENGTH.pack(len(data)) + data))
+
+    for name, columns, rows in tables:
+        counts[name] = 0
+        chunk = []
+        for row in rows:
+            chunk.append(list(row))
+            if len(chunk) >= chunk_rows:
+                emit({'table': name, 'columns': list(columns), 'rows': chunk})
+                counts[name] += len(chunk)
+                chunk = []
+        # 빈 테이블도 레코드를 남겨 "0행"과 "없음"을 구분
+        if chunk or counts[name] == 0:
+            emit({'table': name, 'columns': list(columns), 'rows': chunk})
+            counts[name] += len(chunk)
+
+    fileobj.write(compressor.flush())
+    return counts
+
+
+def build_snapshot(tables, chunk_rows=5000, level=6):
+    """스냅샷을 bytes 로 생성"""
+    buffer = io.BytesIO()
+    write_snapshot(buffer, tables, chunk_rows=chunk_rows, level=level)
+    return buffer.getvalue()
+
+
+def iter_snapshot(content):
+    """스냅샷 bytes 에서 (테이블 이름, 열 목록, 행 목록) 레코드를 순서대로 반환"""
+    if not content.startswith(MAGIC):
+        raise SnapshotError('스냅샷 헤더가 올바르지 않습니다')
+    decompressor = zlib.decompressobj()
+    buffer = b''
+    view = memoryview(content)[len(MAGIC):]
+    step = 1 << 20
+    for start in range(0, len(view), step):
+        buffer += decompressor.decompress(view[start:start + step])
+        pos = 0
+        while len(buffer) - pos >= _LENGTH.size:
+            (length,) = _LENGTH.unpack_from(buffer, pos)
+            end = pos + _LENGTH.size + length
+            if len(buffer) < end:
+                break
+            record = json.loads(buffer[pos + _LENGTH.size:end])
+            pos = end
+            yield record['table'], record['columns'], record['rows']
+        buffer = buffer[pos:]
+    buffer += decompressor.flush()
+    if buffer or not decompressor.eof:
+        raise SnapshotError('스냅샷이 중간에 잘렸습니다')
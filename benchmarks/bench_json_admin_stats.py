@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+JSON 백엔드 관리자 통계 벤치마크
+
+예전 admin()의 팀 × 구매내역 이중 루프와 json_stats 의 한 번 합산(순수 파이썬 / NumPy)을 비교합니다.
+세 방식의 used/remaining/remaining_rate 결과가 같은지도 확인합니다.
+
+사용법:
+    python benchmarks/bench_json_admin_stats.py
+    python benchmarks/bench_json_admin_stats.py --rows 1000 10000 100000 --teams 11
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import json_stats  # noqa: E402
+
+
+def legacy_team_stats(teams, purchases, multi_purchases):
+    """예전 admin()의 이중 루프 (비교 기준)"""
+    for team in teams:
+        team['used_department'] = 0
+        team['used_student'] = 0
+        for purchase in purchases:
+            if purchase['team_id'] == team['id'] and purchase['is_approved']:
+                if purchase['budget_type'] == 'department':
+                    team['used_department'] += purchase['total_amount']
+                else:
+                    team['used_student'] += purchase['total_amount']
+        for multi_purchase in multi_purchases:
+            if multi_purchase['team_id'] == team['id'] and multi_purchase['is_approved']:
+                if multi_purchase['budget_type'] == 'department':
+                    team['used_department'] += multi_purchase['total_amount']
+                else:
+                    team['used_student'] += multi_purchase['total_amount']
+        team['remaining_department'] = team['department_budget'] - team['used_department']
+        team['remaining_student'] = team['student_budget'] - team['used_student']
+        team['total_budget'] = team['department_budget'] + team['student_budget']
+        team['total_used'] = team['used_department'] + team['used_student']
+        team['total_remaining'] = team['total_budget'] - team['total_used']
+        team['remaining_rate'] = (team['total_remaining'] / team['total_budget'] * 100) if team['total_budget'] > 0 else 0
+    return teams
+
+
+def make_data(rows, team_count, seed=0):
+    rng = random.Random(seed)
+    teams = [{'id': i + 1, 'name': f'화요일 {i + 1}조', 'department_budget': 600000, 'student_budget': 500000}
+             for i in range(team_count)]
+
+    def row(i):
+        return {'id': i + 1, 'team_id': rng.randint(1, team_count),
+                'budget_type': rng.choice(('department', 'student')),
+                'total_amount': rng.randint(1, 500) * 100,
+                'is_approved': rng.random() < 0.7}
+
+    purchases = [row(i) for i in range(rows)]
+    multi_purchases = [row(i) for i in range(rows // 10)]
+    return teams, purchases, multi_purchases
+
+
+def typed(value):
+    """값과 타입을 함께 비교하기 위한 변환 (120000 과 120000.0 을 다르게 봄)"""
+    if isinstance(value, dict):
+        return {key: typed(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [typed(item) for item in value]
+    return type(value).__name__, value
+
+
+def measure(func, teams, purchases, multi_purchases, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        fresh = copy.deepcopy(teams)
+        started = time.perf_counter()
+        result = func(fresh, purchases, multi_purchases)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 관리자 통계 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--teams', type=int, default=11)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    methods = [
+        ('이중 루프', legacy_team_stats),
+        ('한 번 합산', lambda t, p, m: json_stats.apply_team_usage(t, p, m, use_numpy=False)),
+    ]
+    if json_stats.np is not None:
+        methods.append(('NumPy', lambda t, p, m: json_stats.apply_team_usage(t, p, m, use_numpy=True)))
+    else:
+        print("ℹ️ NumPy 가 없어 NumPy 경로는 건너뜁니다")
+
+    print(f"{'구매내역 수':>10} " + ' '.join(f'{name:>12}' for name, _ in methods))
+    for rows in args.rows:
+        teams, purchases, multi_purchases = make_data(rows, args.teams)
+        timings = []
+        baseline = None
+        for name, func in methods:
+            elapsed, result = measure(func, teams, purchases, multi_purchases, args.repeat)
+            timings.append(elapsed)
+            if baseline is None:
+                baseline = typed(result)
+            elif typed(result) != baseline:
+                print(f"❌ {name} 결과(값 또는 int/float 타입)가 이중 루프와 다름 (rows={rows})")
+                return 1
+        print(f"{rows:>10} " + ' '.join(f'{elapsed * 1000:>10.1f}ms' for elapsed in timings))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+백업 복원 벤치마크 (JSON vs 압축 스냅샷)
+
+구매내역 수를 늘려가며 백업 파일 크기와 restore_from_json()의 복원 시간을 비교합니다.
+- JSON: 들여쓰기된 JSON 4개를 파싱·검증한 뒤 일괄 삽입
+- 스냅샷: snapshot.bin 을 테이블별 executemany 로 일괄 삽입
+둘 다 다중 구매/기타 요청까지 전체 테이블을 복원합니다. GitHub 다운로드는 빼고 복원 자체만 측정합니다.
+
+사용법:
+    python benchmarks/bench_snapshot_restore.py
+    python benchmarks/bench_snapshot_restore.py --rows 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 DB를 건드리지 않도록 임시 SQLite 사용 (simple_flask import 전에 설정)
+_db_dir = tempfile.mkdtemp(prefix='mse_bench_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('BACKUP_ASYNC', '0')
+
+import simple_flask as sf  # noqa: E402
+
+
+def seed(rows, teams=11):
+    """조 teams개, 구매내역 rows개, 다중 구매 rows/10개(품목 3개씩), 기타 요청 rows/100개 일괄 삽입"""
+    sf.db.drop_all()
+    sf.db.create_all()
+    sf.db.session.execute(sf.db.insert(sf.Team), [
+        {'id': i + 1, 'name': f'화요일 {i + 1}조', 'leader_name': f'조장{i + 1}',
+         'department_budget': 600000, 'student_budget': 500000,
+         'original_department_budget': 600000, 'original_student_budget': 500000}
+        for i in range(teams)
+    ])
+    now = datetime.utcnow()
+    sf.db.session.execute(sf.db.insert(sf.Purchase), [
+        {'team_id': i % teams + 1, 'item_name': f'품목 {i}', 'quantity': 1 + i % 5,
+         'estimated_cost': 1000 + i % 9000, 'link': '', 'store': '쿠팡',
+         'is_approved': i % 2 == 0, 'budget_type': 'department' if i % 2 == 0 else 'student',
+         'created_at': now}
+        for i in range(rows)
+    ])
+    multi_count = max(rows // 10, 1)
+    sf.db.session.execute(sf.db.insert(sf.MultiPurchase), [
+        {'id': i + 1, 'team_id': i % teams + 1, 'store': '다나와', 'total_cost': 30000,
+         'is_approved': i % 3 == 0, 'budget_type': 'student', 'created_at': now}
+        for i in range(multi_count)
+    ])
+    sf.db.session.execute(sf.db.insert(sf.MultiPurchaseItem), [
+        {'multi_purchase_id': i // 3 + 1, 'item_name': f'부품 {i}', 'quantity': 1, 'unit_price': 10000}
+        for i in range(multi_count * 3)
+    ])
+    sf.db.session.execute(sf.db.insert(sf.OtherRequest), [
+        {'team_id': i % teams + 1, 'content': f'요청 {i}', 'created_at': now}
+        for i in range(max(rows // 100, 1))
+    ])
+    sf.db.session.commit()
+
+
+def time_restore(contents, use_snapshot):
+    """빈 DB에서 restore_from_json() 실행 시간"""
+    sf.db.drop_all()
+    sf.db.create_all()
+    sf.BACKUP_SNAPSHOT = use_snapshot
+    sf.download_from_github = lambda filename, binary=False, missing_ok=False: contents.get(filename, '' if missing_ok else None)
+    sf.list_github_backup_files = lambda: {filename: len(content) for filename, content in contents.items()}
+    started = time.perf_counter()
+    ok = sf.restore_from_json()
+    elapsed = time.perf_counter() - started
+    return ok, elapsed, sf.Purchase.query.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON / 압축 스냅샷 복원 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    results = []
+    with sf.app.app_context():
+        for rows in args.rows:
+            seed(rows)
+            sf.BACKUP_SNAPSHOT = True
+            started = time.perf_counter()
+            contents = sf.build_backup_contents()
+            build_seconds = time.perf_counter() - started
+            json_size = sum(len(v.encode('utf-8')) for k, v in contents.items() if k.endswith('.json'))
+            snapshot_size = len(contents[sf.SNAPSHOT_FILENAME])
+
+            json_ok, json_seconds, json_rows = time_restore(contents, use_snapshot=False)
+            snap_ok, snap_seconds, snap_rows = time_restore(contents, use_snapshot=True)
+            results.append((rows, json_size, snapshot_size, build_seconds,
+                            json_seconds if json_ok else None, json_rows,
+                            snap_seconds if snap_ok else None, snap_rows))
+
+    print()
+    print(f"{'rows':>8} {'json(MB)':>9} {'snap(MB)':>9} {'backup(s)':>10} {'json 복원(s)':>12} {'snap 복원(s)':>12}")
+    for rows, json_size, snapshot_size, build_seconds, json_seconds, json_rows, snap_seconds, snap_rows in results:
+        def fmt(seconds, restored):
+            return f'{seconds:.2f}' if seconds is not None and restored == rows else '실패'
+        print(f"{rows:>8} {json_size / 1024 / 1024:>9.2f} {snapshot_size / 1024 / 1024:>9.2f} {build_seconds:>10.2f} "
+              f"{fmt(json_seconds, json_rows):>12} {fmt(snap_seconds, snap_rows):>12}")
+
+
+if __name__ == '__main__':
+    main()
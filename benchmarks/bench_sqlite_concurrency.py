@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+SQLite 동시 쓰기 벤치마크 - 성능 모드(sqlite_tuning.py) 끄기 / 켜기 비교
+
+gunicorn 워커처럼 프로세스 여러 개가 같은 SQLite 파일을 씁니다.
+쓰기 프로세스는 쉬지 않고 구매내역을 등록(POST /upload)하고, 읽기 프로세스는 잔액 조회(POST /check_balance)를 반복합니다.
+- before: SQLITE_TUNING=0, SQLITE_WRITE_RETRIES=0 (롤백 저널, 재시도 없음)
+- after : 기본값 (WAL, synchronous=NORMAL, busy_timeout, mmap, cache + 잠금 재시도)
+각각 새로 만든 DB 에서 --duration 초 동안 실행해 처리량, 실패(5xx) 수, 지연 시간 p50/p95/최대, 재시도 수를 출력합니다.
+after 에서 실패가 있으면 종료 코드 1.
+
+사용법:
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --writers 8 --readers 4 --duration 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+MODES = {
+    'before': {'SQLITE_TUNING': '0', 'SQLITE_WRITE_RETRIES': '0'},
+    'after': {},
+}
+
+
+def configure(work_dir, mode):
+    """simple_flask import 전에 호출 - 임시 DB/백업 폴더와 모드별 환경 변수"""
+    os.environ.update({'DATABASE_URL': f"sqlite:///{os.path.join(work_dir, 'bench.db')}",
+                       'JSON_BACKUP_DIR': os.path.join(work_dir, 'json_backup'), 'LOG_LEVEL': 'CRITICAL'})
+    os.environ.update(MODES[mode])
+    os.chdir(work_dir)  # 업로드 폴더도 임시 디렉토리 안에
+
+
+def seed(work_dir, mode, teams, purchases):
+    """새 DB 에 데이터를 넣고 마이그레이션까지 적용 (워커들이 첫 요청에서 동시에 마이그레이션하지 않도록)"""
+    configure(work_dir, mode)
+    import seed_data
+    seed_data.seed_sql(os.environ['DATABASE_URL'], teams, purchases, purchases // 10, 0)
+    import simple_flask as sf
+    with sf.app.app_context():
+        sf.migrate_database()
+        journal_mode = sf.db.session.execute(sf.db.text('PRAGMA journal_mode')).scalar()
+    return journal_mode
+
+
+def worker(work_dir, mode, role, index, teams, start_event, deadline_seconds, results):
+    configure(work_dir, mode)
+    import simple_flask as sf
+
+    rng = random.Random(index)
+    team_list = [{'name': f"{'월요일' if i % 2 == 0 else '화요일'} {i // 2 + 1}조", 'leader_name': f'조장{i + 1}'}
+                 for i in range(teams)]
+    client = sf.app.test_client()
+
+    def one_request():
+        team = rng.choice(team_list)
+        if role == 'writer':
+            return client.post('/upload', data={
+                'purchase_submit': '1', 'team_name': team['name'], 'leader_name': team['leader_name'],
+                'item_name': f'동시 쓰기 품목 {rng.randint(1, 10 ** 6)}', 'quantity': 1,
+                'estimated_cost': rng.randint(1, 5) * 100, 'store': '쿠팡', 'link': ''})
+        return client.post('/check_balance', data=team)
+
+    one_request()  # 첫 요청 준비(런타임 테이블 확인 등)는 측정에서 제외
+    start_event.wait()
+    deadline = time.monotonic() + deadline_seconds
+    latencies, failures = [], 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            failed = one_request().status_code >= 500
+        except Exception:
+            failed = True
+        latencies.append((time.perf_counter() - started) * 1000)
+        failures += failed
+    metrics_text = client.get('/metrics').get_data(as_text=True)
+    retries = sum(int(float(value)) for value in re.findall(r'^mse_db_lock_retries_total\{[^}]*\} (\S+)$',
+                                                              metrics_text, re.M))
+    results.put((role, latencies, failures, retries))
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_mode(mode, args):
+    context = multiprocessing.get_context('spawn')  # 모드별 환경 변수로 simple_flask 를 새로 import
+    work_dir = tempfile.mkdtemp(prefix=f'mse_sqlite_{mode}_')
+    try:
+        with context.Pool(1) as pool:
+            journal_mode = pool.apply(seed, (work_dir, mode, args.teams, args.purchases))
+        start_event, results = context.Event(), context.Queue()
+        roles = ['writer'] * args.writers + ['reader'] * args.readers
+        processes = [context.Process(target=worker, args=(work_dir, mode, role, index, args.teams, start_event,
+                                                          args.duration, results))
+                     for index, role in enumerate(roles)]
+        for process in processes:
+            process.start()
+        time.sleep(args.warmup)  # import + 첫 요청이 끝날 때까지
+        start_event.set()
+        collected = [results.get(timeout=args.duration + 120) for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {'journal_mode': journal_mode}
+    for role in ('writer', 'reader'):
+        latencies = sorted(value for r, values, _, _ in collected if r == role for value in values)
+        summary[role] = {
+            'requests': len(latencies),
+            'rps': len(latencies) / args.duration,
+            'failures': sum(failures for r, _, failures, _ in collected if r == role),
+            'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+            'max': latencies[-1] if latencies else 0,
+        }
+    summary['retries'] = sum(retries for _, _, _, retries in collected)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite 동시 쓰기 벤치마크 (성능 모드 끄기/켜기)')
+    parser.add_argument('--writers', type=int, default=6, help='쓰기 프로세스 수')
+    parser.add_argument('--readers', type=int, default=4, help='읽기 프로세스 수')
+    parser.add_argument('--duration', type=float, default=10, help='모드별 측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=5, help='프로세스 시작 후 측정까지 기다리는 시간 (초)')
+    parser.add_argument('--teams', type=int, default=11)
+    parser.add_argument('--purchases', type=int, default=2000)
+    args = parser.parse_args()
+
+    summaries = {}
+    for mode in MODES:
+        print(f"⏱️ {mode}: 쓰기 {args.writers} + 읽기 {args.readers} 프로세스, {args.duration:g}초 ...", flush=True)
+        summaries[mode] = run_mode(mode, args)
+
+    print(f"\n{'모드':<7} {'저널':<7} {'역할':<7} {'요청/초':>8} {'실패':>5} {'p50(ms)':>8} {'p95(ms)':>8} {'최대(ms)':>9} {'재시도':>6}")
+    for mode, summary in summaries.items():
+        for role in ('writer', 'reader'):
+            row = summary[role]
+            print(f"{mode:<7} {summary['journal_mode']:<7} {role:<7} {row['rps']:>8.1f} {row['failures']:>5} "
+                  f"{row['p50']:>8.1f} {row['p95']:>8.1f} {row['max']:>9.1f} "
+                  f"{summary['retries'] if role == 'writer' else '':>6}")
+
+    after = summaries['after']
+    if after['writer']['failures'] or after['reader']['failures']:
+        print("\n❌ 성능 모드에서도 실패한 요청이 있습니다")
+        return 1
+    print("\n✅ 성능 모드에서 실패한 요청 없음")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+시작 시간 벤치마크 (STARTUP_MODE=blocking vs lazy)
+
+GitHub 다운로드를 --github-delay 초 걸리는 가짜 함수로 바꾸고, 빈 DB에서 RESTORE_ON_BOOT 복원을 실행합니다.
+- blocking: 복원이 끝나야 첫 응답 가능 → 첫 응답까지 시간 = 복원 시간
+- lazy: 바로 첫 응답(/health 503 warming), 테이블 생성 후 읽기 가능, 복원이 끝나면 /health 200
+lazy 모드에서 복원 중 쓰기 요청이 503으로 막히는지도 확인합니다.
+
+사용법:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --rows 10000 --github-delay 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 DB/백업 폴더를 건드리지 않도록 임시 경로 사용 (simple_flask import 전에 설정)
+_tmp_dir = tempfile.mkdtemp(prefix='mse_bench_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+os.environ['JSON_BACKUP_DIR'] = os.path.join(_tmp_dir, 'json_backup')
+os.environ.pop('GITHUB_TOKEN', None)
+
+import simple_flask as sf  # noqa: E402
+from startup_task import StartupTask  # noqa: E402
+
+
+def seed(rows, teams=11):
+    """조 teams개, 구매내역 rows개를 넣고 백업 파일 내용을 만든 뒤 DB를 비움"""
+    sf.db.drop_all()
+    sf.db.create_all()
+    sf.db.session.execute(sf.db.insert(sf.Team), [
+        {'id': i + 1, 'name': f'화요일 {i + 1}조', 'leader_name': f'조장{i + 1}',
+         'department_budget': 600000, 'student_budget': 500000,
+         'original_department_budget': 600000, 'original_student_budget': 500000}
+        for i in range(teams)
+    ])
+    now = datetime.utcnow()
+    sf.db.session.execute(sf.db.insert(sf.Purchase), [
+        {'team_id': i % teams + 1, 'item_name': f'품목 {i}', 'quantity': 1, 'estimated_cost': 1000,
+         'link': '', 'store': '쿠팡', 'is_approved': i % 2 == 0,
+         'budget_type': 'department' if i % 2 == 0 else 'student', 'created_at': now}
+        for i in range(rows)
+    ])
+    sf.db.session.commit()
+    contents = sf.build_backup_contents()
+    sf.db.session.remove()
+    sf.db.drop_all()
+    return contents
+
+
+def fresh_start(mode, contents, delay):
+    """빈 DB + 새 부팅 작업으로 초기화"""
+    with sf.app.app_context():
+        sf.db.session.remove()
+        sf.db.drop_all()
+
+    def slow_download(filename, binary=False, missing_ok=False):
+        time.sleep(delay)
+        return contents.get(filename, '' if missing_ok else None)
+
+    sf.download_from_github = slow_download
+    sf.list_github_backup_files = lambda: {filename: len(content) for filename, content in contents.items()}
+    sf.STARTUP_MODE = mode
+    sf.RESTORE_ON_BOOT = True
+    sf.startup_task = StartupTask(sf.run_startup)
+    return sf.app.test_client()
+
+
+def measure_blocking(contents, delay):
+    client = fresh_start('blocking', contents, delay)
+    started = time.perf_counter()
+    sf.startup_task.run()
+    client.get('/health')
+    first_response = time.perf_counter() - started
+    return {'first_response': first_response, 'readable': first_response, 'ready': first_response,
+            'health_warming': None, 'write_blocked': None}
+
+
+def measure_lazy(contents, delay):
+    client = fresh_start('lazy', contents, delay)
+    started = time.perf_counter()
+    sf.startup_task.start()
+    health_warming = client.get('/health').status_code
+    first_response = time.perf_counter() - started
+
+    while client.get('/').status_code != 200:
+        time.sleep(0.005)
+    readable = time.perf_counter() - started
+    write_status = client.post('/upload', data={}).status_code if not sf.startup_task.done else None
+
+    while client.get('/health').status_code != 200:
+        time.sleep(0.01)
+    ready = time.perf_counter() - started
+    return {'first_response': first_response, 'readable': readable, 'ready': ready,
+            'health_warming': health_warming, 'write_blocked': write_status == 503 if write_status else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='blocking / lazy 시작 시간 벤치마크')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--github-delay', type=float, default=1.0, help='가짜 GitHub 파일 하나 받는 데 걸리는 초')
+    args = parser.parse_args()
+
+    with sf.app.app_context():
+        contents = seed(args.rows)
+    sf.BACKUP_SNAPSHOT = False
+
+    results = {'blocking': measure_blocking(contents, args.github_delay),
+               'lazy': measure_lazy(contents, args.github_delay)}
+    sf.backup_worker.flush(30)
+
+    with sf.app.app_context():
+        restored = sf.Purchase.query.count()
+
+    print()
+    print(f"{'mode':>9} {'첫 응답(s)':>11} {'읽기 가능(s)':>12} {'준비 완료(s)':>12} {'복원 중 쓰기':>11}")
+    for mode, r in results.items():
+        blocked = '-' if r['write_blocked'] is None else ('503' if r['write_blocked'] else '통과')
+        print(f"{mode:>9} {r['first_response']:>11.3f} {r['readable']:>12.3f} {r['ready']:>12.3f} {blocked:>11}")
+    print(f"lazy 복원 중 /health: {results['lazy']['health_warming']}, 복원된 구매내역: {restored}/{args.rows}")
+    return 0 if restored == args.rows else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+xlsx 내보내기 메모리 벤치마크
+
+구매내역 수를 늘려가며 build_xlsx_export()의 최대 메모리 사용량과 시간을 측정합니다.
+write-only 워크북이므로 행 수가 늘어도 최대 메모리는 거의 일정해야 합니다.
+
+사용법:
+    python benchmarks/bench_xlsx_export.py
+    python benchmarks/bench_xlsx_export.py --rows 1000 10000 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 DB를 건드리지 않도록 임시 SQLite 사용 (simple_flask import 전에 설정)
+_db_dir = tempfile.mkdtemp(prefix='mse_bench_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('BACKUP_ASYNC', '0')
+
+import simple_flask as sf  # noqa: E402
+
+
+def seed(rows, teams=11):
+    """조 teams개와 구매내역 rows개를 일괄 삽입"""
+    sf.db.drop_all()
+    sf.db.create_all()
+    sf.db.session.execute(sf.db.insert(sf.Team), [
+        {'id': i + 1, 'name': f'화요일 {i + 1}조', 'leader_name': f'조장{i + 1}',
+         'department_budget': 600000, 'student_budget': 500000,
+         'original_department_budget': 600000, 'original_student_budget': 500000}
+        for i in range(teams)
+    ])
+    now = datetime.utcnow()
+    batch = []
+    for i in range(rows):
+        batch.append({'team_id': i % teams + 1, 'item_name': f'품목 {i}', 'quantity': 1 + i % 5,
+                      'estimated_cost': 1000 + i % 9000, 'link': '', 'store': '쿠팡',
+                      'is_approved': i % 2 == 0, 'budget_type': 'department' if i % 2 == 0 else None,
+                      'created_at': now})
+        if len(batch) == 10000:
+            sf.db.session.execute(sf.db.insert(sf.Purchase), batch)
+            batch = []
+    if batch:
+        sf.db.session.execute(sf.db.insert(sf.Purchase), batch)
+    sf.db.session.commit()
+    sf.reconcile_ledger()
+
+
+def measure(rows):
+    seed(rows)
+    teams = sf.get_teams_ordered()
+    sf.db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    output = sf.build_xlsx_export(teams)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = output.seek(0, os.SEEK_END)
+    output.close()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='xlsx 내보내기 메모리 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'time(s)':>9} {'peak(MB)':>9} {'xlsx(MB)':>9}")
+    with sf.app.app_context():
+        for rows in args.rows:
+            elapsed, peak, size = measure(rows)
+            print(f"{rows:>8} {elapsed:>9.2f} {peak / 1024 / 1024:>9.2f} {size / 1024 / 1024:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
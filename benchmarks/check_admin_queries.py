@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+/admin SQL 문 수 회귀 검사 - 데이터가 늘어도 같은 수의 SQL 을 실행하는지 (N+1 방지)
+
+임시 SQLite 에 작은 데이터(--small)와 큰 데이터(--large)를 차례로 넣고, 관리자로 로그인해
+/admin 을 한 번 요청해 준비(마이그레이션, 캐시)를 끝낸 뒤 다음 요청의 SQL 문 수를 before_cursor_execute 로 셉니다.
+두 크기의 문 수가 다르면 종료 코드 1 (조나 구매내역마다 쿼리가 하나씩 늘어난 것).
+
+사용법:
+    python benchmarks/check_admin_queries.py
+    python benchmarks/check_admin_queries.py --small 2 4 --large 11 3000 --verbose
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='/admin SQL 문 수 회귀 검사')
+    parser.add_argument('--small', type=int, nargs=2, default=(2, 4), metavar=('TEAMS', 'PURCHASES'))
+    parser.add_argument('--large', type=int, nargs=2, default=(11, 2000), metavar=('TEAMS', 'PURCHASES'))
+    parser.add_argument('--verbose', action='store_true', help='실행한 SQL 문 출력')
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# 실제 DB/백업 폴더를 건드리지 않도록 임시 경로 사용 (simple_flask import 전에 설정)
+_tmp_dir = tempfile.mkdtemp(prefix='mse_admin_queries_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'admin.db')}"
+os.environ['JSON_BACKUP_DIR'] = os.path.join(_tmp_dir, 'json_backup')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+import seed_data  # noqa: E402
+
+
+def admin_statements(teams, purchases):
+    """데이터를 새로 넣고 /admin 요청 하나가 실행한 SQL 문 목록"""
+    seed_data.seed_sql(os.environ['DATABASE_URL'], teams, purchases, max(purchases // 10, 1), max(purchases // 100, 1))
+    import simple_flask as sf
+
+    client = sf.app.test_client()
+    client.post('/admin', data={'username': sf.ADMIN_USERNAME, 'password': sf.ADMIN_PASSWORD})
+    if client.get('/admin').status_code != 200:  # 준비 요청 (마이그레이션, 캐시) - 세지 않음
+        raise SystemExit('❌ /admin 이 200 을 반환하지 않습니다')
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        response = client.get('/admin')
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+    if response.status_code != 200:
+        raise SystemExit(f'❌ /admin 이 {response.status_code} 를 반환했습니다')
+    return statements
+
+
+def main():
+    results = {}
+    for label, (teams, purchases) in (('small', args.small), ('large', args.large)):
+        statements = admin_statements(teams, purchases)
+        results[label] = statements
+        print(f"{label:<6} 조 {teams:>3}개, 구매내역 {purchases:>6}개 → SQL {len(statements)}개")
+        if args.verbose:
+            for statement in statements:
+                print('    ' + ' '.join(statement.split())[:160])
+
+    if len(results['small']) != len(results['large']):
+        print("\n❌ 데이터 크기에 따라 /admin 의 SQL 문 수가 달라집니다 (조/구매내역별 쿼리 의심, --verbose 로 확인)")
+        return 1
+    print("\n✅ /admin 의 SQL 문 수가 데이터 크기와 무관합니다")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+DB 연결 풀 점검 - 유휴 연결을 끊는 DB(Render 무료 PostgreSQL) 흉내
+
+PostgreSQL 앞에 로컬 TCP 프록시(IdleDropProxy)를 두고, --idle-drop 초 동안 오가는 데이터가 없는 연결을 끊습니다.
+요청 사이에 그보다 오래 쉬면서 /healthz 를 --rounds 번 호출해 DB_POOL_PRE_PING=1 / 0 의
+실패 수, 지연 시간, 새로 연 연결/버린 연결 수를 비교합니다.
+pre_ping=1 이면 실패 0 (끊긴 연결은 빌려줄 때 바꿈), pre_ping=0 이면 끊긴 연결을 처음 쓰는 요청이 실패합니다.
+재활용 주기가 결과를 가리지 않도록 검사 중에는 DB_POOL_RECYCLE=-1 입니다.
+
+사용법:
+    python benchmarks/check_db_pool.py --database-url postgresql://user:pw@localhost:5432/mse_test
+    python benchmarks/check_db_pool.py --database-url ... --idle-drop 1 --idle 2 --rounds 5
+"""
+
+import argparse
+import json
+import os
+import re
+import select
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+class IdleDropProxy:
+    """TCP 프록시 - 유휴 시간이 idle_drop 초를 넘은 연결은 양쪽 모두 닫음"""
+
+    def __init__(self, upstream_host, upstream_port, idle_drop):
+        self.upstream = (upstream_host, upstream_port)
+        self.idle_drop = idle_drop
+        self.dropped = 0
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self._closed = False
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, name='idle-drop-proxy', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._closed = True
+        self.server.close()
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self.upstream)
+            threading.Thread(target=self._pump, args=(client, upstream), daemon=True).start()
+
+    def _pump(self, client, upstream):
+        peers = {client: upstream, upstream: client}
+        last_activity = time.monotonic()
+        try:
+            while True:
+                readable, _, _ = select.select(list(peers), [], [], 0.2)
+                if not readable:
+                    if time.monotonic() - last_activity > self.idle_drop:
+                        self.dropped += 1
+                        return
+                    continue
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    peers[sock].sendall(data)
+                last_activity = time.monotonic()
+        except OSError:
+            return
+        finally:
+            client.close()
+            upstream.close()
+
+
+def run_child(args):
+    """자식 프로세스: 환경 변수로 설정된 앱에 /healthz 를 반복 호출 → 결과 JSON 한 줄"""
+    import simple_flask as sf
+
+    client = sf.app.test_client()
+    failures, latencies = 0, []
+    for round_index in range(args.rounds):
+        if round_index:
+            time.sleep(args.idle)
+        started = time.perf_counter()
+        response = client.get('/healthz')
+        latencies.append((time.perf_counter() - started) * 1000)
+        failures += response.status_code != 200
+    metrics_text = client.get('/metrics').get_data(as_text=True)
+
+    def counter(name):
+        match = re.search(rf'^{name} (\S+)$', metrics_text, re.M)
+        return int(float(match.group(1))) if match else 0
+
+    print(json.dumps({'failures': failures, 'latencies_ms': [round(value, 1) for value in latencies],
+                      'opened': counter('mse_db_connections_opened_total'),
+                      'invalidated': counter('mse_db_connections_invalidated_total')}))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DB 연결 풀 점검 (유휴 연결 끊김 흉내)')
+    parser.add_argument('--database-url', required=True, help='PostgreSQL 주소 (테이블은 만들지 않고 SELECT 1 만 실행)')
+    parser.add_argument('--idle-drop', type=float, default=2, help='프록시가 유휴 연결을 끊는 시간 (초)')
+    parser.add_argument('--idle', type=float, default=3, help='요청 사이에 쉬는 시간 (초, --idle-drop 보다 길게)')
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return run_child(args)
+
+    parts = urlsplit(args.database_url)
+    if not parts.scheme.startswith('postgres'):
+        parser.error('--database-url 은 PostgreSQL 이어야 합니다')
+    proxy = IdleDropProxy(parts.hostname or 'localhost', parts.port or 5432, args.idle_drop).start()
+    userinfo = parts.netloc.rsplit('@', 1)[0] + '@' if '@' in parts.netloc else ''
+    proxied_url = urlunsplit(parts._replace(netloc=f'{userinfo}127.0.0.1:{proxy.port}'))
+    work_dir = tempfile.mkdtemp(prefix='mse_pool_')
+
+    print(f"🔌 유휴 {args.idle_drop:g}초 뒤 끊는 프록시 127.0.0.1:{proxy.port} → {parts.hostname}:{parts.port or 5432}")
+    results = {}
+    try:
+        for pre_ping in ('1', '0'):
+            env = dict(os.environ, DATABASE_URL=proxied_url, DB_POOL_PRE_PING=pre_ping, DB_POOL_RECYCLE='-1',
+                       JSON_BACKUP_DIR=os.path.join(work_dir, 'json_backup'), LOG_LEVEL='ERROR')
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', '--database-url', args.database_url,
+                 '--idle', str(args.idle), '--rounds', str(args.rounds)],
+                env=env, cwd=work_dir, capture_output=True, text=True)
+            lines = completed.stdout.strip().splitlines()
+            if completed.returncode != 0 or not lines:
+                print(completed.stdout + completed.stderr)
+                return 2
+            results[pre_ping] = json.loads(lines[-1])
+    finally:
+        proxy.stop()
+
+    print(f"\n{'pre_ping':<9} {'실패':>4} {'새 연결':>7} {'버린 연결':>9}  지연(ms)")
+    for pre_ping, result in results.items():
+        print(f"{pre_ping:<9} {result['failures']:>4} {result['opened']:>7} {result['invalidated']:>9}  "
+              f"{result['latencies_ms']}")
+    print(f"프록시가 끊은 연결: {proxy.dropped}")
+    if results['1']['failures']:
+        print("❌ pre_ping 을 켰는데도 실패한 요청이 있습니다")
+        return 1
+    print("✅ pre_ping 을 켜면 끊긴 연결이 있어도 요청이 실패하지 않습니다")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
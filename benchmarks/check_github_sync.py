@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+GitHub 백업 동기화 회귀 검사 - 여러 워커(GitHubSync 인스턴스)가 같은 저장소에 올릴 때 파일이 어긋나지 않는지
+
+가짜 GitHub(github_stub.py)에 두 인스턴스로 번갈아 올린 뒤 원격 파일 내용을 확인합니다.
+- 캐시 공유: 같은 캐시 파일을 쓰는 두 워커 (B: 스냅샷 T1 + 빈 저널 → A: 저널 추가 → B: 스냅샷 T2 + 빈 저널)
+  B 가 오래된 캐시로 "저널은 이미 비어 있음"이라고 판단하면 T2 스냅샷 위에 예전 저널이 남음
+- 캐시 따로: 캐시 파일이 다른 두 곳이 같은 순서로 올림 (fast-forward 실패 후 원격 트리와 다시 비교하는지)
+- clear: 원격에 내용이 있는 파일만 비우고, 없는 파일은 새로 만들지 않는지
+하나라도 어긋나면 종료 코드 1.
+
+사용법:
+    python benchmarks/check_github_sync.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from github_stub import GitHubStub  # noqa: E402
+from github_sync import GitHubSync  # noqa: E402
+
+TOKEN = 'stub-token'
+JOURNAL = 'teams.journal.jsonl'
+
+
+def remote_files(stub):
+    """가짜 GitHub HEAD 의 json_backup/ 파일 {이름: 내용}"""
+    return {path.split('/', 1)[1]: data.decode('utf-8') for path, data in stub.files().items()
+            if path.startswith('json_backup/')}
+
+
+def check_interleaved(work_dir, shared_cache):
+    """B → A → B 순서로 올린 뒤 원격이 B 의 마지막 상태(T2 + 빈 저널)인지"""
+    stub = GitHubStub().start()
+    try:
+        cache_a = os.path.join(work_dir, 'a', '.github_sync_cache.json')
+        cache_b = cache_a if shared_cache else os.path.join(work_dir, 'b', '.github_sync_cache.json')
+        for cache_file in (cache_a, cache_b):
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        worker_a = GitHubSync('owner/repo', api_url=stub.url, cache_file=cache_a)
+        worker_b = GitHubSync('owner/repo', api_url=stub.url, cache_file=cache_b)
+
+        worker_b.sync({'teams.json': 'T1', JOURNAL: ''}, TOKEN)
+        worker_a.sync({JOURNAL: '{"op": "delete", "id": 1}\n'}, TOKEN)
+        success, _ = worker_b.sync({'teams.json': 'T2', JOURNAL: ''}, TOKEN)
+        return success and remote_files(stub) == {'teams.json': 'T2', JOURNAL: ''}, remote_files(stub)
+    finally:
+        stub.stop()
+
+
+def check_clear(work_dir):
+    """clear 는 원격에 내용이 있는 저널만 비우고 없는 저널은 만들지 않음"""
+    stub = GitHubStub().start()
+    try:
+        os.makedirs(os.path.join(work_dir, 'clear'), exist_ok=True)
+        sync = GitHubSync('owner/repo', api_url=stub.url,
+                          cache_file=os.path.join(work_dir, 'clear', '.github_sync_cache.json'))
+        sync.sync({'teams.json': 'T1', JOURNAL: '{"op": "delete", "id": 1}\n'}, TOKEN)
+        sync.sync({'teams.json': 'T2'}, TOKEN, clear=[JOURNAL, 'purchases.journal.jsonl'])
+        commits = len(stub.commits)
+        success, uploaded = sync.sync({'teams.json': 'T2'}, TOKEN, clear=[JOURNAL, 'purchases.journal.jsonl'])
+        ok = (remote_files(stub) == {'teams.json': 'T2', JOURNAL: ''}
+              and success and uploaded == 0 and len(stub.commits) == commits)
+        return ok, remote_files(stub)
+    finally:
+        stub.stop()
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix='mse_github_sync_')
+    try:
+        results = {
+            '캐시 공유 (워커 두 개)': check_interleaved(os.path.join(work_dir, 'shared'), shared_cache=True),
+            '캐시 따로 (fast-forward 실패 후 재비교)': check_interleaved(os.path.join(work_dir, 'separate'),
+                                                               shared_cache=False),
+            'clear (원격에 있는 저널만 비움)': check_clear(work_dir),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    failed = False
+    for name, (ok, files) in results.items():
+        print(f"{'✅' if ok else '❌'} {name}: {files}")
+        failed |= not ok
+    if failed:
+        print("\n❌ GitHub 원격 파일이 마지막으로 올린 상태와 다릅니다")
+        return 1
+    print("\n✅ 여러 워커가 번갈아 올려도 GitHub 원격 파일이 마지막 상태와 같습니다")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+자주 쓰는 조회가 인덱스를 타는지 EXPLAIN 으로 확인 (SQLite / PostgreSQL)
+
+데이터를 만든 뒤 인덱스를 지워 예전 DB 를 흉내내고, 마이그레이션(migrate_database)으로 다시 만든 다음
+잔액 조회, 관리자 목록 페이지, 다중 구매 품목 로드 등의 실행 계획에 기대한 인덱스가 나오는지 검사합니다.
+하나라도 인덱스를 쓰지 않으면 종료 코드 1.
+
+PostgreSQL 은 작은 테이블이면 순차 스캔이 더 싸다고 판단하므로 검사 중에는 enable_seqscan=off 로
+"인덱스를 쓸 수 있는지"를 확인합니다.
+
+사용법:
+    python benchmarks/check_query_plans.py
+    python benchmarks/check_query_plans.py --database-url postgresql://user:pw@localhost/mse_test   # 내용이 지워짐
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='자주 쓰는 조회의 실행 계획 확인')
+    parser.add_argument('--database-url', help='검사할 DB (기본값: 임시 SQLite, 내용이 지워짐)')
+    parser.add_argument('--purchases', type=int, default=2000)
+    parser.add_argument('--verbose', action='store_true', help='실행 계획 전체 출력')
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# 실제 DB/백업 폴더를 건드리지 않도록 임시 경로 사용 (simple_flask import 전에 설정)
+_tmp_dir = tempfile.mkdtemp(prefix='mse_plans_')
+os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(_tmp_dir, 'plans.db')}"
+os.environ['JSON_BACKUP_DIR'] = os.path.join(_tmp_dir, 'json_backup')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+import seed_data  # noqa: E402
+
+
+def checks(sf):
+    """(이름, SQLAlchemy 문, 기대하는 인덱스 이름)"""
+    db = sf.db
+    cursor_at, cursor_id = datetime(2025, 3, 2, 12, 0), 500
+    keyset = {}
+    for model in (sf.Purchase, sf.MultiPurchase):
+        keyset[model] = db.select(model.id).where(db.or_(
+            model.created_at < cursor_at, db.and_(model.created_at == cursor_at, model.id < cursor_id))
+        ).order_by(model.created_at.desc(), model.id.desc()).limit(51)
+    return [
+        ('잔액 조회 - 승인된 구매내역',
+         db.select(sf.Purchase).where(sf.Purchase.team_id == 3, sf.Purchase.is_approved.is_(True)),
+         'ix_purchase_team_approval'),
+        ('잔액 조회 - 승인된 다중 구매',
+         db.select(sf.MultiPurchase).where(sf.MultiPurchase.team_id == 3, sf.MultiPurchase.is_approved.is_(True)),
+         'ix_multi_purchase_team_approval'),
+        ('관리자 목록 다음 페이지 (구매)', keyset[sf.Purchase], 'ix_purchase_created_at_id'),
+        ('관리자 목록 다음 페이지 (다중)', keyset[sf.MultiPurchase], 'ix_multi_purchase_created_at_id'),
+        ('다중 구매 품목 로드 (selectin)',
+         db.select(sf.MultiPurchaseItem).where(sf.MultiPurchaseItem.multi_purchase_id.in_([1, 2, 3])),
+         'ix_multi_purchase_item_multi_purchase_id'),
+        ('조별 기타 요청',
+         db.select(sf.OtherRequest).where(sf.OtherRequest.team_id == 3),
+         'ix_other_request_team_id'),
+    ]
+
+
+def explain(connection, statement):
+    """실행 계획 텍스트 (SQLite: EXPLAIN QUERY PLAN, PostgreSQL: EXPLAIN)"""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled.string}', params)
+        return '\n'.join(str(row[-1]) for row in rows)
+    rows = connection.exec_driver_sql(f'EXPLAIN {compiled.string}', params)
+    return '\n'.join(str(row[0]) for row in rows)
+
+
+def drop_lookup_indexes(sf):
+    """마이그레이션 4, 5 이전 DB 흉내: 인덱스를 지우고 버전 기록도 되돌림"""
+    with sf.db.engine.begin() as connection:
+        for model in (sf.Purchase, sf.MultiPurchase, sf.MultiPurchaseItem, sf.OtherRequest):
+            for index in model.__table__.indexes:
+                index.drop(connection, checkfirst=True)
+        connection.execute(sf.db.text('DELETE FROM schema_migrations WHERE version >= 4'))
+
+
+def plan_report(sf, label):
+    results = []
+    with sf.db.engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql('ANALYZE')
+            connection.exec_driver_sql('SET enable_seqscan = off')
+        for name, statement, index_name in checks(sf):
+            plan = explain(connection, statement)
+            results.append((name, index_name, index_name in plan, plan))
+    print(f"\n[{label}]")
+    for name, index_name, used, plan in results:
+        print(f"  {'✅' if used else '❌'} {name:<28} {index_name}")
+        if args.verbose or (not used and label == '마이그레이션 후'):
+            print('     ' + plan.replace('\n', '\n     '))
+    return results
+
+
+def main():
+    seed_data.seed_sql(os.environ['DATABASE_URL'], 11, args.purchases, args.purchases // 10, args.purchases // 100)
+    import simple_flask as sf
+
+    with sf.app.app_context():
+        print(f"DB: {sf.db.engine.dialect.name}, 구매내역 {args.purchases}개")
+        sf.migrate_database()
+        drop_lookup_indexes(sf)
+        plan_report(sf, '마이그레이션 전 (인덱스 없음)')
+        applied = sf.migrate_database()
+        print(f"\n🗄️ 적용한 마이그레이션: {applied}")
+        results = plan_report(sf, '마이그레이션 후')
+        again = sf.migrate_database()
+        print(f"\n다시 실행: 적용한 마이그레이션 {again} (이미 적용된 DB 에서는 빈 목록)")
+
+    missing = [name for name, _, used, _ in results if not used]
+    if missing or again:
+        print(f"\n❌ 인덱스를 쓰지 않는 조회: {', '.join(missing) or '-'}")
+        return 1
+    print("\n✅ 모든 조회가 인덱스를 사용합니다")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+로컬 가짜 GitHub API 서버 (부하 테스트/벤치마크용)
+
+GITHUB_API_URL 을 이 서버 주소로 바꾸면 simple_flask.py 의 백업 업로드(Git Data API)와
+복원 다운로드(contents API)가 실제 GitHub 대신 메모리 저장소로 갑니다.
+- GET  /repos/<repo>/git/ref/heads/<branch>, /git/commits/<sha>, /git/trees/<sha>, /contents/<path> (폴더면 파일 목록)
+- POST /repos/<repo>/git/blobs, /git/trees, /git/commits
+- PATCH /repos/<repo>/git/refs/heads/<branch>
+--latency 로 호출마다 지연을 넣어 느린 GitHub 를 흉내낼 수 있습니다.
+
+사용법:
+    python benchmarks/github_stub.py --port 9010 --latency 0.2
+"""
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def blob_sha(data):
+    return hashlib.sha1(f'blob {len(data)}\0'.encode('utf-8') + data).hexdigest()
+
+
+class GitHubStub:
+    """메모리에 커밋/트리/블롭을 보관하는 가짜 GitHub"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.head = 'c0'
+        self.commits = {'c0': {'tree': 't0', 'parent': None}}
+        self.trees = {'t0': {}}
+        self.blobs = {}
+        self.calls = []
+        self._ids = itertools.count(1)
+        self.server = None
+
+    def files(self):
+        """현재 HEAD 의 {경로: bytes}"""
+        with self.lock:
+            return dict(self.trees[self.commits[self.head]['tree']])
+
+    def start(self, host='127.0.0.1', port=0):
+        stub = self
+
+        class Handler(_Handler):
+            pass
+        Handler.stub = stub
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='github-stub', daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def new_id(self, prefix):
+        return f'{prefix}{next(self._ids)}'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    stub = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_raw(self, code, body, content_type='application/octet-stream'):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send(self, code, obj):
+        self._send_raw(code, json.dumps(obj).encode('utf-8'), 'application/json')
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _begin(self):
+        self.stub.calls.append((self.command, self.path))
+        if self.stub.latency:
+            time.sleep(self.stub.latency)
+        return self.path.split('?', 1)[0]
+
+    def do_GET(self):
+        path = self._begin()
+        stub = self.stub
+        with stub.lock:
+            if '/git/ref/heads/' in path:
+                return self._send(200, {'object': {'sha': stub.head}})
+            if '/git/commits/' in path:
+                commit = stub.commits.get(path.rsplit('/', 1)[1])
+                return self._send(200, {'tree': {'sha': commit['tree']}}) if commit else self._send(404, {})
+            if '/git/trees/' in path:
+                tree = stub.trees.get(path.rsplit('/', 1)[1])
+                if tree is None:
+                    return self._send(404, {})
+                return self._send(200, {'tree': [{'path': name, 'type': 'blob', 'sha': blob_sha(data)}
+                                                 for name, data in tree.items()]})
+            if '/contents/' in path:
+                tree = stub.trees[stub.commits[stub.head]['tree']]
+                name = path.split('/contents/', 1)[1]
+                data = tree.get(name)
+                if data is None:
+                    listing = [{'name': entry[len(name) + 1:], 'path': entry, 'type': 'file', 'size': len(content)}
+                               for entry, content in tree.items()
+                               if entry.startswith(name + '/') and '/' not in entry[len(name) + 1:]]
+                    return self._send(200, listing) if listing else self._send(404, {'message': 'Not Found'})
+                if self.headers.get('Accept') == 'application/vnd.github.raw':
+                    return self._send_raw(200, data)
+                return self._send(200, {'content': base64.b64encode(data).decode('ascii')})
+        self._send(404, {})
+
+    def do_POST(self):
+        path = self._begin()
+        body = self._body()
+        stub = self.stub
+        with stub.lock:
+            if path.endswith('/git/blobs'):
+                data = base64.b64decode(body['content'])
+                sha = blob_sha(data)
+                stub.blobs[sha] = data
+                return self._send(201, {'sha': sha})
+            if path.endswith('/git/trees'):
+                tree = dict(stub.trees.get(body.get('base_tree'), {}))
+                for entry in body['tree']:
+                    tree[entry['path']] = entry['content'].encode('utf-8') if 'content' in entry else stub.blobs[entry['sha']]
+                sha = stub.new_id('t')
+                stub.trees[sha] = tree
+                return self._send(201, {'sha': sha})
+            if path.endswith('/git/commits'):
+                sha = stub.new_id('c')
+                stub.commits[sha] = {'tree': body['tree'], 'parent': (body.get('parents') or [None])[0]}
+                return self._send(201, {'sha': sha})
+        self._send(404, {})
+
+    def do_PATCH(self):
+        self._begin()
+        body = self._body()
+        stub = self.stub
+        with stub.lock:
+            commit = stub.commits.get(body.get('sha'))
+            if commit is None or (commit['parent'] != stub.head and not body.get('force')):
+                return self._send(422, {'message': 'Update is not a fast forward'})
+            stub.head = body['sha']
+        self._send(200, {'object': {'sha': body['sha']}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 가짜 GitHub API 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9010)
+    parser.add_argument('--latency', type=float, default=0.0, help='호출마다 넣을 지연 (초)')
+    args = parser.parse_args()
+
+    stub = GitHubStub(latency=args.latency).start(args.host, args.port)
+    print(f"🧪 가짜 GitHub: {stub.url} (GITHUB_API_URL 로 지정)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+부하 테스트 (simple_flask.py / simple_flask_json.py)
+
+임시 디렉토리에 데이터를 만들고(seed_data.py), 서버를 별도 프로세스로 띄운 뒤
+동시 사용자(스레드)마다 keep-alive 세션으로 시나리오를 반복해 지연 시간과 처리량을 잽니다.
+GitHub 는 benchmarks/github_stub.py 의 가짜 서버로 바꾸므로 실제 저장소에는 아무것도 올라가지 않습니다.
+
+시나리오 (--scenarios)
+- upload_burst : 마감일 몰림 - 쉬지 않고 구매내역 등록 (POST /upload)
+- check_balance: 조별 잔여금액 동시 조회 (POST /check_balance)
+- admin        : 관리자 대시보드 새로고침 (GET /admin)
+- exports      : 관리자 내보내기 (/export_excel, /view_data)
+simple_flask_json.py 는 upload_burst 만 잽니다. 템플릿(base.html)이 SQL 앱에만 있는
+check_balance 등을 url_for 로 참조해 JSON 앱의 HTML 페이지는 모두 500 이 나기 때문입니다.
+
+결과: 시나리오별 요청 수, 오류 수, 처리량(req/s), p50/p95/p99 (ms). --json-out 으로 저장 가능.
+
+사용법:
+    python benchmarks/load_test.py --backend sql --purchases 5000 --users 20 --duration 15
+    python benchmarks/load_test.py --backend both --scenarios upload_burst check_balance
+    python benchmarks/load_test.py --backend sql --server gunicorn --workers 4
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from github_stub import GitHubStub  # noqa: E402
+from seed_data import team_rows  # noqa: E402
+
+ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'MSE3105')
+ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'KHU')
+APP_MODULES = {'sql': 'simple_flask', 'json': 'simple_flask_json'}
+REQUEST_TIMEOUT = 30
+
+
+class TimeoutSession(requests.Session):
+    """응답이 끊겨도 스레드가 멈추지 않도록 요청마다 timeout 기본값 적용"""
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        return super().request(*args, **kwargs)
+
+
+# 시나리오: (관리자 로그인 필요 여부, 요청 함수(session, base_url, rng, teams) → response)
+def sql_upload(session, base, rng, teams):
+    team = rng.choice(teams)
+    return session.post(f'{base}/upload', allow_redirects=False, data={
+        'purchase_submit': '1', 'team_name': team['name'], 'leader_name': team['leader_name'],
+        'item_name': f'부하 테스트 품목 {rng.randint(1, 10 ** 6)}', 'quantity': rng.randint(1, 3),
+        'estimated_cost': rng.randint(1, 30) * 1000, 'store': '쿠팡', 'link': ''})
+
+
+def sql_check_balance(session, base, rng, teams):
+    team = rng.choice(teams)
+    return session.post(f'{base}/check_balance', data={'team_name': team['name'], 'leader_name': team['leader_name']})
+
+
+def json_upload(session, base, rng, teams):
+    team = rng.choice(teams)
+    return session.post(f'{base}/upload', allow_redirects=False, data={
+        'team_id': team['id'], 'item_name': f'부하 테스트 품목 {rng.randint(1, 10 ** 6)}',
+        'price': rng.randint(1, 30) * 1000, 'quantity': rng.randint(1, 3), 'store': '쿠팡',
+        'budget_type': rng.choice(('department', 'student'))})
+
+
+def get(path):
+    return lambda session, base, rng, teams: session.get(f'{base}{path}')
+
+
+def get_any(*paths):
+    return lambda session, base, rng, teams: session.get(f'{base}{rng.choice(paths)}')
+
+
+SCENARIOS = {
+    'sql': {
+        'upload_burst': (False, sql_upload),
+        'check_balance': (False, sql_check_balance),
+        'admin': (True, get('/admin')),
+        'exports': (True, get_any('/export_excel', '/view_data')),
+    },
+    'json': {
+        'upload_burst': (False, json_upload),
+    },
+}
+
+
+def login(session, backend, base):
+    if backend == 'sql':
+        session.post(f'{base}/admin', data={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+    else:
+        session.post(f'{base}/admin_login', data={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Server:
+    """seed → 서버 프로세스 시작 → 종료 (임시 디렉토리 안에서)"""
+
+    def __init__(self, backend, args, github_url):
+        self.backend = backend
+        self.args = args
+        self.work_dir = tempfile.mkdtemp(prefix=f'mse_load_{backend}_')
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.env = dict(os.environ, PORT=str(self.port), LOG_LEVEL=args.log_level, FLASK_DEBUG='false',
+                        GITHUB_API_URL=github_url, GITHUB_TOKEN='stub-token', PYTHONPATH=ROOT_DIR)
+        if backend == 'sql':
+            self.env['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(self.work_dir, 'load.db')}"
+            self.env['JSON_BACKUP_DIR'] = os.path.join(self.work_dir, 'json_backup')
+        else:
+            self.env['JSON_DATA_DIR'] = os.path.join(self.work_dir, 'data')
+        self.process = None
+
+    def seed(self):
+        target = (['--database-url', self.env['DATABASE_URL']] if self.backend == 'sql'
+                  else ['--data-dir', self.env['JSON_DATA_DIR']])
+        subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'seed_data.py'), '--backend', self.backend,
+                        '--teams', str(self.args.teams), '--purchases', str(self.args.purchases)] + target,
+                       env=self.env, cwd=self.work_dir, check=True, stdout=subprocess.DEVNULL)
+
+    def start(self):
+        module = APP_MODULES[self.backend]
+        if self.args.server == 'gunicorn':
+            command = ['gunicorn', '-w', str(self.args.workers), '--threads', str(self.args.threads),
+                       '-b', f'127.0.0.1:{self.port}', f'{module}:app']
+        else:
+            command = [sys.executable, os.path.join(ROOT_DIR, f'{module}.py')]
+        log_path = os.path.join(self.work_dir, 'server.log')
+        self.log = open(log_path, 'wb')
+        self.process = subprocess.Popen(command, env=self.env, cwd=self.work_dir, stdout=self.log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'서버가 바로 종료되었습니다 (로그: {log_path})')
+            try:
+                # JSON 앱은 페이지 렌더링이 실패(500)하므로 응답이 오기만 하면 준비된 것으로 봄
+                requests.get(f'{self.base_url}/', timeout=1)
+                return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f'서버가 60초 안에 응답하지 않습니다 (로그: {log_path})')
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+        if not self.args.keep:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def run_scenario(backend, name, base, args, teams):
+    """args.users 개 스레드가 args.duration 초 동안 반복 요청 (닫힌 루프, 요청 사이 args.think_ms 대기)"""
+    needs_admin, request_func = SCENARIOS[backend][name]
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.users + 1)
+    stop_at = [None]
+
+    def user(index):
+        rng = random.Random(args.seed * 1000 + index)
+        session = TimeoutSession()
+        if needs_admin:
+            login(session, backend, base)
+        local_latencies, local_errors = [], 0
+        start_barrier.wait()
+        while time.monotonic() < stop_at[0]:
+            started = time.perf_counter()
+            try:
+                response = request_func(session, base, rng, teams)
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+            local_latencies.append(time.perf_counter() - started)
+            local_errors += failed
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(args.users)]
+    for thread in threads:
+        thread.start()
+    stop_at[0] = time.monotonic() + args.duration
+    started = time.perf_counter()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'backend': backend, 'scenario': name, 'users': args.users, 'requests': len(latencies),
+        'errors': sum(errors), 'seconds': round(elapsed, 2),
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='simple_flask / simple_flask_json 부하 테스트')
+    parser.add_argument('--backend', choices=('sql', 'json', 'both'), default='both')
+    parser.add_argument('--scenarios', nargs='+', default=['upload_burst', 'check_balance', 'admin', 'exports'],
+                        choices=['upload_burst', 'check_balance', 'admin', 'exports'])
+    parser.add_argument('--teams', type=int, default=11)
+    parser.add_argument('--purchases', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=10, help='동시 사용자(스레드) 수')
+    parser.add_argument('--duration', type=float, default=10, help='시나리오마다 실행할 초')
+    parser.add_argument('--think-ms', type=float, default=0, help='요청 사이 대기 (ms)')
+    parser.add_argument('--github-latency', type=float, default=0.05, help='가짜 GitHub 호출당 지연 (초)')
+    parser.add_argument('--server', choices=('dev', 'gunicorn'), default='dev',
+                        help='dev: python <앱>.py (Flask 개발 서버), gunicorn: gunicorn -w N')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--database-url', help='sql: 임시 SQLite 대신 사용할 DB (내용이 지워짐)')
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='임시 디렉토리(DB, 서버 로그) 남기기')
+    parser.add_argument('--json-out', help='결과를 JSON 으로 저장할 경로')
+    args = parser.parse_args()
+
+    backends = ['sql', 'json'] if args.backend == 'both' else [args.backend]
+    teams = team_rows(args.teams)
+    stub = GitHubStub(latency=args.github_latency).start()
+    results = []
+    try:
+        for backend in backends:
+            server = Server(backend, args, stub.url)
+            try:
+                print(f"🌱 {backend}: 데이터 생성 (조 {args.teams}개, 구매내역 {args.purchases}개)")
+                server.seed()
+                server.start()
+                print(f"🚀 {backend}: {server.base_url} ({args.server})")
+                for name in args.scenarios:
+                    if name not in SCENARIOS[backend]:
+                        print(f"   {name:<14} (건너뜀: {backend} 앱에서는 측정할 수 없음)")
+                        continue
+                    result = run_scenario(backend, name, server.base_url, args, teams)
+                    results.append(result)
+                    print(f"   {name:<14} {result['requests']:>6}건 {result['throughput']:>8.1f} req/s "
+                          f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms "
+                          f"오류 {result['errors']}")
+            finally:
+                server.stop()
+    finally:
+        stub.stop()
+
+    print()
+    print(f"{'backend':<8} {'scenario':<14} {'users':>5} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8}")
+    for r in results:
+        print(f"{r['backend']:<8} {r['scenario']:<14} {r['users']:>5} {r['requests']:>9} {r['errors']:>7} "
+              f"{r['throughput']:>8.1f} {r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} {r['p99_ms'] or 0:>8.1f}")
+    print(f"가짜 GitHub 호출: {len(stub.calls)}회")
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+    return 1 if any(r['errors'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
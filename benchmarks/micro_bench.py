@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+자주 호출되는 함수 마이크로 벤치마크 + 성능 저하 검사
+
+임시 DB/데이터 디렉토리에 seed_data.py 로 데이터를 만든 뒤 아래 함수들의 호출당 시간을 잽니다.
+- get_teams_ordered (캐시 적중 / 캐시 무효화 후), build_backup_contents (백업 직렬화)
+- build_budget_summary (관리자 페이지 집계), get_team_spent (잔액 조회), iter_export_rows (내보내기 행)
+- simple_flask_json 의 load_json / save_json
+
+호출 수를 자동으로 정해(라운드당 약 --round-ms) --rounds 번 반복하고, 라운드 중 가장 빠른 값(min)과
+중앙값(median)을 기록합니다. 비교는 잡음이 적은 min 기준입니다.
+
+사용법:
+    python benchmarks/micro_bench.py                          # 측정만
+    python benchmarks/micro_bench.py --save default           # benchmarks/baselines/default.json 에 기준 저장
+    python benchmarks/micro_bench.py --compare default --max-regression 20
+                                                              # 기준보다 20% 넘게 느려진 항목이 있으면 종료 코드 1
+    python benchmarks/micro_bench.py --only export_rows json_load_json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='자주 호출되는 함수 마이크로 벤치마크')
+    parser.add_argument('--teams', type=int, default=11)
+    parser.add_argument('--purchases', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--round-ms', type=float, default=100, help='라운드당 목표 측정 시간 (ms)')
+    parser.add_argument('--only', nargs='+', help='이 이름의 벤치마크만 실행')
+    parser.add_argument('--save', metavar='NAME', help='결과를 benchmarks/baselines/NAME.json 에 기준으로 저장')
+    parser.add_argument('--compare', metavar='NAME', help='benchmarks/baselines/NAME.json (또는 경로) 와 비교')
+    parser.add_argument('--max-regression', type=float, default=20, help='허용하는 최대 성능 저하 (%%)')
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# 실제 DB/백업/데이터 폴더를 건드리지 않도록 임시 경로 사용 (앱 import 전에 설정)
+_tmp_dir = tempfile.mkdtemp(prefix='mse_micro_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'micro.db')}"
+os.environ['JSON_BACKUP_DIR'] = os.path.join(_tmp_dir, 'json_backup')
+os.environ['JSON_DATA_DIR'] = os.path.join(_tmp_dir, 'data')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.chdir(_tmp_dir)  # simple_flask_json 이 만드는 uploads/ 도 임시 디렉토리에
+
+import seed_data  # noqa: E402
+
+
+def build_benchmarks():
+    """{이름: 호출할 함수} - SQL 함수는 앱 컨텍스트 안에서 호출됨"""
+    seed_data.seed_sql(os.environ['DATABASE_URL'], args.teams, args.purchases,
+                       args.purchases // 10, args.purchases // 100)
+    seed_data.seed_json(os.environ['JSON_DATA_DIR'], args.teams, args.purchases,
+                        args.purchases // 10, args.purchases // 100)
+    import simple_flask as sf
+    import simple_flask_json as sfj
+
+    def teams_cold():
+        sf._teams_cache['version'] = None
+        return sf.get_teams_ordered()
+
+    team_ids = [team['id'] for team in seed_data.team_rows(args.teams)]
+    purchases_data = sfj.load_json(sfj.PURCHASES_FILE)
+
+    benchmarks = {
+        'get_teams_ordered': sf.get_teams_ordered,
+        'get_teams_ordered_cold': teams_cold,
+        'backup_serialize': sf.build_backup_contents,
+        'admin_summary': lambda: sf.build_budget_summary(sf.get_teams_ordered()),
+        'check_balance_spent': lambda: [sf.get_team_spent(team_id) for team_id in team_ids],
+        'export_rows': lambda: sum(1 for _ in sf.iter_export_rows()),
+        'json_load_json': lambda: sfj.load_json(sfj.PURCHASES_FILE),
+        'json_save_json': lambda: sfj.save_json(sfj.PURCHASES_FILE, purchases_data),
+    }
+    return sf.app, benchmarks
+
+
+def measure(func):
+    """라운드당 호출 수를 정하고 --rounds 번 측정 → 호출당 초 목록"""
+    func()  # 준비 실행 (import/캐시)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed * 1000 >= args.round_ms / 2 or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(args.rounds - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return number, samples
+
+
+def baseline_path(name):
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def compare(results, baseline, max_regression):
+    """기준 대비 변화율 출력, 허용치를 넘은 항목 이름 목록 반환"""
+    regressions = []
+    print()
+    print(f"{'benchmark':<24} {'기준 min':>12} {'현재 min':>12} {'변화':>8}")
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<24} {'-':>12} {result['min_us']:>10.1f}us {'(새 항목)':>8}")
+            continue
+        change = (result['min_us'] / base['min_us'] - 1) * 100
+        flag = ''
+        if change > max_regression:
+            regressions.append(name)
+            flag = ' ❌'
+        print(f"{name:<24} {base['min_us']:>10.1f}us {result['min_us']:>10.1f}us {change:>+7.1f}%{flag}")
+    if baseline.get('params') != params():
+        print(f"⚠️ 기준과 측정 조건이 다릅니다: 기준 {baseline.get('params')} / 현재 {params()}")
+    return regressions
+
+
+def params():
+    return {'teams': args.teams, 'purchases': args.purchases}
+
+
+def main():
+    try:
+        app, benchmarks = build_benchmarks()
+        names = args.only or list(benchmarks)
+        unknown = [name for name in names if name not in benchmarks]
+        if unknown:
+            print(f"❌ 알 수 없는 벤치마크: {', '.join(unknown)} (가능: {', '.join(benchmarks)})")
+            return 2
+
+        results = {}
+        print(f"{'benchmark':<24} {'calls':>7} {'min':>12} {'median':>12}")
+        with app.app_context():
+            for name in names:
+                number, samples = measure(benchmarks[name])
+                results[name] = {'min_us': round(min(samples) * 1e6, 2),
+                                 'median_us': round(statistics.median(samples) * 1e6, 2),
+                                 'calls_per_round': number}
+                print(f"{name:<24} {number:>7} {results[name]['min_us']:>10.1f}us "
+                      f"{results[name]['median_us']:>10.1f}us")
+    finally:
+        os.chdir(ROOT_DIR)
+        shutil.rmtree(_tmp_dir, ignore_errors=True)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = baseline_path(args.save)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'params': params(), 'python': platform.python_version(),
+                       'machine': platform.machine(), 'results': results}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"💾 기준 저장: {os.path.relpath(path, ROOT_DIR)}")
+
+    if args.compare:
+        with open(baseline_path(args.compare), encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"❌ {args.max_regression:g}% 넘게 느려진 항목: {', '.join(regressions)}")
+            return 1
+        print(f"✅ 모든 항목이 허용치({args.max_regression:g}%) 안입니다")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
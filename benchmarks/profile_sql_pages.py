@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+페이지별 SQL 프로파일 (SQL_PROFILE=1)
+
+임시 SQLite 에 데이터를 넣고 관리자로 로그인한 뒤 주요 페이지를 요청해
+Server-Timing 헤더의 SQL 수/시간을 표로 출력합니다.
+--slow-ms 를 넘는 페이지는 가장 느린 문과 반복된 문(N+1 의심)도 함께 출력됩니다.
+
+사용법:
+    python benchmarks/profile_sql_pages.py
+    python benchmarks/profile_sql_pages.py --rows 2000 --slow-ms 50
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='페이지별 SQL 프로파일')
+    parser.add_argument('--rows', type=int, default=1000, help='구매내역 수')
+    parser.add_argument('--slow-ms', type=float, default=0, help='이 시간을 넘는 페이지는 SQL 내역 출력')
+    parser.add_argument('--pages', nargs='+',
+                        default=['/admin', '/view_data', '/export_text', '/export_excel_text', '/check_balance'])
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# 실제 DB/백업 폴더를 건드리지 않도록 임시 경로 사용 (simple_flask import 전에 설정)
+_tmp_dir = tempfile.mkdtemp(prefix='mse_profile_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'profile.db')}"
+os.environ['JSON_BACKUP_DIR'] = os.path.join(_tmp_dir, 'json_backup')
+os.environ['SQL_PROFILE'] = '1'
+os.environ['SQL_PROFILE_SLOW_MS'] = str(args.slow_ms)
+
+import simple_flask as sf  # noqa: E402
+
+SERVER_TIMING = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+def seed(rows, teams=11):
+    sf.db.create_all()
+    sf.db.session.execute(sf.db.insert(sf.Team), [
+        {'id': i + 1, 'name': f'화요일 {i + 1}조', 'leader_name': f'조장{i + 1}',
+         'department_budget': 600000, 'student_budget': 500000,
+         'original_department_budget': 600000, 'original_student_budget': 500000}
+        for i in range(teams)
+    ])
+    now = datetime.utcnow()
+    sf.db.session.execute(sf.db.insert(sf.Purchase), [
+        {'team_id': i % teams + 1, 'item_name': f'품목 {i}', 'quantity': 1, 'estimated_cost': 1000,
+         'link': '', 'store': '쿠팡', 'is_approved': i % 2 == 0,
+         'budget_type': 'department' if i % 2 == 0 else 'student', 'created_at': now}
+        for i in range(rows)
+    ])
+    multi_count = max(rows // 10, 1)
+    sf.db.session.execute(sf.db.insert(sf.MultiPurchase), [
+        {'id': i + 1, 'team_id': i % teams + 1, 'store': '다나와', 'total_cost': 30000,
+         'is_approved': i % 3 == 0, 'budget_type': 'student', 'created_at': now}
+        for i in range(multi_count)
+    ])
+    sf.db.session.execute(sf.db.insert(sf.MultiPurchaseItem), [
+        {'multi_purchase_id': i // 3 + 1, 'item_name': f'부품 {i}', 'quantity': 1, 'unit_price': 10000}
+        for i in range(multi_count * 3)
+    ])
+    sf.db.session.execute(sf.db.insert(sf.OtherRequest), [
+        {'team_id': i % teams + 1, 'content': f'요청 {i}', 'created_at': now}
+        for i in range(max(rows // 100, 1))
+    ])
+    sf.db.session.commit()
+    sf.reconcile_ledger()
+
+
+def main():
+    with sf.app.app_context():
+        seed(args.rows)
+
+    client = sf.app.test_client()
+    client.post('/admin', data={'username': sf.ADMIN_USERNAME, 'password': sf.ADMIN_PASSWORD})
+
+    results = []
+    for page in args.pages:
+        response = client.get(page)
+        response.get_data()
+        timing = {name: (float(dur), count) for name, dur, count in
+                  SERVER_TIMING.findall(response.headers.get('Server-Timing', ''))}
+        db_ms, queries = timing.get('db', (0.0, '0'))
+        results.append((page, response.status_code, int(queries or 0), db_ms, timing.get('total', (0.0, None))[0]))
+
+    print()
+    print(f"{'page':<22} {'status':>6} {'SQL 수':>7} {'SQL(ms)':>9} {'전체(ms)':>9}")
+    for page, status, queries, db_ms, total_ms in results:
+        print(f"{page:<22} {status:>6} {queries:>7} {db_ms:>9.1f} {total_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
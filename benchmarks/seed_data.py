@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+부하 테스트용 데이터 생성
+
+조 N개, 구매내역 M개, 다중 구매 K개(품목 3개씩), 기타 요청을 만들어
+- sql: DATABASE_URL 의 DB(simple_flask.py 모델)에 일괄 삽입
+- json: JSON_DATA_DIR 의 teams.json 등 스냅샷 파일(simple_flask_json.py 형식)로 저장
+같은 --seed 면 항상 같은 데이터를 만듭니다. 조장 이름은 "조장<번호>" 입니다.
+
+사용법:
+    python benchmarks/seed_data.py --backend sql --database-url sqlite:////tmp/load.db --teams 11 --purchases 5000
+    python benchmarks/seed_data.py --backend json --data-dir /tmp/load_json --purchases 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+STORES = ['쿠팡', '디바이스마트', '시그마알드리치', '4science', 'G마켓', '아마존', '기타']
+
+
+def team_rows(count):
+    """월요일/화요일 조를 번갈아 가며 count개"""
+    rows = []
+    for i in range(count):
+        day = '월요일' if i % 2 == 0 else '화요일'
+        department_budget = 600000 if i % 2 == 0 else 700000
+        rows.append({'id': i + 1, 'name': f'{day} {i // 2 + 1}조', 'leader_name': f'조장{i + 1}',
+                     'department_budget': department_budget, 'student_budget': 500000,
+                     'original_department_budget': department_budget, 'original_student_budget': 500000})
+    return rows
+
+
+def purchase_rows(count, teams, rng, started):
+    for i in range(count):
+        yield {'id': i + 1, 'team_id': rng.randint(1, teams), 'item_name': f'품목 {i + 1}',
+               'quantity': rng.randint(1, 5), 'estimated_cost': rng.randint(1, 100) * 1000,
+               'store': rng.choice(STORES), 'is_approved': rng.random() < 0.6,
+               'budget_type': rng.choice(('department', 'student')),
+               'created_at': started + timedelta(minutes=i)}
+
+
+def multi_purchase_rows(count, teams, rng, started):
+    for i in range(count):
+        items = [{'item_name': f'부품 {i + 1}-{k + 1}', 'quantity': rng.randint(1, 3),
+                  'unit_price': rng.randint(1, 50) * 1000} for k in range(3)]
+        yield {'id': i + 1, 'team_id': rng.randint(1, teams), 'store': rng.choice(STORES),
+               'total_cost': sum(item['quantity'] * item['unit_price'] for item in items),
+               'is_approved': rng.random() < 0.5, 'budget_type': rng.choice(('department', 'student')),
+               'created_at': started + timedelta(minutes=i), 'items': items}
+
+
+def seed_sql(database_url, teams, purchases, multi_purchases, other_requests, seed=0):
+    """simple_flask.py 의 DB 를 비우고 일괄 삽입"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import simple_flask as sf
+
+    rng = random.Random(seed)
+    started = datetime(2025, 3, 1, 9, 0)
+    with sf.app.app_context():
+        sf.db.drop_all()
+        sf.db.create_all()
+        sf.db.session.execute(sf.db.insert(sf.Team), team_rows(teams))
+        sf.db.session.execute(sf.db.insert(sf.Purchase), [
+            {key: value for key, value in row.items() if key != 'id'} | {'link': ''}
+            for row in purchase_rows(purchases, teams, rng, started)
+        ])
+        multi = list(multi_purchase_rows(multi_purchases, teams, rng, started))
+        if multi:
+            sf.db.session.execute(sf.db.insert(sf.MultiPurchase), [
+                {key: value for key, value in row.items() if key != 'items'} for row in multi
+            ])
+            sf.db.session.execute(sf.db.insert(sf.MultiPurchaseItem), [
+                dict(item, multi_purchase_id=row['id']) for row in multi for item in row['items']
+            ])
+        if other_requests:
+            sf.db.session.execute(sf.db.insert(sf.OtherRequest), [
+                {'team_id': rng.randint(1, teams), 'content': f'요청 {i + 1}', 'created_at': started}
+                for i in range(other_requests)
+            ])
+        sf.db.session.commit()
+        sf.reset_id_sequences([sf.Team.__table__, sf.Purchase.__table__, sf.MultiPurchase.__table__,
+                               sf.MultiPurchaseItem.__table__, sf.OtherRequest.__table__])
+        sf.db.session.commit()
+        sf.reconcile_ledger()
+
+
+def seed_json(data_dir, teams, purchases, multi_purchases, other_requests, seed=0):
+    """simple_flask_json.py 의 스냅샷 파일을 새로 씀 (기존 이벤트 로그는 삭제)"""
+    from json_storage import atomic_write_json
+
+    rng = random.Random(seed)
+    started = datetime(2025, 3, 1, 9, 0)
+    os.makedirs(data_dir, exist_ok=True)
+
+    def stamp(value):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+
+    purchase_list = []
+    for row in purchase_rows(purchases, teams, rng, started):
+        price = float(row['estimated_cost'])
+        purchase_list.append({
+            'id': row['id'], 'team_id': row['team_id'], 'item_name': row['item_name'], 'price': price,
+            'quantity': row['quantity'], 'total_amount': price * row['quantity'], 'store': row['store'],
+            'budget_type': row['budget_type'], 'notes': '', 'attachment_filename': None,
+            'request_date': stamp(row['created_at']),
+            'status': '승인됨' if row['is_approved'] else '대기중', 'is_approved': row['is_approved'],
+        })
+    multi_list = []
+    for row in multi_purchase_rows(multi_purchases, teams, rng, started):
+        multi_list.append({
+            'id': row['id'], 'team_id': row['team_id'], 'store': row['store'], 'items': row['items'],
+            'total_amount': float(row['total_cost']), 'budget_type': row['budget_type'], 'notes': '',
+            'request_date': stamp(row['created_at']),
+            'status': '승인됨' if row['is_approved'] else '대기중', 'is_approved': row['is_approved'],
+        })
+    other_list = [{'id': i + 1, 'team_id': rng.randint(1, teams), 'request_type': '기타',
+                   'description': f'요청 {i + 1}', 'request_date': stamp(started),
+                   'status': '대기중', 'is_approved': False} for i in range(other_requests)]
+
+    for key, rows in (('teams', team_rows(teams)), ('purchases', purchase_list),
+                      ('multi_purchases', multi_list), ('other_requests', other_list)):
+        atomic_write_json(os.path.join(data_dir, f'{key}.json'), {key: rows, 'last_id': len(rows)})
+    events_path = os.path.join(data_dir, 'events.jsonl')
+    if os.path.exists(events_path):
+        os.remove(events_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='부하 테스트용 데이터 생성')
+    parser.add_argument('--backend', choices=('sql', 'json'), required=True)
+    parser.add_argument('--database-url', help='sql: 대상 DB (예: sqlite:////tmp/load.db)')
+    parser.add_argument('--data-dir', help='json: 대상 데이터 디렉토리')
+    parser.add_argument('--teams', type=int, default=11)
+    parser.add_argument('--purchases', type=int, default=1000)
+    parser.add_argument('--multi-purchases', type=int, default=None, help='기본값: 구매내역의 1/10')
+    parser.add_argument('--other-requests', type=int, default=None, help='기본값: 구매내역의 1/100')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    multi = args.multi_purchases if args.multi_purchases is not None else args.purchases // 10
+    others = args.other_requests if args.other_requests is not None else args.purchases // 100
+    if args.backend == 'sql':
+        if not args.database_url:
+            parser.error('--backend sql 에는 --database-url 이 필요합니다')
+        seed_sql(args.database_url, args.teams, args.purchases, multi, others, args.seed)
+    else:
+        if not args.data_dir:
+            parser.error('--backend json 에는 --data-dir 이 필요합니다')
+        seed_json(args.data_dir, args.teams, args.purchases, multi, others, args.seed)
+    print(f"✅ {args.backend}: 조 {args.teams}개, 구매내역 {args.purchases}개, 다중 구매 {multi}개, 기타 요청 {others}개")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+JSON 백엔드 동시성 스트레스 테스트
+
+여러 프로세스가 동시에 /upload 와 /approve_purchase 를 호출한 뒤
+- 업로드한 구매내역 수가 정확히 맞는지 (ID 중복/유실 없음)
+- 승인된 금액만큼 팀 예산이 정확히 차감됐는지 (lost update 없음)
+- 이벤트 로그를 압축한 스냅샷이 재생 결과와 같은지
+를 확인합니다. 실패하면 종료 코드 1을 반환합니다.
+
+사용법:
+    python benchmarks/stress_json_storage.py
+    python benchmarks/stress_json_storage.py --processes 8 --uploads 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+TEAM_COUNT = 11
+PRICE = 1000
+
+
+def _client(data_dir):
+    os.environ['JSON_DATA_DIR'] = data_dir
+    import simple_flask_json as sfj
+    sfj.app.config['TESTING'] = True
+    client = sfj.app.test_client()
+    with client.session_transaction() as sess:
+        sess['admin_logged_in'] = True
+    return client
+
+
+def upload_worker(data_dir, worker_no, uploads):
+    client = _client(data_dir)
+    for i in range(uploads):
+        client.post('/upload', data={
+            'team_id': str((worker_no + i) % TEAM_COUNT + 1),
+            'item_name': f'stress-{worker_no}-{i}',
+            'price': str(PRICE),
+            'quantity': '1',
+            'budget_type': 'department',
+        })
+
+
+def approve_worker(data_dir, purchase_ids):
+    client = _client(data_dir)
+    for purchase_id in purchase_ids:
+        client.get(f'/approve_purchase/{purchase_id}')
+
+
+def run_all(target, args_list):
+    processes = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 백엔드 동시성 스트레스 테스트')
+    parser.add_argument('--processes', type=int, default=6)
+    parser.add_argument('--uploads', type=int, default=30, help='프로세스당 업로드 수')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='mse_stress_')
+    os.environ['JSON_DATA_DIR'] = data_dir
+    import simple_flask_json as sfj
+    sfj.init_data()
+    teams_before = {t['id']: t['department_budget'] for t in sfj.load_json(sfj.TEAMS_FILE)['teams']}
+
+    started = time.perf_counter()
+    run_all(upload_worker, [(data_dir, n, args.uploads) for n in range(args.processes)])
+    upload_seconds = time.perf_counter() - started
+
+    purchases = sfj.load_json(sfj.PURCHASES_FILE)['purchases']
+    expected = args.processes * args.uploads
+    ids = [p['id'] for p in purchases]
+
+    # 같은 구매내역을 두 프로세스가 동시에 승인하도록 ID 목록을 겹쳐서 나눔
+    started = time.perf_counter()
+    run_all(approve_worker, [(data_dir, ids[n::2] if n % 2 else ids[::-1]) for n in range(args.processes)])
+    approve_seconds = time.perf_counter() - started
+
+    # 다른 프로세스가 남긴 이벤트 로그까지 재생한 상태를 확인한 뒤, 압축한 스냅샷도 같은지 확인
+    purchases = sfj.load_json(sfj.PURCHASES_FILE)['purchases']
+    teams_after = {t['id']: t['department_budget'] for t in sfj.load_json(sfj.TEAMS_FILE)['teams']}
+    sfj.event_store.compact()
+    with open(sfj.PURCHASES_FILE, 'r', encoding='utf-8') as f:
+        if json.load(f)['purchases'] != purchases:
+            print("❌ 압축한 스냅샷이 재생 결과와 다름")
+            return 1
+
+    approved_by_team = {}
+    for purchase in purchases:
+        if purchase['is_approved']:
+            approved_by_team[purchase['team_id']] = approved_by_team.get(purchase['team_id'], 0) + purchase['total_amount']
+
+    errors = []
+    if len(purchases) != expected:
+        errors.append(f'구매내역 수 불일치: {len(purchases)} != {expected}')
+    if len(set(ids)) != len(ids):
+        errors.append('중복된 구매내역 ID 발견')
+    for team_id, before in teams_before.items():
+        after = teams_after[team_id]
+        spent = approved_by_team.get(team_id, 0)
+        if before - spent != after:
+            errors.append(f'팀 {team_id} 예산 불일치: {before} - {spent} != {after}')
+
+    print(f"업로드 {expected}건: {upload_seconds:.2f}s, 승인: {approve_seconds:.2f}s "
+          f"(프로세스 {args.processes}개, 승인 {sum(1 for p in purchases if p['is_approved'])}건)")
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        return 1
+    print("✅ 유실된 업데이트 없음")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
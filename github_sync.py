@@ -0,0 +1,246 @@
+"""
+GitHub 백업 동기화 (Git Data API)
+
+json_backup 파일들을 파일마다 GET/PUT 하지 않고, 트리 하나를 만들어 커밋 한 번으로 올립니다.
+- 내용이 바뀌지 않은 파일은 건너뜀 (git blob sha를 로컬에서 계산해 캐시와 비교)
+- 캐시 파일을 여러 워커가 함께 쓰므로 업로드는 캐시 파일 잠금(flock) 안에서 하고, 시작할 때 캐시를 다시 읽음
+- requests.Session 을 재사용해 keep-alive 연결 유지
+- 내용이 bytes 인 파일(snapshot.bin 등)은 base64 blob 으로 먼저 올린 뒤 트리에 연결
+- GITHUB_API_URL 을 바꾸면 로컬 가짜 GitHub 서버로도 테스트 가능
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from json_storage import JsonStorage
+
+
+def git_blob_sha(content):
+    """git이 계산하는 것과 같은 blob sha1 계산 (str 은 UTF-8, bytes 는 그대로)"""
+    data = content if isinstance(content, bytes) else content.encode('utf-8')
+    header = f'blob {len(data)}\0'.encode('utf-8')
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def request_kind(url):
+    """GitHub API URL → 지표 라벨용 종류 (contents, git/blobs, git/trees, git/commits, git/refs ...)"""
+    parts = url.split('?', 1)[0].split('/repos/', 1)[-1].split('/')[2:]
+    if not parts:
+        return 'repo'
+    if parts[0] == 'git' and len(parts) > 1:
+        return f'git/{parts[1]}'
+    return parts[0]
+
+
+class _TimedSession(requests.Session):
+    """요청마다 소요 시간과 결과를 GitHubSync.on_request 로 알리는 세션"""
+
+    def __init__(self, sync):
+        super().__init__()
+        self._sync = sync
+
+    def request(self, method, url, *args, **kwargs):
+        started = time.perf_counter()
+        status = None
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            if self._sync.on_request is not None:
+                try:
+                    self._sync.on_request(request_kind(url), method.upper(), time.perf_counter() - started, status)
+                except Exception:
+                    pass
+
+
+class GitHubSync:
+    """여러 파일을 단일 커밋으로 GitHub에 올리는 동기화 엔진"""
+
+    def __init__(self, repo, branch='main', base_path='json_backup',
+                 api_url='https://api.github.com', cache_file=None, timeout=10, on_request=None):
+        self.repo = repo
+        self.branch = branch
+        self.base_path = base_path.strip('/')
+        self.api_url = api_url.rstrip('/')
+        self.cache_file = cache_file
+        self.timeout = timeout
+        # 요청마다 on_request(종류, 메서드, 소요 초, 상태 코드 또는 예외 시 None) 호출 (지표 수집용)
+        self.on_request = on_request
+        # 캐시 파일이 있으면 같은 캐시를 쓰는 워커 프로세스 간 잠금, 없으면 스레드 잠금만
+        self._storage = (JsonStorage(os.path.dirname(os.path.abspath(cache_file)),
+                                     lock_name=os.path.basename(cache_file) + '.lock') if cache_file else None)
+        self._thread_lock = threading.RLock()
+        self._session = None
+        self._cache = self._load_cache()
+
+    # 내부 유틸
+    def _load_cache(self):
+        if self.cache_file and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception:
+                pass
+        return {'blobs': {}, 'commit_sha': None, 'tree_sha': None}
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.cache_file)
+
+    @property
+    def session(self):
+        """keep-alive 연결을 재사용하는 세션"""
+        if self._session is None:
+            session = _TimedSession(self)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'Accept': 'application/vnd.github.v3+json',
+                'User-Agent': 'MSE-Budget-System'
+            })
+            self._session = session
+        return self._session
+
+    def _request(self, method, path, token, **kwargs):
+        headers = {'Authorization': f'token {token}'} if token else {}
+        response = self.session.request(method, f'{self.api_url}/repos/{self.repo}{path}',
+                                        headers=headers, timeout=self.timeout, **kwargs)
+        return response
+
+    def _remote_path(self, filename):
+        return f'{self.base_path}/{filename}' if self.base_path else filename
+
+    def _fetch_head(self, token):
+        """브랜치 최신 커밋 sha와 트리 sha 조회"""
+        response = self._request('GET', f'/git/ref/heads/{self.branch}', token)
+        response.raise_for_status()
+        commit_sha = response.json()['object']['sha']
+        response = self._request('GET', f'/git/commits/{commit_sha}', token)
+        response.raise_for_status()
+        return commit_sha, response.json()['tree']['sha']
+
+    def _seed_blob_cache(self, token, tree_sha):
+        """캐시가 비어 있으면 원격 트리의 blob sha로 채움 (최초 1회)"""
+        response = self._request('GET', f'/git/trees/{tree_sha}', token, params={'recursive': '1'})
+        if response.status_code != 200:
+            return
+        prefix = f'{self.base_path}/' if self.base_path else ''
+        for entry in response.json().get('tree', []):
+            if entry.get('type') == 'blob' and entry['path'].startswith(prefix):
+                filename = entry['path'][len(prefix):]
+                if '/' not in filename:
+                    self._cache['blobs'][filename] = entry['sha']
+
+    # 공개 API
+    def locked(self):
+        """업로드 잠금 (같은 스레드에서 중첩 가능) - 올릴 내용을 이 잠금 안에서 읽으면 늦게 끝난 업로드가 새 내용을 덮지 않음"""
+        return self._storage.locked() if self._storage else self._thread_lock
+
+    def changed_files(self, files):
+        """캐시와 비교해 내용이 바뀐 파일만 반환"""
+        blobs = self._cache['blobs']
+        return {name: content for name, content in files.items()
+                if blobs.get(name) != git_blob_sha(content)}
+
+    def _with_cleared(self, files, clear):
+        """clear 중 원격에 내용이 있는 파일은 빈 내용으로 덮어쓰도록 추가"""
+        empty_sha = git_blob_sha('')
+        stale = {name: '' for name in clear
+                 if name not in files and self._cache['blobs'].get(name) not in (None, empty_sha)}
+        return {**files, **stale}
+
+    def sync(self, files, token, message=None, clear=()):
+        """{파일명: 내용(str 또는 bytes)} 중 바뀐 파일만 단일 커밋으로 푸시. (성공 여부, 올린 파일 수) 반환
+        clear 의 파일은 원격에 내용이 있을 때만 빈 파일로 덮어씀 (없는 파일을 새로 만들지 않음)"""
+        with self.locked():
+            if not token:
+                return False, 0
+
+            # 다른 워커가 올린 뒤 저장한 캐시를 다시 읽음 (오래된 캐시로 실제로 바뀐 파일을 건너뛰지 않도록)
+            if self.cache_file:
+                self._cache = self._load_cache()
+
+            changed = self.changed_files(self._with_cleared(files, clear))
+            if not changed and self._cache['commit_sha']:
+                return True, 0
+
+            commit_sha, tree_sha = self._cache['commit_sha'], self._cache['tree_sha']
+            if not commit_sha:
+                commit_sha, tree_sha = self._fetch_head(token)
+                if not self._cache['blobs']:
+                    self._seed_blob_cache(token, tree_sha)
+                    changed = self.changed_files(self._with_cleared(files, clear))
+                    if not changed:
+                        self._cache.update({'commit_sha': commit_sha, 'tree_sha': tree_sha})
+                        self._save_cache()
+                        return True, 0
+
+            # 다른 곳에서 브랜치가 움직였으면(fast-forward 실패) 최신 트리와 다시 비교해 한 번 재시도
+            for attempt in range(2):
+                commit_message = message or \
+                    f'Update json_backup ({len(changed)} files) - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+                new_commit_sha, new_tree_sha = self._push(token, changed, commit_sha, tree_sha, commit_message)
+                if new_commit_sha:
+                    break
+                if attempt == 0:
+                    commit_sha, tree_sha = self._fetch_head(token)
+                    self._cache['blobs'] = {}
+                    self._seed_blob_cache(token, tree_sha)
+                    changed = self.changed_files(self._with_cleared(files, clear))
+                    if not changed:
+                        self._cache.update({'commit_sha': commit_sha, 'tree_sha': tree_sha})
+                        self._save_cache()
+                        return True, 0
+            else:
+                return False, 0
+
+            for name, content in changed.items():
+                self._cache['blobs'][name] = git_blob_sha(content)
+            self._cache.update({'commit_sha': new_commit_sha, 'tree_sha': new_tree_sha})
+            self._save_cache()
+            return True, len(changed)
+
+    def _push(self, token, changed, parent_sha, base_tree_sha, message):
+        """(바이너리 blob 생성 →) 트리 생성 → 커밋 생성 → 브랜치 ref 갱신"""
+        tree_entries = []
+        for name, content in sorted(changed.items()):
+            entry = {'path': self._remote_path(name), 'mode': '100644', 'type': 'blob'}
+            if isinstance(content, bytes):
+                # 트리 API 의 content 는 UTF-8 텍스트만 받으므로 바이너리는 blob 을 따로 만든다
+                response = self._request('POST', '/git/blobs', token, json={
+                    'content': base64.b64encode(content).decode('ascii'), 'encoding': 'base64'})
+                response.raise_for_status()
+                entry['sha'] = response.json()['sha']
+            else:
+                entry['content'] = content
+            tree_entries.append(entry)
+        response = self._request('POST', '/git/trees', token,
+                                 json={'base_tree': base_tree_sha, 'tree': tree_entries})
+        response.raise_for_status()
+        new_tree_sha = response.json()['sha']
+
+        response = self._request('POST', '/git/commits', token,
+                                 json={'message': message, 'tree': new_tree_sha, 'parents': [parent_sha]})
+        response.raise_for_status()
+        new_commit_sha = response.json()['sha']
+
+        response = self._request('PATCH', f'/git/refs/heads/{self.branch}', token,
+                                 json={'sha': new_commit_sha, 'force': False})
+        if response.status_code == 422:
+            return None, None
+        response.raise_for_status()
+        return new_commit_sha, new_tree_sha
@@ -0,0 +1,244 @@
+"""
+JSON 백엔드 이벤트 저장소 (append-only JSON Lines)
+
+변경 한 번 = events.jsonl 에 한 줄 추가. 전체 파일을 다시 쓰지 않습니다.
+- 상태 = 스냅샷 파일(teams.json 등) + 이벤트 로그 재생
+- 각 프로세스는 상태를 메모리에 두고(id, team_id 색인) 마지막으로 읽은 위치 이후의 줄만 읽음
+- 로그와 스냅샷 파일의 inode/크기/수정 시각이 그대로면 파일을 열지도 않음
+  (스냅샷 파일을 직접 고치면 다음 요청에서 다시 읽음)
+- 이벤트가 일정 개수를 넘으면 스냅샷으로 압축(compaction)하고 로그를 새로 시작
+- ID는 스냅샷의 last_id 와 로그의 insert 이벤트로 이어지는 카운터에서 발급
+
+이벤트는 모두 멱등(insert=upsert, update=값 덮어쓰기, delete)이라
+압축 도중 죽어서 예전 로그가 새 스냅샷 위에 다시 재생되어도 결과가 같습니다.
+"""
+
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+from json_storage import atomic_write_json
+
+
+def insert(collection, row):
+    """행 추가 이벤트 (row 에 id 포함)"""
+    return {'op': 'insert', 'collection': collection, 'row': row}
+
+
+def update(collection, record_id, **fields):
+    """필드 값 변경 이벤트"""
+    return {'op': 'update', 'collection': collection, 'id': record_id, 'fields': fields}
+
+
+def delete(collection, record_id):
+    """행 삭제 이벤트"""
+    return {'op': 'delete', 'collection': collection, 'id': record_id}
+
+
+class JsonEventStore:
+    """스냅샷 + 이벤트 로그로 컬렉션 상태를 관리"""
+
+    def __init__(self, storage, snapshot_files, log_path, compact_every=500):
+        self.storage = storage
+        self.snapshot_files = snapshot_files  # {컬렉션 이름: 스냅샷 파일 경로}
+        self.log_path = log_path
+        self.compact_every = compact_every
+        self._rows = None        # {컬렉션: {id: row}}
+        self._by_team = {}       # {컬렉션: {team_id: {id: row}}}
+        self._log_stat = None    # 마지막으로 읽은 로그의 (inode, 크기, 수정 시각)
+        self._snapshot_stat = None
+        self._last_ids = {}      # {컬렉션: 마지막으로 발급된 id}
+        self._log_id = None      # (inode, 헤더) - 압축으로 로그가 바뀌었는지 판단
+        self._offset = 0
+        self.event_count = 0     # 마지막 압축 이후 로그에 쌓인 줄 수
+
+    # 읽기
+    def rows(self, collection):
+        """컬렉션의 행 목록 (호출자가 고쳐도 저장소에 영향 없도록 복사본)"""
+        with self.storage.locked(shared=True):
+            self._refresh()
+            return [dict(row) for row in self._rows[collection].values()]
+
+    def get(self, collection, record_id):
+        """id로 행 하나 조회 (없으면 None)"""
+        with self.storage.locked(shared=True):
+            self._refresh()
+            row = self._rows[collection].get(record_id)
+            return dict(row) if row is not None else None
+
+    def by_team(self, collection, team_id):
+        """팀의 행 목록 (team_id 색인 사용)"""
+        with self.storage.locked(shared=True):
+            self._refresh()
+            return [dict(row) for row in self._by_team[collection].get(team_id, {}).values()]
+
+    def next_id(self, collection):
+        """다음에 발급할 id (배타 잠금 안에서 commit 과 함께 사용)"""
+        with self.storage.locked():
+            self._refresh()
+            return self._last_ids[collection] + 1
+
+    # 쓰기
+    def commit(self, *changes):
+        """변경들을 한 줄로 로그에 추가 (한 줄 단위로 전부 적용되거나 전부 무시됨)"""
+        if not changes:
+            return
+        with self.storage.locked():
+            self._refresh()
+            line = json.dumps({'ts': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'changes': list(changes)},
+                              ensure_ascii=False) + '\n'
+            if self._log_id is None:
+                self._start_new_log()
+            with open(self.log_path, 'ab') as f:
+                if f.tell() > self._offset:
+                    # 비정상 종료로 잘린 줄 뒤에 이어 쓰지 않도록 줄을 끊어 둔다
+                    f.write(b'\n')
+                f.write(line.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+                st = os.fstat(f.fileno())
+            self._apply(changes)
+            self._log_stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+            self.event_count += 1
+            if self.event_count >= self.compact_every:
+                self.compact()
+
+    def replace(self, collection, rows):
+        """컬렉션 전체 교체 (초기화용). id 카운터도 남은 행 기준으로 다시 맞춤"""
+        with self.storage.locked():
+            self._refresh()
+            self._rows[collection] = {row['id']: dict(row) for row in rows}
+            self._build_team_index(collection)
+            self._last_ids[collection] = max(self._rows[collection], default=0)
+            self.compact()
+
+    def compact(self):
+        """현재 상태를 스냅샷 파일로 저장하고 로그를 새로 시작"""
+        with self.storage.locked():
+            self._refresh()
+            for collection, path in self.snapshot_files.items():
+                atomic_write_json(path, {collection: list(self._rows[collection].values()),
+                                         'last_id': self._last_ids[collection]})
+            self._snapshot_stat = self._stat_snapshots()
+            self._start_new_log()
+            self.event_count = 0
+
+    # 내부
+    def _start_new_log(self):
+        header = json.dumps({'generation': uuid.uuid4().hex}) + '\n'
+        directory = os.path.dirname(os.path.abspath(self.log_path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.events.', suffix='.tmp', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._log_id = (os.stat(self.log_path).st_ino, header)
+        self._offset = len(header.encode('utf-8'))
+        self._log_stat = None
+
+    def _stat_snapshots(self):
+        stats = []
+        for path in self.snapshot_files.values():
+            try:
+                st = os.stat(path)
+                stats.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stats.append(None)
+        return tuple(stats)
+
+    def _load_snapshots(self):
+        self._snapshot_stat = self._stat_snapshots()
+        self._rows = {}
+        for collection, path in self.snapshot_files.items():
+            data = {}
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            rows = data.get(collection) or []
+            self._rows[collection] = {row['id']: row for row in rows}
+            self._build_team_index(collection)
+            self._last_ids[collection] = max(data.get('last_id', 0), max(self._rows[collection], default=0))
+
+    def _build_team_index(self, collection):
+        index = {}
+        for record_id, row in self._rows[collection].items():
+            if 'team_id' in row:
+                index.setdefault(row['team_id'], {})[record_id] = row
+        self._by_team[collection] = index
+
+    def _index_row(self, collection, row):
+        if 'team_id' in row:
+            self._by_team[collection].setdefault(row['team_id'], {})[row['id']] = row
+
+    def _unindex_row(self, collection, row):
+        if 'team_id' in row:
+            self._by_team[collection].get(row['team_id'], {}).pop(row['id'], None)
+
+    def _refresh(self):
+        """로그에 새로 추가된 줄만 읽어 적용 (다른 프로세스가 압축했으면 스냅샷부터 다시)"""
+        if self._rows is not None and self._stat_snapshots() != self._snapshot_stat:
+            self._rows = None
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            if self._rows is None or self._log_id is not None:
+                self._load_snapshots()
+                self._log_id, self._offset, self.event_count = None, 0, 0
+            return
+
+        log_stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._rows is not None and log_stat == self._log_stat:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            log_id = (os.fstat(f.fileno()).st_ino, f.readline().decode('utf-8', 'replace'))
+            if self._rows is None or log_id != self._log_id:
+                self._load_snapshots()
+                self._log_id, self._offset, self.event_count = log_id, f.tell(), 0
+            f.seek(self._offset)
+            data = f.read()
+
+        # 마지막 줄이 아직 다 쓰이지 않았으면(또는 비정상 종료로 잘렸으면) 다음에 다시 읽음
+        end = data.rfind(b'\n')
+        if end == -1:
+            self._log_stat = log_stat if not data else None
+            return
+        for line in data[:end + 1].splitlines():
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._apply(event['changes'])
+            self.event_count += 1
+        self._offset += end + 1
+        # 잘린 줄이 남아 있으면 다음 요청에서 다시 확인
+        self._log_stat = log_stat if end + 1 == len(data) else None
+
+    def _apply(self, changes):
+        for change in changes:
+            collection = change['collection']
+            rows = self._rows[collection]
+            if change['op'] == 'insert':
+                row = dict(change['row'])
+                if row['id'] in rows:
+                    self._unindex_row(collection, rows[row['id']])
+                rows[row['id']] = row
+                self._index_row(collection, row)
+                if row['id'] > self._last_ids[collection]:
+                    self._last_ids[collection] = row['id']
+            elif change['op'] == 'update':
+                row = rows.get(change['id'])
+                if row is not None:
+                    self._unindex_row(collection, row)
+                    row.update(change['fields'])
+                    self._index_row(collection, row)
+            elif change['op'] == 'delete':
+                row = rows.pop(change['id'], None)
+                if row is not None:
+                    self._unindex_row(collection, row)
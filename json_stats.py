@@ -0,0 +1,77 @@
+"""
+JSON 백엔드 관리자 통계
+
+팀 × 구매내역 이중 루프 대신, 승인된 금액을 (team_id, 예산 종류)별로 한 번에 합산합니다.
+기본은 순수 파이썬 한 번 순회입니다. use_numpy=True 이면 np.bincount 로 합산하지만,
+행이 dict 목록이라 열을 뽑는 비용이 더 커서 10만 행에서도 빠르지 않습니다
+(benchmarks/bench_json_admin_stats.py 참고). 데이터를 배열로 들고 있게 되면 그때 기본값을 바꿉니다.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 는 선택 사항
+    np = None
+
+
+def _approved(row_lists):
+    for rows in row_lists:
+        for row in rows:
+            if row['is_approved']:
+                yield row
+
+
+def aggregate_usage_python(row_lists):
+    """{(team_id, 'department'|'student'): 승인 금액 합계} - 한 번 순회"""
+    used = {}
+    for row in _approved(row_lists):
+        key = (row['team_id'], 'department' if row['budget_type'] == 'department' else 'student')
+        used[key] = used.get(key, 0) + row['total_amount']
+    return used
+
+
+def aggregate_usage_numpy(row_lists):
+    """aggregate_usage_python 과 같은 결과(값과 int/float 타입)를 np.bincount 로 계산"""
+    approved = list(_approved(row_lists))
+    if not approved:
+        return {}
+    team_ids = np.fromiter((row['team_id'] for row in approved), dtype=np.int64, count=len(approved))
+    if team_ids.min() < 0:
+        return aggregate_usage_python(row_lists)
+    amounts = np.fromiter((row['total_amount'] for row in approved), dtype=np.float64, count=len(approved))
+    is_department = np.fromiter((row['budget_type'] == 'department' for row in approved), dtype=bool, count=len(approved))
+    # 파이썬 sum 처럼 정수만 더한 합계는 int 로 돌려줌 (화면에 120000.0 이 아니라 120000)
+    is_float = np.fromiter((not isinstance(row['total_amount'], int) for row in approved), dtype=bool, count=len(approved))
+
+    used = {}
+    for budget_type, mask in (('department', is_department), ('student', ~is_department)):
+        counts = np.bincount(team_ids[mask])
+        sums = np.bincount(team_ids[mask], weights=amounts[mask])
+        float_counts = np.bincount(team_ids[mask], weights=is_float[mask])
+        for team_id in np.nonzero(counts)[0]:
+            total = float(sums[team_id])
+            used[(int(team_id), budget_type)] = total if float_counts[team_id] else int(round(total))
+    return used
+
+
+def aggregate_usage(row_lists, use_numpy=False):
+    """승인 금액을 (team_id, 예산 종류)별로 합산 (NumPy 가 없으면 use_numpy 는 무시)"""
+    if use_numpy and np is not None:
+        return aggregate_usage_numpy(row_lists)
+    return aggregate_usage_python(row_lists)
+
+
+def apply_team_usage(teams, *row_lists, use_numpy=False):
+    """팀 dict 에 used/remaining/remaining_rate 등 관리자 화면용 필드를 채움"""
+    used = aggregate_usage(row_lists, use_numpy=use_numpy)
+    for team in teams:
+        team['used_department'] = used.get((team['id'], 'department'), 0)
+        team['used_student'] = used.get((team['id'], 'student'), 0)
+
+        # 잔여 예산 계산
+        team['remaining_department'] = team['department_budget'] - team['used_department']
+        team['remaining_student'] = team['student_budget'] - team['used_student']
+        team['total_budget'] = team['department_budget'] + team['student_budget']
+        team['total_used'] = team['used_department'] + team['used_student']
+        team['total_remaining'] = team['total_budget'] - team['total_used']
+        team['remaining_rate'] = (team['total_remaining'] / team['total_budget'] * 100) if team['total_budget'] > 0 else 0
+    return teams
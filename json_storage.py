@@ -0,0 +1,91 @@
+"""
+JSON 파일 저장소 (스레드/프로세스 안전)
+
+- 저장은 임시 파일에 쓴 뒤 os.replace 로 교체 (중간에 죽어도 파일이 잘리지 않음)
+- fcntl.flock 으로 gunicorn 워커 프로세스 간, RLock 으로 같은 프로세스 스레드 간 잠금
+- 읽기-수정-쓰기를 한 잠금 안에서 처리하면 동시 승인 요청에서도 변경이 사라지지 않음
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows 에서는 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+
+def atomic_write_json(file_path, data):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 원자적으로 교체"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonStorage:
+    """데이터 디렉토리 전체에 대한 잠금과 원자적 저장"""
+
+    def __init__(self, data_dir, lock_name='.data.lock'):
+        self.data_dir = data_dir
+        self.lock_path = os.path.join(data_dir, lock_name)
+        self._thread_lock = threading.RLock()
+        self._local = threading.local()
+        self._lock_file = None
+        self._lock_pid = None
+
+    def _lock_fd(self):
+        # fork 이후에는 부모와 같은 파일 디스크립터를 공유하지 않도록 다시 연다
+        if self._lock_file is None or self._lock_pid != os.getpid():
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._lock_file = open(self.lock_path, 'a+')
+            self._lock_pid = os.getpid()
+        return self._lock_file.fileno()
+
+    @contextmanager
+    def locked(self, shared=False):
+        """데이터 잠금 (같은 스레드에서 중첩 가능, 바깥 잠금 하나만 실제로 flock)"""
+        with self._thread_lock:
+            depth = getattr(self._local, 'depth', 0)
+            if depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_fd(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+                if depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_fd(), fcntl.LOCK_UN)
+
+    def exclusive(self, view):
+        """뷰 함수 전체를 배타 잠금 안에서 실행하는 데코레이터 (읽기-수정-쓰기 라우트용)"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with self.locked():
+                return view(*args, **kwargs)
+        return wrapper
+
+    def load(self, file_path):
+        """공유 잠금으로 JSON 파일 읽기 (없으면 빈 dict)"""
+        with self.locked(shared=True):
+            if not os.path.exists(file_path):
+                return {}
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def save(self, file_path, data):
+        """배타 잠금으로 JSON 파일 원자적 저장"""
+        with self.locked():
+            atomic_write_json(file_path, data)
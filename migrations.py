@@ -0,0 +1,133 @@
+"""
+버전별 DB 마이그레이션 (SQLite / PostgreSQL 공용)
+
+schema_migrations 테이블에 적용한 버전을 기록하고, 아직 적용하지 않은 마이그레이션만 버전 순서대로 실행합니다.
+- 마이그레이션 하나 = 트랜잭션 하나 (변경과 기록이 함께 커밋되므로 중간에 실패하면 다음 시작 때 다시 시도)
+- 단계는 "없으면 추가" 형태(add_column, create_index)라 create_all 로 만든 새 DB 에 실행해도 안전
+- 컬럼/인덱스 확인은 SQLAlchemy inspect 로 (SQLite PRAGMA 나 PostgreSQL 카탈로그를 직접 쓰지 않음)
+- 여러 워커가 동시에 시작해도 한 번만: PostgreSQL 은 advisory lock, SQLite 는 DB 파일 옆 잠금 파일(flock)
+  (잠금을 못 쓰는 환경에서는 버전 기록 충돌이나 "이미 있음" 오류를 이미 적용된 것으로 보고 건너뜀)
+"""
+
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+try:
+    import fcntl
+except ImportError:  # Windows 에서는 파일 잠금 없이 "이미 있음" 오류만 건너뜀
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_ID = 31050023  # pg_advisory_xact_lock 키 (이 앱의 마이그레이션 전용)
+# 다른 워커가 먼저 같은 단계를 실행한 경우의 SQLite 오류 (인덱스/테이블 already exists, duplicate column name)
+ALREADY_APPLIED_MESSAGES = ('already exists', 'duplicate column')
+
+metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class Migration:
+    """버전 번호, 설명, upgrade(connection) 함수"""
+
+    def __init__(self, version, name, upgrade):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+
+    def __repr__(self):
+        return f'<Migration {self.version} {self.name}>'
+
+
+def has_table(connection, table):
+    return inspect(connection).has_table(table)
+
+
+def add_column(connection, table, column, ddl_type):
+    """테이블이 있고 컬럼이 없을 때만 ALTER TABLE ... ADD COLUMN → 추가했으면 True"""
+    if not has_table(connection, table):
+        return False
+    if column in {col['name'] for col in inspect(connection).get_columns(table)}:
+        return False
+    connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+    logger.info(f"{table}.{column} 컬럼을 추가했습니다.")
+    return True
+
+
+def create_index(connection, index):
+    """테이블이 있고 같은 이름의 인덱스가 없을 때만 생성 → 생성했으면 True"""
+    table = index.table.name
+    if not has_table(connection, table):
+        return False
+    if index.name in {ix['name'] for ix in inspect(connection).get_indexes(table)}:
+        return False
+    index.create(connection)
+    logger.info(f"인덱스 {index.name} 를 만들었습니다.")
+    return True
+
+
+def applied_versions(connection):
+    return {row.version for row in connection.execute(select(schema_migrations.c.version))}
+
+
+def pending_migrations(engine, migrations):
+    """아직 적용하지 않은 마이그레이션 목록 (버전 순)"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = applied_versions(connection)
+    return [m for m in sorted(migrations, key=lambda m: m.version) if m.version not in applied]
+
+
+@contextmanager
+def sqlite_migration_lock(engine):
+    """SQLite 파일 DB: '<DB 파일>.migrate.lock' 을 flock 해서 워커들의 마이그레이션을 하나씩 실행
+    (PostgreSQL 은 트랜잭션 안의 advisory lock 이 같은 역할)"""
+    database = engine.url.database
+    if engine.dialect.name != 'sqlite' or fcntl is None or not database or database == ':memory:':
+        yield
+        return
+    with open(database + '.migrate.lock', 'a+') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def migrate(engine, migrations):
+    """적용하지 않은 마이그레이션을 순서대로 실행 → 이번에 적용한 버전 목록"""
+    applied_now = []
+    with sqlite_migration_lock(engine):
+        for migration in pending_migrations(engine, migrations):
+            try:
+                with engine.begin() as connection:
+                    if connection.dialect.name == 'postgresql':
+                        connection.execute(text('SELECT pg_advisory_xact_lock(:id)'), {'id': ADVISORY_LOCK_ID})
+                    if migration.version in applied_versions(connection):
+                        continue  # 잠금을 기다리는 동안 다른 워커가 적용함
+                    migration.upgrade(connection)
+                    connection.execute(schema_migrations.insert().values(
+                        version=migration.version, name=migration.name, applied_at=datetime.utcnow()))
+            except IntegrityError:
+                # SQLite(잠금 없음): 다른 프로세스가 같은 버전을 먼저 기록 (단계는 모두 "없으면 추가"라 결과는 같음)
+                continue
+            except OperationalError as e:
+                # SQLite(잠금 없음): 확인과 생성 사이에 다른 프로세스가 같은 인덱스/컬럼을 먼저 만듦
+                if not any(message in str(e.orig) for message in ALREADY_APPLIED_MESSAGES):
+                    raise
+                logger.info(f"마이그레이션 {migration.version} 은 다른 워커가 적용 중입니다 - 건너뜀",
+                            extra={'migration_version': migration.version})
+                continue
+            logger.info(f"🗄️ 마이그레이션 {migration.version} 적용: {migration.name}",
+                        extra={'migration_version': migration.version})
+            applied_now.append(migration.version)
+    return applied_now
@@ -3,8 +3,13 @@
 간단한 Flask 서버 (Flask-WTF 없이)
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, make_response
+from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, make_response, jsonify, Response, stream_with_context, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import Pool
 import os
 import json
 from datetime import datetime
@@ -13,8 +18,31 @@ from werkzeug.utils import secure_filename
 import uuid
 import io
 import csv
-import requests
+import tempfile
+import re
+import time
+import heapq
+import hashlib
+from contextlib import contextmanager
+from urllib.parse import quote
 from config import ALLOWED_IPS, ADMIN_USERNAME, ADMIN_PASSWORD, HOST, PORT, DEBUG
+from backup_queue import BackupWorker, register_shutdown
+from backup_journal import ChangeJournal, journal_filename, replay_lines
+from github_sync import GitHubSync
+from backup_snapshot import build_snapshot, iter_snapshot
+from startup_task import StartupTask
+from metrics import MetricsRegistry
+from migrations import Migration, migrate, pending_migrations, has_table, add_column, create_index
+from sqlite_tuning import sqlite_pragmas, install_pragmas, retry_locked
+import threading
+import logging
+from app_logging import setup_logging, new_request_id, set_request_id, reset_request_id
+
+# 로그 설정 - JSON 한 줄 로그(LOG_FORMAT=text 면 사람이 읽는 형식), 출력은 백그라운드 스레드가 담당
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT)
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
@@ -30,15 +58,51 @@ if db_url:
         if '+psycopg' not in db_url:
             db_url = db_url.replace('postgresql://', 'postgresql+psycopg://', 1)
     app.config['SQLALCHEMY_DATABASE_URI'] = db_url
-    print("🌐 PostgreSQL 데이터베이스 사용")
+    logger.info("🌐 PostgreSQL 데이터베이스 사용")
 else:
     db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budget_management.db')
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-    print(f"💾 SQLite 데이터베이스 사용: {db_path}")
+    logger.info(f"💾 SQLite 데이터베이스 사용: {db_path}")
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-# 연결 유지를 위해 pre_ping 설정(클라우드 DB에서 유용)
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True}
+
+def database_engine_options(url, env=os.environ):
+    """DB_* 환경 변수 → SQLAlchemy 엔진 옵션
+    pre_ping 은 빌려줄 때마다 연결을 확인해 끊긴 연결(무료 Render DB 는 유휴 연결을 끊음)을 새로 만듦.
+    PostgreSQL 만 풀 크기/재활용 주기, 접속/문 제한 시간, TCP keepalive, psycopg 3 준비된 문(prepared statement) 설정"""
+    options = {'pool_pre_ping': env.get('DB_POOL_PRE_PING', '1') == '1'}
+    if not url.startswith('postgresql'):
+        return options
+    options.update(
+        pool_size=int(env.get('DB_POOL_SIZE', '5')),
+        max_overflow=int(env.get('DB_MAX_OVERFLOW', '5')),
+        pool_timeout=float(env.get('DB_POOL_TIMEOUT', '10')),
+        pool_recycle=int(env.get('DB_POOL_RECYCLE', '280')),  # 서버/프록시가 끊기 전에 먼저 교체 (초, -1 이면 끔)
+    )
+    connect_args = {
+        'connect_timeout': int(env.get('DB_CONNECT_TIMEOUT', '10')),
+        'keepalives': 1,
+        'keepalives_idle': int(env.get('DB_KEEPALIVES_IDLE', '30')),
+    }
+    statement_timeout = int(env.get('DB_STATEMENT_TIMEOUT_MS', '30000'))
+    if statement_timeout > 0:
+        connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+    # psycopg 3: 같은 문을 이 횟수만큼 실행하면 서버에 준비된 문으로 만듦 (off: PgBouncer transaction 모드 등에서 끔)
+    prepare_threshold = env.get('DB_PREPARE_THRESHOLD', '5')
+    if '+psycopg' in url and '+psycopg2' not in url:
+        connect_args['prepare_threshold'] = None if prepare_threshold == 'off' else int(prepare_threshold)
+    options['connect_args'] = connect_args
+    return options
+
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# SQLite 성능 모드 - 연결마다 WAL/synchronous/busy_timeout/mmap/cache PRAGMA (SQLITE_TUNING=0 이면 끔)
+# busy_timeout 을 넘겨 "database is locked" 로 실패한 쓰기 요청은 롤백 후 백오프하고 다시 실행 (아래 retry_locked_writes)
+IS_SQLITE = app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite')
+SQLITE_WRITE_RETRIES = int(os.environ.get('SQLITE_WRITE_RETRIES', '3'))  # 0 이면 재시도 안 함
+SQLITE_RETRY_BASE_MS = float(os.environ.get('SQLITE_RETRY_BASE_MS', '50'))  # 첫 재시도 대기 (회마다 2배, ±50% 지터)
+if IS_SQLITE:
+    install_pragmas(sqlite_pragmas())
 
 # 파일 업로드 설정
 UPLOAD_FOLDER = 'uploads'
@@ -50,11 +114,84 @@ app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB 제한 (견적서용)
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# JSON 백업 폴더 생성
-JSON_BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'json_backup')
+# JSON 백업 폴더 생성 (JSON_BACKUP_DIR 로 바꾸면 벤치마크/테스트가 저장소의 json_backup 을 건드리지 않음)
+JSON_BACKUP_DIR = os.environ.get('JSON_BACKUP_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'json_backup')
 if not os.path.exists(JSON_BACKUP_DIR):
     os.makedirs(JSON_BACKUP_DIR)
 
+# 백그라운드 백업 설정 - 요청마다 백업하지 않고 디바운스 구간마다 한 번만 스냅샷
+BACKUP_ASYNC = os.environ.get('BACKUP_ASYNC', '1').lower() in ('1', 'true', 'yes')
+BACKUP_DEBOUNCE_SECONDS = float(os.environ.get('BACKUP_DEBOUNCE_SECONDS', '2'))
+BACKUP_QUEUE_SIZE = int(os.environ.get('BACKUP_QUEUE_SIZE', '100'))
+
+# 백업 방식 - 'full'(매번 전체 스냅샷) 또는 'incremental'(변경된 행만 저널에 추가, 주기적으로 압축)
+BACKUP_MODE = os.environ.get('BACKUP_MODE', 'full').lower()
+BACKUP_COMPACT_EVERY = int(os.environ.get('BACKUP_COMPACT_EVERY', '500'))
+BACKUP_COMPACT_SECONDS = float(os.environ.get('BACKUP_COMPACT_SECONDS', '3600'))
+change_journal = ChangeJournal(JSON_BACKUP_DIR,
+                               compact_every=BACKUP_COMPACT_EVERY,
+                               compact_seconds=BACKUP_COMPACT_SECONDS)
+
+# 압축 바이너리 스냅샷 - 전체 백업 때 JSON 과 함께 snapshot.bin 도 저장하고, 복원은 이 파일을 먼저 시도
+BACKUP_SNAPSHOT = os.environ.get('BACKUP_SNAPSHOT', '0').lower() in ('1', 'true', 'yes')
+SNAPSHOT_FILENAME = 'snapshot.bin'
+
+# 시작 방식 - 'blocking'(기본값, 복원이 끝난 뒤 서버 시작) 또는 'lazy'(바로 서버 시작, 복원은 백그라운드)
+# lazy 모드에서는 복원이 끝날 때까지 읽기만 허용하고 /health 가 503(warming)을 반환
+STARTUP_MODE = os.environ.get('STARTUP_MODE', 'blocking').lower()
+RESTORE_ON_BOOT = os.environ.get('RESTORE_ON_BOOT', '0').lower() in ('1', 'true', 'yes')
+
+# 지표 (/metrics, Prometheus 텍스트 형식) - 프로세스별로 집계
+metrics = MetricsRegistry()
+REQUEST_LATENCY = metrics.histogram('mse_http_request_duration_seconds', '라우트별 요청 처리 시간', ('route', 'method'))
+REQUEST_COUNT = metrics.counter('mse_http_requests_total', '라우트별 요청 수', ('route', 'method', 'status'))
+SQL_STATEMENT_DURATION = metrics.histogram('mse_sql_statement_duration_seconds', 'SQL 문 하나의 실행 시간', ('operation',),
+                                           buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+SQL_STATEMENTS_PER_REQUEST = metrics.histogram('mse_sql_statements_per_request', '요청 하나가 실행한 SQL 문 수', ('route',),
+                                               buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+SQL_SECONDS_PER_REQUEST = metrics.histogram('mse_sql_seconds_per_request', '요청 하나의 SQL 실행 시간 합계', ('route',))
+BACKUP_DURATION = metrics.histogram('mse_backup_duration_seconds', '백업 실행 시간', ('mode', 'result'),
+                                    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+BACKUP_QUEUE_WAIT = metrics.histogram('mse_backup_queue_wait_seconds', '첫 백업 예약부터 실행 시작까지 대기 시간 (디바운스 포함)',
+                                      buckets=(0.5, 1.0, 2.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+BACKUP_QUEUE_DEPTH = metrics.gauge('mse_backup_queue_depth', '백업 대기 큐 길이')
+BACKUP_DROPPED = metrics.gauge('mse_backup_queue_dropped', '큐가 가득 차 합쳐진 백업 예약 수 (누적)')
+GITHUB_LATENCY = metrics.histogram('mse_github_request_duration_seconds', 'GitHub API 호출 시간', ('kind', 'method'))
+GITHUB_ERRORS = metrics.counter('mse_github_errors_total', 'GitHub API 오류 (4xx/5xx 응답 또는 예외=status "error")',
+                                ('kind', 'method', 'status'))
+# SQL 프로파일링 (선택) - 요청별 SQL 수/시간/가장 느린 문을 모으고 Server-Timing 헤더로 브라우저 개발자 도구에 표시
+SQL_PROFILE = os.environ.get('SQL_PROFILE', '0').lower() in ('1', 'true', 'yes')
+SQL_PROFILE_SLOW_MS = float(os.environ.get('SQL_PROFILE_SLOW_MS', '200'))  # 이 시간을 넘는 요청은 SQL 내역을 출력
+SQL_PROFILE_TOP = int(os.environ.get('SQL_PROFILE_TOP', '5'))  # 느린 요청 로그에 보여줄 SQL 문 수
+
+DB_POOL_CONNECTIONS = metrics.gauge('mse_db_pool_connections', 'DB 연결 풀 상태 (state=checked_out 사용 중, checked_in 대기, overflow 초과 연결)',
+                                    ('state',))
+DB_POOL_SIZE = metrics.gauge('mse_db_pool_size', 'DB 연결 풀 크기 (DB_POOL_SIZE)')
+DB_CONNECTS = metrics.counter('mse_db_connections_opened_total', '새로 연 DB 연결 수')
+DB_INVALIDATED = metrics.counter('mse_db_connections_invalidated_total', '끊겨서 버린 DB 연결 수 (pre_ping 실패, 연결 오류)')
+DB_LOCK_RETRIES = metrics.counter('mse_db_lock_retries_total', 'SQLite 잠금(database is locked)으로 다시 실행한 쓰기 요청 수', ('route',))
+STARTUP_READY = metrics.gauge('mse_startup_ready', '부팅 작업(복원) 완료 여부 (1=준비 완료)')
+
+def record_github_request(kind, method, seconds, status):
+    """GitHubSync 세션의 요청마다 호출"""
+    GITHUB_LATENCY.observe(seconds, kind=kind, method=method)
+    if status is None or status >= 400:
+        GITHUB_ERRORS.inc(kind=kind, method=method, status=str(status) if status else 'error')
+
+# GitHub 백업 저장소 설정 (GITHUB_API_URL을 바꾸면 로컬 가짜 서버로 테스트 가능)
+GITHUB_REPO = os.environ.get('GITHUB_REPO', 'lbin817/MSE')
+GITHUB_BRANCH = os.environ.get('GITHUB_BRANCH', 'main')
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+github_sync = GitHubSync(GITHUB_REPO, branch=GITHUB_BRANCH, base_path='json_backup',
+                         api_url=GITHUB_API_URL,
+                         cache_file=os.path.join(JSON_BACKUP_DIR, '.github_sync_cache.json'),
+                         on_request=record_github_request)
+
+# 커밋되었지만 아직 저널에 기록되지 않은 변경분 {테이블: {id: 'upsert' 또는 'delete'}}
+_pending_changes = {}
+_pending_lock = threading.Lock()
+_full_backup_requested = False
+
 db = SQLAlchemy(app)
 
 def is_allowed_ip(ip):
@@ -70,289 +207,412 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def get_teams_ordered():
-    """조 순서를 올바르게 정렬하여 반환 (월요일 1조~4조, 화요일 1조~7조)"""
-    teams = Team.query.all()
+# 조 목록 캐시 - 조 정보는 관리자 수정/승인 때만 바뀌므로 프로세스 메모리에 보관하고,
+# DB의 버전 번호(cache_version 테이블)가 바뀌었을 때만 다시 읽음 (gunicorn 워커 간 공유)
+TEAM_DAY_ORDER = {'월요일': 0, '화요일': 1}
+TEAM_NAME_PATTERN = re.compile(r'(\d+)\s*조')
+_teams_cache = {'version': None, 'teams': []}
+
+class CachedTeam:
+    """캐시에 보관하는 조 정보 (세션과 분리된 읽기 전용 복사본)"""
+    __slots__ = ('id', 'name', 'leader_name', 'department_budget', 'student_budget',
+                 'original_department_budget', 'original_student_budget', 'sort_key')
     
-    # 조 이름을 기준으로 정렬
-    def team_sort_key(team):
-        name = team.name
-        if '월요일' in name:
-            # 월요일 1조, 2조, 3조, 4조 순서
-            if '1조' in name:
-                return 1
-            elif '2조' in name:
-                return 2
-            elif '3조' in name:
-                return 3
-            elif '4조' in name:
-                return 4
-            else:
-                return 5  # 기타 월요일 조
-        elif '화요일' in name:
-            # 화요일 1조, 2조, 3조, 4조, 5조, 6조, 7조 순서
-            if '1조' in name:
-                return 6
-            elif '2조' in name:
-                return 7
-            elif '3조' in name:
-                return 8
-            elif '4조' in name:
-                return 9
-            elif '5조' in name:
-                return 10
-            elif '6조' in name:
-                return 11
-            elif '7조' in name:
-                return 12
-            else:
-                return 13  # 기타 화요일 조
-        else:
-            return 99  # 기타 조들은 맨 뒤로
+    def __init__(self, team):
+        for attr in self.__slots__[:-1]:
+            setattr(self, attr, getattr(team, attr))
+        self.sort_key = team_sort_key(team.name)
     
-    return sorted(teams, key=team_sort_key)
+    def __repr__(self):
+        return f'<CachedTeam {self.name}>'
+
+def team_sort_key(name):
+    """조 이름에서 요일/번호를 한 번만 파싱해 정렬 키 생성 (월요일 1조~4조, 화요일 1조~7조, 기타 조는 맨 뒤)"""
+    day_rank = next((rank for day, rank in TEAM_DAY_ORDER.items() if day in name), len(TEAM_DAY_ORDER))
+    match = TEAM_NAME_PATTERN.search(name)
+    number = int(match.group(1)) if match else 99
+    return (day_rank, number, name)
+
+def get_teams_ordered():
+    """조 순서를 올바르게 정렬하여 반환 (캐시 사용, DB 버전이 바뀌었을 때만 다시 조회)"""
+    version = get_cache_version(TEAMS_CACHE_KEY)
+    cache = _teams_cache
+    if cache['version'] != version:
+        teams = [CachedTeam(team) for team in Team.query.all()]
+        teams.sort(key=lambda team: team.sort_key)
+        cache = {'version': version, 'teams': teams}
+        _teams_cache.update(cache)
+    return list(cache['teams'])
 
 # GitHub API 함수들
-def upload_to_github(filename, content):
-    """GitHub에 JSON 파일 업로드"""
+def upload_to_github(files, clear=()):
+    """{파일명: 내용} 중 바뀐 파일만 단일 커밋으로 GitHub에 업로드 (clear 의 파일은 GitHub 에 내용이 있을 때만 비움)"""
     try:
         # GitHub API 토큰 (환경변수에서 가져오기)
         token = os.environ.get('GITHUB_TOKEN')
         if not token:
-            print("❌ GitHub 토큰이 설정되지 않았습니다.")
+            logger.error("❌ GitHub 토큰이 설정되지 않았습니다.")
             return False
         
-        print(f"🔄 {filename} GitHub 업로드 시도...")
-        
-        # GitHub API URL
-        url = f"https://api.github.com/repos/lbin817/MSE/contents/json_backup/{filename}"
-        
-        # 기존 파일 정보 가져오기
-        headers = {
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'MSE-Budget-System'
-        }
-        
-        response = requests.get(url, headers=headers)
-        sha = None
-        if response.status_code == 200:
-            sha = response.json().get('sha')
-            print(f"📄 기존 {filename} 파일 발견 (SHA: {sha[:10]}...)")
-        else:
-            print(f"📄 새로운 {filename} 파일 생성")
-        
-        # 파일 업로드 (Base64 인코딩)
-        import base64
-        encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-        print(f"📦 {filename} Base64 인코딩 완료 (크기: {len(encoded_content)} bytes)")
-        
-        data = {
-            'message': f'Update {filename} - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
-            'content': encoded_content
-        }
-        
-        if sha:
-            data['sha'] = sha
-        
-        response = requests.put(url, headers=headers, json=data)
-        
-        if response.status_code in [200, 201]:
-            print(f"✅ {filename} GitHub 업로드 성공!")
+        logger.info(f"🔄 {len(files)}개 파일 GitHub 동기화 시도...")
+        success, uploaded = github_sync.sync(files, token, clear=clear)
+        if success:
+            if uploaded:
+                logger.info(f"✅ GitHub 업로드 성공! ({uploaded}개 파일 변경, 커밋 1개)")
+            else:
+                logger.info("✅ 변경된 파일이 없어 GitHub 업로드를 건너뜁니다.")
             return True
-        else:
-            print(f"❌ {filename} GitHub 업로드 실패: {response.status_code}")
-            print(f"❌ 응답 내용: {response.text[:200]}...")
-            return False
+        logger.error("❌ GitHub 업로드 실패")
+        return False
             
     except Exception as e:
-        print(f"❌ GitHub 업로드 오류: {e}")
+        logger.exception(f"❌ GitHub 업로드 오류: {e}")
         return False
 
-def download_from_github(filename):
-    """GitHub에서 JSON 파일 다운로드"""
+def download_from_github(filename, binary=False, missing_ok=False):
+    """GitHub에서 JSON 파일 다운로드 (binary=True면 원본 bytes 그대로, missing_ok=True면 없는 파일(404)은 빈 문자열)"""
     try:
         # GitHub API URL
-        url = f"https://api.github.com/repos/lbin817/MSE/contents/json_backup/{filename}"
+        url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/contents/json_backup/{filename}"
         
         # 토큰이 있으면 인증 헤더 추가
         token = os.environ.get('GITHUB_TOKEN')
-        headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'MSE-Budget-System'
-        }
-        
+        headers = {}
         if token:
             headers['Authorization'] = f'token {token}'
+        if binary:
+            # raw 형식은 base64 JSON 과 달리 1MB 넘는 파일도 받을 수 있음
+            headers['Accept'] = 'application/vnd.github.raw'
         
-        print(f"🔄 {filename} GitHub 다운로드 시도...")
-        response = requests.get(url, headers=headers)
+        logger.info(f"🔄 {filename} GitHub 다운로드 시도...")
+        response = github_sync.session.get(url, headers=headers, params={'ref': GITHUB_BRANCH},
+                                           timeout=github_sync.timeout)
         
+        if response.status_code == 200 and binary:
+            logger.info(f"✅ {filename} GitHub 다운로드 성공! ({len(response.content):,} bytes)")
+            return response.content
         if response.status_code == 200:
             content = response.json().get('content', '')
             # Base64 디코딩
             import base64
             decoded_content = base64.b64decode(content).decode('utf-8')
-            print(f"✅ {filename} GitHub 다운로드 성공!")
+            logger.info(f"✅ {filename} GitHub 다운로드 성공!")
             return decoded_content
+        elif response.status_code == 404 and missing_ok:
+            logger.info(f"{filename} 이 GitHub 에 없습니다 (변경분 없음)")
+            return ''
         else:
-            print(f"❌ {filename} GitHub 다운로드 실패: {response.status_code}")
-            print(f"❌ 응답 내용: {response.text[:200]}...")
+            logger.error(f"❌ {filename} GitHub 다운로드 실패: {response.status_code}",
+                         extra={'response': response.text[:200]})
             return None
             
     except Exception as e:
-        print(f"❌ GitHub 다운로드 오류: {e}")
+        logger.exception(f"❌ GitHub 다운로드 오류: {e}")
+        return None
+
+def list_github_backup_files():
+    """GitHub json_backup 폴더의 {파일명: 크기} (요청 한 번), 받지 못하면 None"""
+    try:
+        url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/contents/json_backup"
+        token = os.environ.get('GITHUB_TOKEN')
+        headers = {'Authorization': f'token {token}'} if token else {}
+        response = github_sync.session.get(url, headers=headers, params={'ref': GITHUB_BRANCH},
+                                           timeout=github_sync.timeout)
+        if response.status_code == 404:
+            return {}
+        if response.status_code != 200:
+            logger.error(f"❌ GitHub 백업 폴더 목록 조회 실패: {response.status_code}",
+                         extra={'response': response.text[:200]})
+            return None
+        return {entry['name']: entry.get('size', 0) for entry in response.json() if entry.get('type') == 'file'}
+    except Exception as e:
+        logger.exception(f"❌ GitHub 백업 폴더 목록 조회 오류: {e}")
         return None
 
 # JSON 백업 함수들
+def drain_pending_changes():
+    """대기 중인 변경분을 꺼내고 비움"""
+    with _pending_lock:
+        changes = {table: dict(ops) for table, ops in _pending_changes.items()}
+        _pending_changes.clear()
+    return changes
+
+def requeue_pending_changes(changes):
+    """저널 기록에 실패한 변경분을 다시 대기열에 넣음 (그 사이 들어온 변경이 우선)"""
+    with _pending_lock:
+        for table, ops in changes.items():
+            merged = dict(ops)
+            merged.update(_pending_changes.get(table, {}))
+            _pending_changes[table] = merged
+
+def request_full_backup():
+    """다음 백업을 변경분 대신 전체 스냅샷으로 실행 (세션 이벤트를 거치지 않는 일괄 변경 후)"""
+    global _full_backup_requested
+    _full_backup_requested = True
+
+def serialize_team(team):
+    """팀 행을 백업용 dict로 변환"""
+    return {
+        "id": team.id,
+        "name": team.name,
+        "leader_name": team.leader_name or "",
+        "department_budget": team.department_budget,
+        "student_budget": team.student_budget,
+        "original_department_budget": getattr(team, 'original_department_budget', team.department_budget),
+        "original_student_budget": getattr(team, 'original_student_budget', team.student_budget)
+    }
+
+def serialize_purchase(purchase):
+    """구매내역 행을 백업용 dict로 변환 (total_amount, request_date는 복원 호환용 키)"""
+    return {
+        "id": purchase.id,
+        "team_id": purchase.team_id,
+        "item_name": purchase.item_name,
+        "quantity": purchase.quantity,
+        "estimated_cost": purchase.estimated_cost,
+        "total_amount": purchase.estimated_cost,
+        "link": purchase.link or "",
+        "store": purchase.store,
+        "budget_type": purchase.budget_type,
+        "attachment_filename": purchase.attachment_filename,
+        "request_date": purchase.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        "status": '승인됨' if purchase.is_approved else '대기중',
+        "is_approved": purchase.is_approved
+    }
+
+def serialize_multi_purchase(multi_purchase):
+    """다중 구매내역 행(품목 포함)을 백업용 dict로 변환"""
+    return {
+        "id": multi_purchase.id,
+        "team_id": multi_purchase.team_id,
+        "store": multi_purchase.store,
+        "budget_type": multi_purchase.budget_type,
+        "total_cost": multi_purchase.total_cost,
+        "total_amount": multi_purchase.total_cost,
+        "attachment_filename": multi_purchase.attachment_filename,
+        "items": [
+            {
+                "id": item.id,
+                "item_name": item.item_name,
+                "unit_price": item.unit_price,
+                "quantity": item.quantity,
+                "total_amount": item.unit_price * item.quantity
+            }
+            for item in multi_purchase.items
+        ],
+        "request_date": multi_purchase.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        "status": '승인됨' if multi_purchase.is_approved else '대기중',
+        "is_approved": multi_purchase.is_approved
+    }
+
+def serialize_other_request(other_request):
+    """기타 요청 행을 백업용 dict로 변환"""
+    return {
+        "id": other_request.id,
+        "team_id": other_request.team_id,
+        "content": other_request.content,
+        "request_date": other_request.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+def snapshot_value(value):
+    """스냅샷에 넣을 값 (datetime 은 ISO 문자열)"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def build_backup_snapshot():
+    """모든 테이블을 열 그대로 압축 스냅샷으로 생성 (ORM 객체를 만들지 않음)"""
+    def table_rows(table):
+        result = db.session.execute(db.select(table).order_by(table.c.id)
+                                    .execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield [snapshot_value(value) for value in row]
+    
+    return build_snapshot(
+        (model.__table__.name, [column.name for column in model.__table__.columns], table_rows(model.__table__))
+        for model in SNAPSHOT_MODELS
+    )
+
+def build_backup_contents():
+    """백업 파일 내용 {파일명: 내용} 생성 (JSON 은 str, 스냅샷은 bytes)"""
+    # 팀 데이터 백업
+    teams = Team.query.all()
+    teams_data = {"teams": [serialize_team(team) for team in teams]}
+    
+    # 구매내역 백업
+    purchases = Purchase.query.all()
+    purchases_data = {"purchases": [serialize_purchase(purchase) for purchase in purchases]}
+    
+    # 다중 구매내역 백업 (품목은 한 번에 로드)
+    multi_purchases = MultiPurchase.query.options(db.selectinload(MultiPurchase.items)).all()
+    multi_purchases_data = {"multi_purchases": [serialize_multi_purchase(mp) for mp in multi_purchases]}
+    
+    # 기타 요청 백업
+    other_requests = OtherRequest.query.all()
+    other_requests_data = {"other_requests": [serialize_other_request(r) for r in other_requests]}
+    
+    backup_contents = {
+        'teams.json': json.dumps(teams_data, ensure_ascii=False, indent=2),
+        'purchases.json': json.dumps(purchases_data, ensure_ascii=False, indent=2),
+        'multi_purchases.json': json.dumps(multi_purchases_data, ensure_ascii=False, indent=2),
+        'other_requests.json': json.dumps(other_requests_data, ensure_ascii=False, indent=2)
+    }
+    if BACKUP_SNAPSHOT:
+        backup_contents[SNAPSHOT_FILENAME] = build_backup_snapshot()
+    return backup_contents
+
+@change_journal.exclusive
+def write_full_backup():
+    """전체 스냅샷을 로컬 백업 폴더에 저장하고 저널을 비움 (저널 잠금 안에서 - 다른 워커의 백업/저널 추가와 겹치지 않음)"""
+    # 전체 스냅샷에 포함되므로 대기 중인 변경분은 버림
+    drain_pending_changes()
+    
+    # JSON 파일로 저장
+    backup_contents = build_backup_contents()
+    for filename, content in backup_contents.items():
+        file_path = os.path.join(JSON_BACKUP_DIR, filename)
+        logger.debug(f"💾 {filename} 저장: {file_path}")
+        if isinstance(content, bytes):
+            with open(file_path, 'wb') as f:
+                f.write(content)
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+    
+    # 스냅샷이 최신이므로 변경분 저널은 비움 (GitHub 의 저널도 다음 업로드에서 빈 파일로 - 예전 변경분을 다시 적용하지 않도록)
+    change_journal.reset()
+    return backup_contents
+
+def local_backup_files():
+    """로컬 백업 폴더의 현재 백업 파일 {파일명: 내용} - 저널은 incremental 모드만 (저널 잠금 안에서 호출)"""
+    filenames = [filename for filename, _, _ in RESTORE_FILES] + ([SNAPSHOT_FILENAME] if BACKUP_SNAPSHOT else [])
+    files = {}
+    for filename in filenames:
+        file_path = os.path.join(JSON_BACKUP_DIR, filename)
+        if not os.path.exists(file_path):
+            continue
+        if filename == SNAPSHOT_FILENAME:
+            with open(file_path, 'rb') as f:
+                files[filename] = f.read()
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                files[filename] = f.read()
+    if BACKUP_MODE == 'incremental':
+        files.update(change_journal.files(BACKUP_SERIALIZERS))
+    return files
+
+def upload_backup_files():
+    """로컬 백업 파일을 GitHub 에 올림 - 저널 잠금 밖에서 호출 (GitHub 응답을 기다리는 동안 다른 워커의 백업/저널 추가를 막지 않음)
+    워커 간 업로드 잠금 안에서 그 시점의 로컬 파일을 읽으므로, 먼저 시작한 업로드가 더 새 백업을 예전 내용으로 덮어쓰지 않음"""
+    with github_sync.locked():
+        with change_journal.locked():
+            files = local_backup_files()
+        # full 모드는 저널을 올리지 않고, incremental 때 올린 저널이 GitHub 에 남아 있을 때만 비움
+        clear = [] if BACKUP_MODE == 'incremental' else [journal_filename(table) for table in BACKUP_SERIALIZERS]
+        return upload_to_github(files, clear=clear)
+
 def backup_to_json():
-    """데이터베이스 데이터를 JSON 파일로 백업"""
+    """데이터베이스 데이터를 JSON 파일로 백업 (파일 저장은 저널 잠금 안에서, GitHub 업로드는 잠금을 푼 뒤)"""
     try:
-        print("🔄 JSON 백업 시작...")
-        print(f"📁 백업 디렉토리: {JSON_BACKUP_DIR}")
-        
-        # 팀 데이터 백업
-        teams = Team.query.all()
-        teams_data = {
-            "teams": [
-                {
-                    "id": team.id,
-                    "name": team.name,
-                    "leader_name": team.leader_name or "",
-                    "department_budget": team.department_budget,
-                    "student_budget": team.student_budget,
-                    "original_department_budget": getattr(team, 'original_department_budget', team.department_budget),
-                    "original_student_budget": getattr(team, 'original_student_budget', team.student_budget)
-                }
-                for team in teams
-            ]
-        }
-        
-        # 구매내역 백업
-        purchases = Purchase.query.all()
-        purchases_data = {
-            "purchases": [
-                {
-                    "id": purchase.id,
-                    "team_id": purchase.team_id,
-                    "item_name": purchase.item_name,
-                    "price": purchase.price,
-                    "quantity": purchase.quantity,
-                    "total_amount": purchase.total_amount,
-                    "store": purchase.store,
-                    "budget_type": getattr(purchase, 'budget_type', 'department'),
-                    "notes": purchase.notes or "",
-                    "attachment_filename": getattr(purchase, 'attachment_filename', None),
-                    "request_date": purchase.request_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    "status": purchase.status,
-                    "is_approved": purchase.is_approved
-                }
-                for purchase in purchases
-            ]
-        }
-        
-        # 다중 구매내역 백업
-        multi_purchases = MultiPurchase.query.all()
-        multi_purchases_data = {
-            "multi_purchases": [
-                {
-                    "id": multi_purchase.id,
-                    "team_id": multi_purchase.team_id,
-                    "store": multi_purchase.store,
-                    "budget_type": multi_purchase.budget_type,
-                    "notes": multi_purchase.notes or "",
-                    "total_amount": multi_purchase.total_amount,
-                    "items": [
-                        {
-                            "id": item.id,
-                            "item_name": item.item_name,
-                            "unit_price": item.unit_price,
-                            "quantity": item.quantity,
-                            "total_amount": item.total_amount
-                        }
-                        for item in multi_purchase.items
-                    ],
-                    "request_date": multi_purchase.request_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    "status": multi_purchase.status,
-                    "is_approved": multi_purchase.is_approved
-                }
-                for multi_purchase in multi_purchases
-            ]
-        }
-        
-        # 기타 요청 백업
-        other_requests = OtherRequest.query.all()
-        other_requests_data = {
-            "other_requests": [
-                {
-                    "id": request.id,
-                    "team_id": request.team_id,
-                    "request_type": request.request_type,
-                    "description": request.description,
-                    "request_date": request.request_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    "status": request.status,
-                    "is_approved": request.is_approved
-                }
-                for request in other_requests
-            ]
-        }
-        
-        # JSON 파일로 저장
-        teams_file = os.path.join(JSON_BACKUP_DIR, 'teams.json')
-        purchases_file = os.path.join(JSON_BACKUP_DIR, 'purchases.json')
-        multi_purchases_file = os.path.join(JSON_BACKUP_DIR, 'multi_purchases.json')
-        other_requests_file = os.path.join(JSON_BACKUP_DIR, 'other_requests.json')
-        
-        print(f"💾 팀 데이터 저장: {teams_file}")
-        with open(teams_file, 'w', encoding='utf-8') as f:
-            json.dump(teams_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"💾 구매내역 저장: {purchases_file}")
-        with open(purchases_file, 'w', encoding='utf-8') as f:
-            json.dump(purchases_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"💾 다중 구매내역 저장: {multi_purchases_file}")
-        with open(multi_purchases_file, 'w', encoding='utf-8') as f:
-            json.dump(multi_purchases_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"💾 기타 요청 저장: {other_requests_file}")
-        with open(other_requests_file, 'w', encoding='utf-8') as f:
-            json.dump(other_requests_data, f, ensure_ascii=False, indent=2)
-        
-        print("✅ JSON 백업 완료!")
-        
-        # GitHub에도 업로드 (토큰이 있을 때만)
-        print("🔄 GitHub에 백업 업로드...")
-        github_token = os.environ.get('GITHUB_TOKEN')
-        print(f"🔑 GitHub 토큰 확인: {'있음' if github_token else '없음'}")
-        if github_token:
-            print(f"🔑 토큰 길이: {len(github_token)}")
-            print(f"🔑 토큰 시작: {github_token[:10]}...")
-            
-            # 각 파일별로 업로드
-            files_to_upload = [
-                ('teams.json', teams_data), 
-                ('purchases.json', purchases_data), 
-                ('multi_purchases.json', multi_purchases_data), 
-                ('other_requests.json', other_requests_data)
-            ]
-            
-            success_count = 0
-            for filename, data in files_to_upload:
-                content = json.dumps(data, ensure_ascii=False, indent=2)
-                if upload_to_github(filename, content):
-                    success_count += 1
-            
-            print(f"📊 GitHub 업로드 결과: {success_count}/{len(files_to_upload)} 성공")
+        logger.info("🔄 JSON 백업 시작...", extra={'backup_dir': JSON_BACKUP_DIR})
+        backup_contents = write_full_backup()
+        logger.info("✅ JSON 백업 완료!", extra={'files': len(backup_contents)})
+        
+        # GitHub에도 업로드 (토큰이 있을 때만, 토큰 값은 로그에 남기지 않음)
+        if os.environ.get('GITHUB_TOKEN'):
+            # 바뀐 파일만 모아서 커밋 한 번으로 업로드
+            logger.info("🔄 GitHub에 백업 업로드...")
+            upload_backup_files()
         else:
-            print("⚠️ GitHub 토큰이 없어서 로컬 백업만 실행됩니다.")
+            logger.warning("⚠️ GitHub 토큰이 없어서 로컬 백업만 실행됩니다.")
         
         return True
         
     except Exception as e:
-        print(f"❌ JSON 백업 오류: {e}")
+        logger.exception(f"❌ JSON 백업 오류: {e}")
         return False
 
+@change_journal.exclusive
+def append_pending_changes():
+    """대기 중인 변경분의 현재 행을 저널에 추가하고 추가한 항목 수 반환 (실패하면 변경분을 대기열에 되돌림)
+    행 읽기와 저널 추가를 저널 잠금 안에서 하므로, 저널에는 여러 워커의 변경이 커밋 순서대로 쌓임"""
+    changes = drain_pending_changes()
+    try:
+        written = 0
+        for table, ops in changes.items():
+            model, serializer = BACKUP_SERIALIZERS[table]
+            upsert_ids = [row_id for row_id, op in ops.items() if op == 'upsert']
+            rows = {}
+            if upsert_ids:
+                query = model.query.filter(model.id.in_(upsert_ids))
+                if model is MultiPurchase:
+                    query = query.options(db.selectinload(MultiPurchase.items))
+                rows = {row.id: row for row in query.all()}
+            
+            entries = []
+            for row_id, op in ops.items():
+                if op == 'delete' or row_id not in rows:
+                    entries.append({'op': 'delete', 'id': row_id})
+                else:
+                    entries.append({'op': 'upsert', 'row': serializer(rows[row_id])})
+            written += change_journal.append(table, entries)
+        return written
+    except Exception:
+        requeue_pending_changes(changes)
+        raise
+
+def backup_incremental():
+    """변경된 행만 테이블별 저널에 추가하고 저널을 GitHub 에 올림 (저널이 커지면 전체 스냅샷으로 압축)"""
+    global _full_backup_requested
+    if _full_backup_requested or change_journal.needs_compaction():
+        _full_backup_requested = False
+        return backup_to_json()
+    
+    try:
+        written = append_pending_changes()
+    except Exception as e:
+        logger.exception(f"❌ 변경분 백업 오류: {e}")
+        return False
+    if not written:
+        return True
+    
+    logger.info(f"✅ 변경분 백업 완료: {written}개 행 (저널 누적 {change_journal.entry_count}개)")
+    
+    if change_journal.needs_compaction():
+        logger.info("🔄 저널 압축 - 전체 스냅샷 백업 실행")
+        return backup_to_json()
+    
+    # 저널 파일 전체를 올림 (실패해도 로컬 저널에 남아 있으므로 다음 백업 때 함께 올라감)
+    if os.environ.get('GITHUB_TOKEN'):
+        return upload_backup_files()
+    return True
+
+def run_backup_in_context():
+    """앱 컨텍스트를 열고 설정된 방식(BACKUP_MODE)으로 백업 실행"""
+    started = time.perf_counter()
+    success = False
+    try:
+        with app.app_context():
+            if BACKUP_MODE == 'incremental':
+                success = backup_incremental()
+            else:
+                success = backup_to_json()
+        return success
+    finally:
+        BACKUP_DURATION.observe(time.perf_counter() - started, mode=BACKUP_MODE,
+                                result='success' if success else 'failure')
+
+backup_worker = BackupWorker(run_backup_in_context,
+                             debounce_seconds=BACKUP_DEBOUNCE_SECONDS,
+                             max_pending=BACKUP_QUEUE_SIZE,
+                             on_complete=lambda seconds, waited, success: BACKUP_QUEUE_WAIT.observe(waited))
+register_shutdown(backup_worker)
+
+def schedule_backup(reason=''):
+    """데이터 변경 후 백업 예약 (BACKUP_ASYNC=0이면 즉시 동기 실행)"""
+    if BACKUP_ASYNC:
+        backup_worker.schedule(reason)
+    else:
+        run_backup_in_context()
+
 def save_uploaded_file(file):
     """업로드된 파일을 안전하게 저장"""
     if file and allowed_file(file.filename):
@@ -361,6 +621,7 @@ def save_uploaded_file(file):
         unique_filename = f"{uuid.uuid4()}_{filename}"
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
         file.save(file_path)
+        g.setdefault('saved_uploads', []).append(file_path)  # 잠금 재시도 전에 지울 수 있도록 기록
         return unique_filename
     return None
 
@@ -398,12 +659,18 @@ class Purchase(db.Model):
     
     team = db.relationship('Team', backref=db.backref('purchases', lazy=True))
     
+    # 조별 승인/예산 유형 조회(잔액, 장부 계산)와 관리자 목록 keyset 페이지 (created_at, id 내림차순)
+    __table_args__ = (
+        db.Index('ix_purchase_team_approval', 'team_id', 'is_approved', 'budget_type'),
+        db.Index('ix_purchase_created_at_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Purchase {self.item_name}>'
 
 class OtherRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -426,13 +693,18 @@ class MultiPurchase(db.Model):
     team = db.relationship('Team', backref=db.backref('multi_purchases', lazy=True))
     items = db.relationship('MultiPurchaseItem', backref='multi_purchase', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_multi_purchase_team_approval', 'team_id', 'is_approved', 'budget_type'),
+        db.Index('ix_multi_purchase_created_at_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<MultiPurchase {self.id}>'
 
 class MultiPurchaseItem(db.Model):
     """다중 품목 구매의 개별 품목"""
     id = db.Column(db.Integer, primary_key=True)
-    multi_purchase_id = db.Column(db.Integer, db.ForeignKey('multi_purchase.id'), nullable=False)
+    multi_purchase_id = db.Column(db.Integer, db.ForeignKey('multi_purchase.id'), nullable=False, index=True)
     item_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Integer, nullable=False)
@@ -440,6 +712,467 @@ class MultiPurchaseItem(db.Model):
     def __repr__(self):
         return f'<MultiPurchaseItem {self.item_name}>'
 
+class CacheVersion(db.Model):
+    """캐시 무효화용 버전 번호 (여러 워커 프로세스가 같은 값을 보도록 DB에 저장)"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CacheVersion {self.name}={self.version}>'
+
+class TeamLedger(db.Model):
+    """조별 예산 사용 장부 (승인/취소/삭제와 같은 트랜잭션에서 갱신)"""
+    id = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    budget_type = db.Column(db.String(50), nullable=False)  # 'department', 'student', 미승인은 'pending'
+    spent = db.Column(db.Integer, nullable=False, default=0)    # 승인된 금액 합계
+    pending = db.Column(db.Integer, nullable=False, default=0)  # 승인 대기 금액 합계
+    count = db.Column(db.Integer, nullable=False, default=0)    # 건수
+    
+    __table_args__ = (db.UniqueConstraint('team_id', 'budget_type'),)
+    
+    def __repr__(self):
+        return f'<TeamLedger {self.team_id} {self.budget_type}>'
+
+# 변경분 추적 (BACKUP_MODE=incremental 일 때 세션 이벤트로 바뀐 행 id를 모음)
+BACKUP_SERIALIZERS = {
+    'teams': (Team, serialize_team),
+    'purchases': (Purchase, serialize_purchase),
+    'multi_purchases': (MultiPurchase, serialize_multi_purchase),
+    'other_requests': (OtherRequest, serialize_other_request),
+}
+BACKUP_TABLE_BY_MODEL = {model: table for table, (model, _) in BACKUP_SERIALIZERS.items()}
+
+# 바이너리 스냅샷/일괄 복원 대상 (외래키 의존 순서 - 삭제는 역순)
+SNAPSHOT_MODELS = [Team, Purchase, MultiPurchase, MultiPurchaseItem, OtherRequest]
+
+def track_backup_changes(session, flush_context):
+    """flush 된 행들을 세션에 변경분으로 기록"""
+    changes = session.info.setdefault('backup_changes', {})
+    for op, objects in (('upsert', session.new), ('upsert', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            if isinstance(obj, MultiPurchaseItem):
+                # 품목 변경은 상위 다중 구매내역 행 갱신으로 기록 (상위 행 삭제가 우선)
+                if obj.multi_purchase_id is not None:
+                    changes.setdefault('multi_purchases', {}).setdefault(obj.multi_purchase_id, 'upsert')
+                continue
+            table = BACKUP_TABLE_BY_MODEL.get(type(obj))
+            if table and obj.id is not None:
+                changes.setdefault(table, {})[obj.id] = op
+
+def publish_backup_changes(session):
+    """커밋된 변경분을 백업 대기열로 옮김"""
+    changes = session.info.pop('backup_changes', None)
+    if not changes:
+        return
+    with _pending_lock:
+        for table, ops in changes.items():
+            _pending_changes.setdefault(table, {}).update(ops)
+
+def discard_backup_changes(session):
+    """롤백된 변경분은 버림"""
+    session.info.pop('backup_changes', None)
+
+if BACKUP_MODE == 'incremental':
+    event.listen(db.session, 'after_flush', track_backup_changes)
+    event.listen(db.session, 'after_commit', publish_backup_changes)
+    event.listen(db.session, 'after_rollback', discard_backup_changes)
+
+# 캐시 버전 (테이블별 변경 카운터 - 조 목록 캐시와 API ETag 에 사용)
+TEAMS_CACHE_KEY = 'teams'
+PURCHASES_CACHE_KEY = 'purchases'  # 구매/다중 구매/품목/장부 (잔액은 장부에서 계산되므로 함께)
+CHANGE_COUNTER_BY_MODEL = {
+    Team: TEAMS_CACHE_KEY,
+    Purchase: PURCHASES_CACHE_KEY,
+    MultiPurchase: PURCHASES_CACHE_KEY,
+    MultiPurchaseItem: PURCHASES_CACHE_KEY,
+    TeamLedger: PURCHASES_CACHE_KEY,
+}
+# 다른 워커의 커밋은 최대 이 시간(초) 뒤에 ETag 에 반영 (이 프로세스의 커밋은 바로 반영)
+CHANGE_COUNTER_TTL = float(os.environ.get('CHANGE_COUNTER_TTL', '1'))
+_change_counters = {'values': None, 'expires': 0.0}
+
+def get_cache_version(name):
+    """현재 캐시 버전 (행이 없으면 0)"""
+    return db.session.query(CacheVersion.version).filter_by(name=name).scalar() or 0
+
+UPSERT_DIALECTS = {'postgresql': postgresql, 'sqlite': sqlite}
+
+def bump_cache_version(connection, name):
+    """같은 트랜잭션 안에서 캐시 버전 증가
+    행이 아직 없을 때 두 워커가 동시에 처음 쓰더라도 기본키 충돌이 나지 않도록 INSERT ... ON CONFLICT DO UPDATE 사용"""
+    table = CacheVersion.__table__
+    dialect = UPSERT_DIALECTS.get(connection.dialect.name)
+    if dialect is not None:
+        insert = dialect.insert(table).values(name=name, version=1)
+        connection.execute(insert.on_conflict_do_update(index_elements=[table.c.name],
+                                                        set_={'version': table.c.version + 1}))
+        return
+    result = connection.execute(table.update().where(table.c.name == name)
+                                .values(version=table.c.version + 1))
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(name=name, version=1))
+
+def bump_change_counters_on_flush(session, flush_context):
+    """행이 추가/수정/삭제된 테이블의 변경 카운터를 올림 (조장/예산 수정, 등록, 승인, 복원 등)"""
+    names = {CHANGE_COUNTER_BY_MODEL.get(type(obj))
+             for obj in list(session.new) + list(session.dirty) + list(session.deleted)}
+    for name in sorted(names - {None}):
+        bump_cache_version(session.connection(), name)
+
+def get_change_counters():
+    """{카운터 이름: 버전} - CHANGE_COUNTER_TTL 초 동안 프로세스에 보관해 DB를 조회하지 않음"""
+    now = time.monotonic()
+    if _change_counters['values'] is None or now >= _change_counters['expires']:
+        values = dict(db.session.query(CacheVersion.name, CacheVersion.version).all())
+        _change_counters.update(values=values, expires=now + CHANGE_COUNTER_TTL)
+    return _change_counters['values']
+
+def expire_change_counters(session):
+    """이 프로세스에서 커밋하면 다음 API 요청은 카운터를 다시 읽음"""
+    _change_counters['expires'] = 0.0
+
+event.listen(db.session, 'after_flush', bump_change_counters_on_flush)
+event.listen(db.session, 'after_commit', expire_change_counters)
+
+# 예산 장부
+LEDGER_PENDING = 'pending'   # 승인 대기 건 (예산 유형 미지정)
+LEDGER_UNKNOWN = 'none'      # 예산 유형 없이 승인된 건
+
+def ledger_key(item):
+    """구매 건이 집계될 장부 행의 budget_type"""
+    if not item.is_approved:
+        return LEDGER_PENDING
+    return item.budget_type or LEDGER_UNKNOWN
+
+def update_ledger(team_id, budget_type, spent=0, pending=0, count=0):
+    """장부 행을 원자적으로 증감 (행이 없으면 생성). 커밋은 호출한 라우트에서"""
+    def increment():
+        return TeamLedger.query.filter_by(team_id=team_id, budget_type=budget_type).update({
+            TeamLedger.spent: TeamLedger.spent + spent,
+            TeamLedger.pending: TeamLedger.pending + pending,
+            TeamLedger.count: TeamLedger.count + count
+        }, synchronize_session=False)
+
+    if increment():
+        return
+    try:
+        # SAVEPOINT 안에서 생성 - 실패해도 라우트의 다른 변경은 그대로
+        with db.session.begin_nested():
+            db.session.add(TeamLedger(team_id=team_id, budget_type=budget_type,
+                                      spent=spent, pending=pending, count=count))
+    except IntegrityError:
+        # 동시에 들어온 다른 요청이 같은 (team_id, budget_type) 행을 먼저 만듦 → 그 행에 더함
+        increment()
+
+def record_in_ledger(item, sign):
+    """구매/다중 구매 1건을 장부에 반영 (sign=1 추가, -1 제거)"""
+    amount = item.estimated_cost if isinstance(item, Purchase) else item.total_cost
+    if item.is_approved:
+        update_ledger(item.team_id, ledger_key(item), spent=sign * amount, count=sign)
+    else:
+        update_ledger(item.team_id, LEDGER_PENDING, pending=sign * amount, count=sign)
+
+def get_ledger_by_team():
+    """장부 전체 {team_id: {budget_type: TeamLedger}} (쿼리 1번)"""
+    ledger = {}
+    for row in TeamLedger.query.all():
+        ledger.setdefault(row.team_id, {})[row.budget_type] = row
+    return ledger
+
+def get_team_spent(team_id):
+    """조의 예산 유형별 승인 금액 {budget_type: 금액} (장부 조회 1번)"""
+    rows = TeamLedger.query.filter_by(team_id=team_id).all()
+    return {row.budget_type: row.spent for row in rows if row.budget_type != LEDGER_PENDING}
+
+def compute_ledger():
+    """구매내역 전체에서 장부를 새로 계산 {(team_id, budget_type): {'spent', 'pending', 'count'}}"""
+    expected = {}
+    for model, cost_column in ((Purchase, Purchase.estimated_cost), (MultiPurchase, MultiPurchase.total_cost)):
+        rows = db.session.query(model.team_id, model.is_approved, model.budget_type,
+                                db.func.sum(cost_column), db.func.count(model.id)) \
+            .group_by(model.team_id, model.is_approved, model.budget_type)
+        for team_id, is_approved, budget_type, total, count in rows:
+            if is_approved:
+                key = (team_id, budget_type or LEDGER_UNKNOWN)
+            else:
+                key = (team_id, LEDGER_PENDING)
+            entry = expected.setdefault(key, {'spent': 0, 'pending': 0, 'count': 0})
+            entry['spent' if is_approved else 'pending'] += total or 0
+            entry['count'] += count
+    return expected
+
+def reconcile_ledger(fix=True):
+    """장부를 구매내역과 비교해 차이(drift) 목록을 반환하고, fix=True면 바로잡음"""
+    expected = compute_ledger()
+    current = {(row.team_id, row.budget_type): row for row in TeamLedger.query.all()}
+    drift = []
+    for key in sorted(set(expected) | set(current), key=str):
+        want = expected.get(key, {'spent': 0, 'pending': 0, 'count': 0})
+        row = current.get(key)
+        for field in ('spent', 'pending', 'count'):
+            have = getattr(row, field) if row else 0
+            if have != want[field]:
+                drift.append({'team_id': key[0], 'budget_type': key[1], 'field': field,
+                              'ledger': have, 'actual': want[field]})
+        if fix:
+            if row is None:
+                db.session.add(TeamLedger(team_id=key[0], budget_type=key[1], **want))
+            else:
+                row.spent, row.pending, row.count = want['spent'], want['pending'], want['count']
+    if fix:
+        db.session.commit()
+    return drift
+
+# 요청 지표 - 다른 before_request 보다 먼저 등록해 복원 중 503 응답도 측정
+def sql_operation(statement):
+    """SQL 문 종류 (SELECT/INSERT/UPDATE/DELETE, 나머지는 OTHER)"""
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement and statement.strip() else ''
+    return operation if operation in ('SELECT', 'INSERT', 'UPDATE', 'DELETE') else 'OTHER'
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    SQL_STATEMENT_DURATION.observe(elapsed, operation=sql_operation(statement))
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_seconds += elapsed
+        if 'sql_slowest' in g:
+            record_sql_profile(statement, elapsed)
+
+def record_sql_profile(statement, elapsed):
+    """요청별로 가장 느린 문 상위 SQL_PROFILE_TOP개와 같은 문 반복 횟수(N+1 찾기용)를 기록"""
+    text = ' '.join(statement.split())
+    g.sql_repeats[text] = g.sql_repeats.get(text, 0) + 1
+    if len(g.sql_slowest) < SQL_PROFILE_TOP:
+        heapq.heappush(g.sql_slowest, (elapsed, text))
+    elif elapsed > g.sql_slowest[0][0]:
+        heapq.heapreplace(g.sql_slowest, (elapsed, text))
+
+event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+event.listen(Pool, 'connect', lambda dbapi_connection, record: DB_CONNECTS.inc())
+event.listen(Pool, 'invalidate', lambda dbapi_connection, record, exc: DB_INVALIDATED.inc())
+
+def request_route():
+    """지표 라벨용 라우트 (id 가 들어간 URL 대신 규칙 문자열)"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def assign_request_id():
+    """요청 ID (X-Request-ID 헤더가 있으면 그대로) - 이 요청에서 남긴 로그에 request_id 로 붙음"""
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_id_token = set_request_id(g.request_id)
+
+@app.teardown_request
+def clear_request_id(exc):
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        reset_request_id(token)
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    if SQL_PROFILE:
+        g.sql_slowest = []
+        g.sql_repeats = {}
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    started = g.get('request_started')
+    if started is None:
+        return response
+    route = request_route()
+    REQUEST_LATENCY.observe(time.perf_counter() - started, route=route, method=request.method)
+    REQUEST_COUNT.inc(route=route, method=request.method, status=str(response.status_code))
+    SQL_STATEMENTS_PER_REQUEST.observe(g.sql_count, route=route)
+    SQL_SECONDS_PER_REQUEST.observe(g.sql_seconds, route=route)
+    if 'sql_slowest' in g:
+        report_sql_profile(response, time.perf_counter() - started)
+    return response
+
+def report_sql_profile(response, elapsed):
+    """SQL_PROFILE=1: Server-Timing 헤더 추가, SQL_PROFILE_SLOW_MS 를 넘으면 느린 문/반복 문 출력
+    (스트리밍 응답은 본문을 만드는 동안의 SQL 이 빠짐)"""
+    total_ms = elapsed * 1000
+    sql_ms = g.sql_seconds * 1000
+    response.headers['Server-Timing'] = (f'db;dur={sql_ms:.1f};desc="{g.sql_count} queries", '
+                                         f'app;dur={total_ms - sql_ms:.1f}, total;dur={total_ms:.1f}')
+    if total_ms < SQL_PROFILE_SLOW_MS:
+        return
+    slowest = [{'ms': round(seconds * 1000, 1), 'sql': text[:300]} for seconds, text in sorted(g.sql_slowest, reverse=True)]
+    repeated = sorted(((count, text) for text, count in g.sql_repeats.items() if count > 1), reverse=True)
+    lines = [f"   {item['ms']:8.1f}ms  {item['sql']}" for item in slowest]
+    lines += [f"   🔁 {count}회 반복 (N+1 의심): {text[:300]}" for count, text in repeated[:3]]
+    logger.warning(f"🐢 느린 요청 {request.method} {request.path} → {response.status_code}: "
+                   f"{total_ms:.0f}ms (SQL {g.sql_count}개, {sql_ms:.0f}ms)\n" + "\n".join(lines),
+                   extra={'method': request.method, 'path': request.path, 'status': response.status_code,
+                          'total_ms': round(total_ms, 1), 'sql_count': g.sql_count, 'sql_ms': round(sql_ms, 1),
+                          'slowest_sql': slowest,
+                          'repeated_sql': [{'count': count, 'sql': text[:300]} for count, text in repeated[:3]]})
+
+# 상태 확인/지표 라우트 - 복원 중에도 응답하고 장부 테이블 준비(ensure_runtime_tables)를 기다리지 않음
+PROBE_ENDPOINTS = {'health', 'healthz', 'readyz', 'metrics', 'static'}
+
+# 복원 중(warming)에는 GET 이어도 데이터를 바꾸는 라우트
+WARMING_WRITE_ENDPOINTS = {'cancel_approval', 'delete_purchase', 'cancel_multi_approval', 'delete_multi_purchase'}
+
+def startup_ready():
+    """부팅 작업이 끝났는지 (blocking 모드에서 부팅 작업 없이 뜬 경우도 준비 완료로 봄)"""
+    if startup_task.state == 'idle':
+        return STARTUP_MODE != 'lazy'
+    return startup_task.ready
+
+@app.before_request
+def guard_warming():
+    """lazy 모드: 첫 요청에서 복원을 시작하고, 끝날 때까지 읽기 전용으로 응답"""
+    if STARTUP_MODE != 'lazy':
+        return
+    startup_task.start()
+    if startup_task.done or request.endpoint in PROBE_ENDPOINTS:
+        return
+    if startup_task.schema_ready and request.method in ('GET', 'HEAD') and request.endpoint not in WARMING_WRITE_ENDPOINTS:
+        return
+    response = make_response("⏳ 서버가 GitHub 백업에서 데이터를 복원하는 중입니다. 잠시 후 다시 시도해 주세요.", 503)
+    response.headers['Retry-After'] = '5'
+    return response
+
+_runtime_tables_ready = False
+
+@app.before_request
+def ensure_runtime_tables():
+    """프로세스당 한 번: 적용 안 된 마이그레이션(장부/캐시 버전 테이블, 인덱스 등)을 실행하고, 장부가 비어 있으면 구매내역에서 채움"""
+    global _runtime_tables_ready
+    if _runtime_tables_ready or request.endpoint in PROBE_ENDPOINTS:
+        return
+    migrate_database()
+    _runtime_tables_ready = True
+
+@app.cli.command('migrate')
+def migrate_command():
+    """적용 안 된 DB 마이그레이션 실행 (flask --app simple_flask migrate)"""
+    db.create_all()
+    pending = pending_migrations(db.engine, MIGRATIONS)
+    if not pending:
+        print("✅ 모든 마이그레이션이 적용되어 있습니다.")
+        return
+    for version in migrate_database():
+        print(f"  - {version}: {MIGRATIONS_BY_VERSION[version].name}")
+
+@app.cli.command('reconcile-ledger')
+def reconcile_ledger_command():
+    """장부를 처음부터 다시 계산하고 차이를 출력 (flask --app simple_flask reconcile-ledger)"""
+    TeamLedger.__table__.create(db.engine, checkfirst=True)
+    drift = reconcile_ledger()
+    if not drift:
+        print("✅ 장부가 구매내역과 일치합니다.")
+        return
+    print(f"⚠️ 장부 불일치 {len(drift)}건을 바로잡았습니다:")
+    for d in drift:
+        print(f"  - team_id={d['team_id']} {d['budget_type']} {d['field']}: 장부 {d['ledger']} → 실제 {d['actual']}")
+
+def build_budget_summary(teams):
+    """조별 예산 현황과 전체 합계 (관리자 페이지/엑셀 요약 시트 공용, 장부 조회 1번)"""
+    ledger = get_ledger_by_team()
+    all_teams_info = []
+    for team in teams:
+        # 일반 구매내역과 다중 구매내역 모두 포함 (장부에서 조회)
+        total_spent = sum(row.spent for row in ledger.get(team.id, {}).values())
+        
+        all_teams_info.append({
+            'team_name': team.name,
+            'leader_name': team.leader_name,
+            'department_budget': team.department_budget,
+            'student_budget': team.student_budget,
+            'total_budget': team.original_department_budget + team.original_student_budget,  # 원래 예산 사용
+            'total_spent': total_spent,
+            'remaining': (team.original_department_budget + team.original_student_budget) - total_spent  # 원래 예산에서 사용액 차감
+        })
+    
+    # 전체 예산 현황 계산
+    total_budget = sum(team.original_department_budget + team.original_student_budget for team in teams)
+    total_spent = sum(team_info['total_spent'] for team_info in all_teams_info)
+    total_remaining = total_budget - total_spent
+    return all_teams_info, total_budget, total_spent, total_remaining
+
+# 관리자 구매내역 목록 - (created_at, id) keyset 페이지 (OFFSET 없이 인덱스만 따라가므로 기록이 쌓여도 일정한 시간)
+ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', '50'))
+ADMIN_MAX_PAGE_SIZE = 200
+LISTING_FILTER_KEYS = ('team_id', 'status', 'store', 'budget_type')
+
+def listing_filters():
+    """목록 필터 (?team_id=&status=approved|pending&store=&budget_type=) - 잘못된 값은 무시"""
+    status = request.args.get('status')
+    return {
+        'team_id': request.args.get('team_id', type=int),
+        'status': status if status in ('approved', 'pending') else None,
+        'store': request.args.get('store', '').strip() or None,
+        'budget_type': request.args.get('budget_type', '').strip() or None,
+    }
+
+def apply_listing_filters(query, model, filters):
+    if filters['team_id'] is not None:
+        query = query.filter(model.team_id == filters['team_id'])
+    if filters['status'] is not None:
+        query = query.filter(model.is_approved == (filters['status'] == 'approved'))
+    if filters['store']:
+        query = query.filter(model.store == filters['store'])
+    if filters['budget_type']:
+        query = query.filter(model.budget_type == filters['budget_type'])
+    return query
+
+def encode_cursor(row):
+    return f"{row.created_at:%Y%m%d%H%M%S%f}-{row.id}"
+
+def decode_cursor(value):
+    """커서 → (created_at, id), 형식이 틀리면 None (첫 페이지)"""
+    try:
+        stamp, row_id = value.split('-')
+        return datetime.strptime(stamp, '%Y%m%d%H%M%S%f'), int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+def keyset_page(query, model, prefix, per_page):
+    """최신순 한 페이지 {'items', 'next_url', 'prev_url', 'first_url'}
+    ?<prefix>_after=커서 는 그 행 다음(더 오래된) 페이지, ?<prefix>_before=커서 는 그 행 이전 페이지"""
+    after = decode_cursor(request.args.get(f'{prefix}_after'))
+    before = None if after else decode_cursor(request.args.get(f'{prefix}_before'))
+    if before:
+        created_at, row_id = before
+        rows = query.filter(db.or_(model.created_at > created_at,
+                                   db.and_(model.created_at == created_at, model.id > row_id))) \
+            .order_by(model.created_at.asc(), model.id.asc()).limit(per_page + 1).all()
+        has_prev, has_next = len(rows) > per_page, True
+        rows = rows[:per_page][::-1]
+    else:
+        if after:
+            created_at, row_id = after
+            query = query.filter(db.or_(model.created_at < created_at,
+                                        db.and_(model.created_at == created_at, model.id < row_id)))
+        rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+        has_prev, has_next = after is not None, len(rows) > per_page
+        rows = rows[:per_page]
+    
+    def page_url(**cursor):
+        args = {key: value for key, value in request.args.items() if key not in (f'{prefix}_after', f'{prefix}_before')}
+        return url_for('admin', **args, **cursor, _anchor=prefix)
+    
+    return {
+        'items': rows,
+        'next_url': page_url(**{f'{prefix}_after': encode_cursor(rows[-1])}) if has_next and rows else None,
+        'prev_url': page_url(**{f'{prefix}_before': encode_cursor(rows[0])}) if has_prev and rows else None,
+        'first_url': page_url() if after or before else None,  # 빈 페이지에 떨어진 커서도 첫 페이지로 돌아갈 수 있게
+    }
+
 # 라우트
 @app.route('/')
 def index():
@@ -480,14 +1213,11 @@ def upload():
                     attachment_filename=attachment_filename
                 )
                 db.session.add(purchase)
+                record_in_ledger(purchase, 1)
                 db.session.commit()
                 
-                # JSON 백업 실행
-                print("=" * 50)
-                print("🔄 구매내역 업로드 후 JSON 백업 시작!")
-                print("=" * 50)
-                backup_to_json()
-                print("=" * 50)
+                # JSON 백업 예약
+                schedule_backup('purchase_upload')
                 
                 flash('구매내역이 성공적으로 업로드되었습니다.', 'success')
                 return redirect(url_for('upload'))
@@ -564,10 +1294,11 @@ def upload():
                     )
                     db.session.add(item)
                 
+                record_in_ledger(multi_purchase, 1)
                 db.session.commit()
                 
-                # JSON 백업 실행
-                backup_to_json()
+                # JSON 백업 예약
+                schedule_backup('multi_purchase_upload')
                 
                 flash(f'다중 품목 구매 요청이 성공적으로 제출되었습니다. (총 {len(items_data)}개 품목, {total_cost:,}원)', 'success')
                 return redirect(url_for('upload'))
@@ -589,8 +1320,8 @@ def upload():
                 db.session.add(other_request)
                 db.session.commit()
                 
-                # JSON 백업 실행
-                backup_to_json()
+                # JSON 백업 예약
+                schedule_backup('other_request_upload')
                 
                 flash('기타 구매 요청이 성공적으로 제출되었습니다.', 'success')
                 return redirect(url_for('upload'))
@@ -613,12 +1344,10 @@ def check_balance():
             approved_purchases = Purchase.query.filter_by(team_id=team.id, is_approved=True).all()
             approved_multi_purchases = MultiPurchase.query.filter_by(team_id=team.id, is_approved=True).all()
             
-            total_department_spent = sum(p.estimated_cost for p in approved_purchases if p.budget_type == 'department')
-            total_student_spent = sum(p.estimated_cost for p in approved_purchases if p.budget_type == 'student')
-            
-            # 다중 구매내역에서도 예산 차감액 계산
-            total_department_spent += sum(mp.total_cost for mp in approved_multi_purchases if mp.budget_type == 'department')
-            total_student_spent += sum(mp.total_cost for mp in approved_multi_purchases if mp.budget_type == 'student')
+            # 일반/다중 구매내역 예산 차감액은 장부에서 바로 조회
+            team_spent = get_team_spent(team.id)
+            total_department_spent = team_spent.get('department', 0)
+            total_student_spent = team_spent.get('student', 0)
             
             balance_info = {
                 'team_name': team.name,
@@ -662,9 +1391,8 @@ def admin():
             team.leader_name = leader_name
             db.session.commit()
             
-            # JSON 백업 실행
-            print("🔄 조장 정보 업데이트 후 JSON 백업 시작!")
-            backup_to_json()
+            # JSON 백업 예약
+            schedule_backup('leader_update')
             
             flash('조장 정보가 업데이트되었습니다.', 'success')
             return redirect(url_for('admin'))
@@ -693,9 +1421,8 @@ def admin():
                 team.original_student_budget = student_budget
                 db.session.commit()
                 
-                # JSON 백업 실행
-                print("🔄 예산 정보 업데이트 후 JSON 백업 시작!")
-                backup_to_json()
+                # JSON 백업 예약
+                schedule_backup('budget_update')
                 
                 flash(f'{team_name}의 예산이 업데이트되었습니다. (학과지원: {department_budget:,}원, 학생지원: {student_budget:,}원)', 'success')
                 return redirect(url_for('admin'))
@@ -707,43 +1434,29 @@ def admin():
             return redirect(url_for('admin'))
     
     teams = get_teams_ordered()
-    all_teams_info = []
-    for team in teams:
-        approved_purchases = Purchase.query.filter_by(team_id=team.id, is_approved=True).all()
-        approved_multi_purchases = MultiPurchase.query.filter_by(team_id=team.id, is_approved=True).all()
-        
-        # 일반 구매내역과 다중 구매내역 모두 포함
-        total_spent = sum(p.estimated_cost for p in approved_purchases)
-        total_spent += sum(mp.total_cost for mp in approved_multi_purchases)
-        
-        all_teams_info.append({
-            'team_name': team.name,
-            'leader_name': team.leader_name,
-            'department_budget': team.department_budget,
-            'student_budget': team.student_budget,
-            'total_budget': team.original_department_budget + team.original_student_budget,  # 원래 예산 사용
-            'total_spent': total_spent,
-            'remaining': (team.original_department_budget + team.original_student_budget) - total_spent  # 원래 예산에서 사용액 차감
-        })
+    all_teams_info, total_budget, total_spent, total_remaining = build_budget_summary(teams)
     
-    pending_purchases = Purchase.query.filter_by(is_approved=False).all()
-    all_purchases = Purchase.query.order_by(Purchase.created_at.desc()).all()
-    pending_multi_purchases = MultiPurchase.query.filter_by(is_approved=False).all()
-    all_multi_purchases = MultiPurchase.query.order_by(MultiPurchase.created_at.desc()).all()
-    other_requests = OtherRequest.query.all()
-    
-    # 전체 예산 현황 계산
-    total_budget = sum(team.original_department_budget + team.original_student_budget for team in teams)
-    total_spent = sum(team_info['total_spent'] for team_info in all_teams_info)
-    total_remaining = total_budget - total_spent
+    # 목록은 필터 + 한 페이지씩, 조 정보/품목은 미리 함께 로드 (템플릿에서 행마다 추가 쿼리가 나가지 않도록)
+    filters = listing_filters()
+    per_page = min(max(request.args.get('per_page', ADMIN_PAGE_SIZE, type=int), 1), ADMIN_MAX_PAGE_SIZE)
+    purchase_page = keyset_page(
+        apply_listing_filters(Purchase.query.options(db.joinedload(Purchase.team)), Purchase, filters),
+        Purchase, 'purchases', per_page)
+    multi_purchase_page = keyset_page(
+        apply_listing_filters(MultiPurchase.query.options(db.joinedload(MultiPurchase.team),
+                                                          db.selectinload(MultiPurchase.items)), MultiPurchase, filters),
+        MultiPurchase, 'multi_purchases', per_page)
+    other_requests = OtherRequest.query.options(db.joinedload(OtherRequest.team)).all()
     
     return render_template('admin.html', 
                          teams=teams,
                          all_teams_info=all_teams_info,
-                         pending_purchases=pending_purchases,
-                         all_purchases=all_purchases,
-                         pending_multi_purchases=pending_multi_purchases,
-                         all_multi_purchases=all_multi_purchases,
+                         all_purchases=purchase_page['items'],
+                         all_multi_purchases=multi_purchase_page['items'],
+                         purchase_page=purchase_page,
+                         multi_purchase_page=multi_purchase_page,
+                         filters=filters,
+                         per_page=per_page,
                          other_requests=other_requests,
                          total_budget=total_budget,
                          total_spent=total_spent,
@@ -761,28 +1474,30 @@ def approve_purchase(purchase_id):
         flash('예산 유형을 선택해주세요.', 'error')
         return redirect(url_for('admin'))
     
-    # 예산 차감
+    # 예산 확인 (장부와 예산은 확인이 끝난 뒤에만 바꿈)
     team = purchase.team
+    if budget_type == 'department' and team.department_budget < purchase.estimated_cost:
+        flash('학과지원사업 예산이 부족합니다.', 'error')
+        return redirect(url_for('admin'))
+    if budget_type == 'student' and team.student_budget < purchase.estimated_cost:
+        flash('학생지원사업 예산이 부족합니다.', 'error')
+        return redirect(url_for('admin'))
+    
+    # 예산 차감
+    record_in_ledger(purchase, -1)
     if budget_type == 'department':
-        if team.department_budget >= purchase.estimated_cost:
-            team.department_budget -= purchase.estimated_cost
-            purchase.budget_type = 'department'
-        else:
-            flash('학과지원사업 예산이 부족합니다.', 'error')
-            return redirect(url_for('admin'))
+        team.department_budget -= purchase.estimated_cost
+        purchase.budget_type = 'department'
     elif budget_type == 'student':
-        if team.student_budget >= purchase.estimated_cost:
-            team.student_budget -= purchase.estimated_cost
-            purchase.budget_type = 'student'
-        else:
-            flash('학생지원사업 예산이 부족합니다.', 'error')
-            return redirect(url_for('admin'))
+        team.student_budget -= purchase.estimated_cost
+        purchase.budget_type = 'student'
     
     purchase.is_approved = True
+    record_in_ledger(purchase, 1)
     db.session.commit()
     
-    # JSON 백업 실행
-    backup_to_json()
+    # JSON 백업 예약
+    schedule_backup('approve_purchase')
     
     flash('구매내역이 승인되었습니다.', 'success')
     return redirect(url_for('admin'))
@@ -799,6 +1514,7 @@ def cancel_approval(purchase_id):
     
     # 예산 복구
     team = purchase.team
+    record_in_ledger(purchase, -1)
     if purchase.budget_type == 'department':
         team.department_budget += purchase.estimated_cost
     elif purchase.budget_type == 'student':
@@ -806,10 +1522,11 @@ def cancel_approval(purchase_id):
     
     purchase.is_approved = False
     purchase.budget_type = None
+    record_in_ledger(purchase, 1)
     db.session.commit()
     
-    # JSON 백업 실행
-    backup_to_json()
+    # JSON 백업 예약
+    schedule_backup('cancel_approval')
     
     flash('구매 승인이 취소되었습니다.', 'success')
     return redirect(url_for('admin'))
@@ -830,6 +1547,7 @@ def delete_purchase(purchase_id):
             team.student_budget += purchase.estimated_cost
     
     # 구매내역 삭제
+    record_in_ledger(purchase, -1)
     db.session.delete(purchase)
     db.session.commit()
     flash('구매내역이 삭제되었습니다.', 'success')
@@ -847,24 +1565,26 @@ def approve_multi_purchase(multi_purchase_id):
         flash('예산 유형을 선택해주세요.', 'error')
         return redirect(url_for('admin'))
     
-    # 예산 차감
+    # 예산 확인 (장부와 예산은 확인이 끝난 뒤에만 바꿈)
     team = multi_purchase.team
+    if budget_type == 'department' and team.department_budget < multi_purchase.total_cost:
+        flash('학과지원사업 예산이 부족합니다.', 'error')
+        return redirect(url_for('admin'))
+    if budget_type == 'student' and team.student_budget < multi_purchase.total_cost:
+        flash('학생지원사업 예산이 부족합니다.', 'error')
+        return redirect(url_for('admin'))
+    
+    # 예산 차감
+    record_in_ledger(multi_purchase, -1)
     if budget_type == 'department':
-        if team.department_budget >= multi_purchase.total_cost:
-            team.department_budget -= multi_purchase.total_cost
-            multi_purchase.budget_type = 'department'
-        else:
-            flash('학과지원사업 예산이 부족합니다.', 'error')
-            return redirect(url_for('admin'))
+        team.department_budget -= multi_purchase.total_cost
+        multi_purchase.budget_type = 'department'
     elif budget_type == 'student':
-        if team.student_budget >= multi_purchase.total_cost:
-            team.student_budget -= multi_purchase.total_cost
-            multi_purchase.budget_type = 'student'
-        else:
-            flash('학생지원사업 예산이 부족합니다.', 'error')
-            return redirect(url_for('admin'))
+        team.student_budget -= multi_purchase.total_cost
+        multi_purchase.budget_type = 'student'
     
     multi_purchase.is_approved = True
+    record_in_ledger(multi_purchase, 1)
     db.session.commit()
     flash('다중 품목 구매내역이 승인되었습니다.', 'success')
     return redirect(url_for('admin'))
@@ -881,6 +1601,7 @@ def cancel_multi_approval(multi_purchase_id):
     
     # 예산 복구
     team = multi_purchase.team
+    record_in_ledger(multi_purchase, -1)
     if multi_purchase.budget_type == 'department':
         team.department_budget += multi_purchase.total_cost
     elif multi_purchase.budget_type == 'student':
@@ -888,6 +1609,7 @@ def cancel_multi_approval(multi_purchase_id):
     
     multi_purchase.is_approved = False
     multi_purchase.budget_type = None
+    record_in_ledger(multi_purchase, 1)
     db.session.commit()
     flash('다중 품목 구매 승인이 취소되었습니다.', 'success')
     return redirect(url_for('admin'))
@@ -908,6 +1630,7 @@ def delete_multi_purchase(multi_purchase_id):
             team.student_budget += multi_purchase.total_cost
     
     # 구매내역 삭제 (관련 품목들도 자동 삭제됨)
+    record_in_ledger(multi_purchase, -1)
     db.session.delete(multi_purchase)
     db.session.commit()
     flash('다중 품목 구매내역이 삭제되었습니다.', 'success')
@@ -927,134 +1650,183 @@ def download_file(filename):
         flash('파일 다운로드 중 오류가 발생했습니다.', 'error')
         return redirect(url_for('admin'))
 
+# 구매내역 내보내기 (스트리밍)
+EXPORT_HEADERS = ['ID', '조 번호', '조장', '품목명', '수량', '예상비용', '쇼핑몰', '예산유형', '상태', '요청일시', '견적서첨부']
+EXPORT_BATCH_SIZE = 500   # DB에서 한 번에 가져올 행 수 (yield_per)
+EXPORT_FLUSH_ROWS = 200   # 이만큼 모이면 응답으로 내보냄
+
+def budget_type_label(budget_type):
+    """예산 유형 표시 이름"""
+    if budget_type == 'department':
+        return '학과지원사업'
+    if budget_type == 'student':
+        return '학생지원사업'
+    return '미선택'
+
+def iter_export_rows(team_id=None):
+    """내보내기 행을 하나씩 생성 (서버 측 커서로 나눠 읽고 조/품목은 미리 로드). 수량/비용은 숫자 그대로"""
+    purchases = Purchase.query.options(db.joinedload(Purchase.team))
+    if team_id is not None:
+        purchases = purchases.filter(Purchase.team_id == team_id)
+    for purchase in purchases.order_by(Purchase.created_at.desc()).yield_per(EXPORT_BATCH_SIZE):
+        yield [
+            str(purchase.id),
+            purchase.team.name,
+            purchase.team.leader_name or '미설정',
+            purchase.item_name,
+            purchase.quantity,
+            purchase.estimated_cost,
+            purchase.store,
+            budget_type_label(purchase.budget_type),
+            '승인됨' if purchase.is_approved else '대기중',
+            purchase.created_at.strftime('%Y-%m-%d %H:%M'),
+            '있음' if purchase.attachment_filename else '없음'
+        ]
+    
+    # 다중 품목 구매내역 - 각 품목별로 행 생성
+    multi_purchases = MultiPurchase.query.options(db.joinedload(MultiPurchase.team),
+                                                  db.selectinload(MultiPurchase.items))
+    if team_id is not None:
+        multi_purchases = multi_purchases.filter(MultiPurchase.team_id == team_id)
+    for multi_purchase in multi_purchases.order_by(MultiPurchase.created_at.desc()).yield_per(EXPORT_BATCH_SIZE):
+        for item in multi_purchase.items:
+            yield [
+                f"M{multi_purchase.id}-{item.id}",
+                multi_purchase.team.name,
+                multi_purchase.team.leader_name or '미설정',
+                item.item_name,
+                item.quantity,
+                item.unit_price * item.quantity,
+                multi_purchase.store,
+                budget_type_label(multi_purchase.budget_type),
+                '승인됨' if multi_purchase.is_approved else '대기중',
+                multi_purchase.created_at.strftime('%Y-%m-%d %H:%M'),
+                '있음' if multi_purchase.attachment_filename else '없음'
+            ]
+
+def stream_export(rows, export_format):
+    """행들을 탭 구분 텍스트 또는 CSV로 나눠서 내보냄"""
+    buffer = io.StringIO()
+    if export_format == 'csv':
+        buffer.write('\ufeff')  # 엑셀에서 한글이 깨지지 않도록 BOM
+        writer = csv.writer(buffer)
+        write_row = writer.writerow
+    else:
+        write_row = lambda row: buffer.write('\t'.join(str(value) for value in row) + '\n')
+    
+    write_row(EXPORT_HEADERS)
+    pending_rows = 0
+    for row in rows:
+        write_row(row)
+        pending_rows += 1
+        if pending_rows >= EXPORT_FLUSH_ROWS:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending_rows = 0
+    yield buffer.getvalue().encode('utf-8')
+
+def sheet_title(name, used_titles):
+    """엑셀 시트 이름 규칙(31자, 특수문자 불가, 중복 불가)에 맞게 변환"""
+    title = ''.join('_' if ch in '[]:*?/\\' else ch for ch in name)[:31] or 'Sheet'
+    base, suffix = title, 2
+    while title in used_titles:
+        title = f'{base[:28]}_{suffix}'
+        suffix += 1
+    used_titles.add(title)
+    return title
+
+def build_xlsx_export(teams):
+    """요약 시트 + 조별 시트로 된 xlsx를 write-only 모드로 임시 파일에 작성 (메모리 사용 일정)"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    bold = Font(bold=True)
+    
+    def header_row(sheet, headers):
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, value=header)
+            cell.font = bold
+            cells.append(cell)
+        return cells
+    
+    # 요약 시트 (관리자 페이지 예산 현황과 같은 값)
+    summary = workbook.create_sheet(sheet_title('요약', used_titles))
+    summary.append(header_row(summary, ['조 번호', '조장', '학과지원사업 예산', '학생지원사업 예산',
+                                        '총 예산', '사용 금액', '잔여 금액']))
+    team_infos, total_budget, total_spent, total_remaining = build_budget_summary(teams)
+    for info in team_infos:
+        summary.append([info['team_name'], info['leader_name'] or '미설정', info['department_budget'],
+                        info['student_budget'], info['total_budget'], info['total_spent'], info['remaining']])
+    summary.append([])
+    summary.append(['합계', '', None, None, total_budget, total_spent, total_remaining])
+    
+    # 조별 시트 (수량/비용은 숫자 셀)
+    for team in teams:
+        sheet = workbook.create_sheet(sheet_title(team.name, used_titles))
+        sheet.append(header_row(sheet, EXPORT_HEADERS))
+        for row in iter_export_rows(team.id):
+            sheet.append(row)
+    
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+def attachment_disposition(filename):
+    """다운로드 헤더 - 헤더는 latin-1 만 허용하므로 한글 파일명은 RFC 5987 filename* 로 (구형 브라우저용 ASCII 이름도 함께)"""
+    fallback = filename.encode('ascii', 'ignore').decode('ascii').strip('_') or 'export'
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+def export_response(rows, filename_prefix, teams=None):
+    """format=csv 이면 CSV, format=xlsx 이면 엑셀 파일, 기본은 기존과 같은 탭 구분 텍스트로 응답"""
+    export_format = request.args.get('format')
+    if export_format == 'xlsx':
+        return send_file(build_xlsx_export(teams), as_attachment=True,
+                         download_name=f'{filename_prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx',
+                         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    
+    export_format = 'csv' if export_format == 'csv' else 'txt'
+    response = Response(stream_with_context(stream_export(rows, export_format)))
+    if export_format == 'csv':
+        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+    else:
+        response.headers['Content-Type'] = 'text/plain; charset=utf-8'
+    response.headers['Content-Disposition'] = attachment_disposition(
+        f'{filename_prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}')
+    return response
+
 @app.route('/export_excel')
 def export_excel():
-    """전체 구매내역을 엑셀(CSV)로 다운로드"""
+    """전체 구매내역을 엑셀용 탭 구분 텍스트(또는 ?format=csv / ?format=xlsx)로 다운로드"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        # Tab 구분 텍스트 파일 생성
-        txt_content = ""
-        
-        # 헤더 작성
-        headers = ['ID', '조 번호', '조장', '품목명', '수량', '예상비용', '쇼핑몰', '예산유형', '상태', '요청일시', '견적서첨부']
-        txt_content += '\t'.join(headers) + '\n'
-        
-        # 일반 구매내역
-        purchases = Purchase.query.order_by(Purchase.created_at.desc()).all()
-        for purchase in purchases:
-            row = [
-                str(purchase.id),
-                purchase.team.name,
-                purchase.team.leader_name or '미설정',
-                purchase.item_name,
-                str(purchase.quantity),
-                str(purchase.estimated_cost),
-                purchase.store,
-                '학과지원사업' if getattr(purchase, 'budget_type', None) == 'department' else '학생지원사업' if getattr(purchase, 'budget_type', None) == 'student' else '미선택',
-                '승인됨' if purchase.is_approved else '대기중',
-                purchase.created_at.strftime('%Y-%m-%d %H:%M'),
-                '있음' if getattr(purchase, 'attachment_filename', None) else '없음'
-            ]
-            txt_content += '\t'.join(row) + '\n'
-        
-        # 다중 품목 구매내역
-        multi_purchases = MultiPurchase.query.order_by(MultiPurchase.created_at.desc()).all()
-        for multi_purchase in multi_purchases:
-            # 각 품목별로 행 생성
-            for item in multi_purchase.items:
-                row = [
-                    f"M{multi_purchase.id}-{item.id}",
-                    multi_purchase.team.name,
-                    multi_purchase.team.leader_name or '미설정',
-                    item.item_name,
-                    str(item.quantity),
-                    str(item.unit_price * item.quantity),
-                    multi_purchase.store,
-                    '학과지원사업' if multi_purchase.budget_type == 'department' else '학생지원사업' if multi_purchase.budget_type == 'student' else '미선택',
-                    '승인됨' if multi_purchase.is_approved else '대기중',
-                    multi_purchase.created_at.strftime('%Y-%m-%d %H:%M'),
-                    '있음' if getattr(multi_purchase, 'attachment_filename', None) else '없음'
-                ]
-                txt_content += '\t'.join(row) + '\n'
-    
-        # 텍스트 파일로 응답
-        response = make_response(txt_content.encode('utf-8'))
-        response.headers['Content-Type'] = 'text/plain; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename=전체_구매내역_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt'
-        
-        return response
+        return export_response(iter_export_rows(), '전체_구매내역', teams=get_teams_ordered())
         
     except Exception as e:
         flash('파일 다운로드 중 오류가 발생했습니다.', 'error')
-        print(f"❌ 다운로드 오류: {e}")
+        logger.exception(f"❌ 다운로드 오류: {e}")
         return redirect(url_for('admin'))
 
 @app.route('/export_team_excel/<int:team_id>')
 def export_team_excel(team_id):
-    """특정 조의 구매내역을 엑셀(CSV)로 다운로드"""
+    """특정 조의 구매내역을 엑셀용 탭 구분 텍스트(또는 ?format=csv / ?format=xlsx)로 다운로드"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
         team = Team.query.get_or_404(team_id)
-        
-        # Tab 구분 텍스트 파일 생성
-        txt_content = ""
-        
-        # 헤더 작성
-        headers = ['ID', '조 번호', '조장', '품목명', '수량', '예상비용', '쇼핑몰', '예산유형', '상태', '요청일시', '견적서첨부']
-        txt_content += '\t'.join(headers) + '\n'
-        
-        # 해당 조의 일반 구매내역
-        purchases = Purchase.query.filter_by(team_id=team_id).order_by(Purchase.created_at.desc()).all()
-        for purchase in purchases:
-            row = [
-                str(purchase.id),
-                purchase.team.name,
-                purchase.team.leader_name or '미설정',
-                purchase.item_name,
-                str(purchase.quantity),
-                str(purchase.estimated_cost),
-                purchase.store,
-                '학과지원사업' if getattr(purchase, 'budget_type', None) == 'department' else '학생지원사업' if getattr(purchase, 'budget_type', None) == 'student' else '미선택',
-                '승인됨' if purchase.is_approved else '대기중',
-                purchase.created_at.strftime('%Y-%m-%d %H:%M'),
-                '있음' if getattr(purchase, 'attachment_filename', None) else '없음'
-            ]
-            txt_content += '\t'.join(row) + '\n'
-        
-        # 해당 조의 다중 품목 구매내역
-        multi_purchases = MultiPurchase.query.filter_by(team_id=team_id).order_by(MultiPurchase.created_at.desc()).all()
-        for multi_purchase in multi_purchases:
-            # 각 품목별로 행 생성
-            for item in multi_purchase.items:
-                row = [
-                    f"M{multi_purchase.id}-{item.id}",
-                    multi_purchase.team.name,
-                    multi_purchase.team.leader_name or '미설정',
-                    item.item_name,
-                    str(item.quantity),
-                    str(item.unit_price * item.quantity),
-                    multi_purchase.store,
-                    '학과지원사업' if multi_purchase.budget_type == 'department' else '학생지원사업' if multi_purchase.budget_type == 'student' else '미선택',
-                    '승인됨' if multi_purchase.is_approved else '대기중',
-                    multi_purchase.created_at.strftime('%Y-%m-%d %H:%M'),
-                    '있음' if getattr(multi_purchase, 'attachment_filename', None) else '없음'
-                ]
-                txt_content += '\t'.join(row) + '\n'
-    
-        # 텍스트 파일로 응답
-        response = make_response(txt_content.encode('utf-8'))
-        response.headers['Content-Type'] = 'text/plain; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename={team.name}_구매내역_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt'
-        
-        return response
+        return export_response(iter_export_rows(team.id), f'{team.name}_구매내역', teams=[team])
         
     except Exception as e:
         flash('파일 다운로드 중 오류가 발생했습니다.', 'error')
-        print(f"❌ 조별 다운로드 오류: {e}")
+        logger.exception(f"❌ 조별 다운로드 오류: {e}")
         return redirect(url_for('admin'))
 
 @app.route('/view_data')
@@ -1094,156 +1866,566 @@ def view_data():
     except Exception as e:
         return f"<pre>오류 발생: {e}</pre>"
 
+# JSON API (v1) - 조회 전용. ETag 는 테이블 변경 카운터로 계산해 If-None-Match 가 맞으면 DB 조회 없이 304
+API_PREFIX = '/api/v1'
+API_PURCHASE_LIMIT = 500
+
+def api_error(message, status):
+    return jsonify({'error': message}), status
+
+def api_leader_name():
+    """조장 인증용 이름 (?leader_name=) - 관리자 세션이면 필요 없음"""
+    return request.args.get('leader_name', '').strip()
+
+def api_response(counter_names, build):
+    """counter_names 카운터와 요청(경로, 인자, 관리자 여부)으로 강한 ETag 를 만들고,
+    If-None-Match 와 같으면 304, 아니면 build() 결과(dict/list 또는 오류 응답)를 JSON 으로"""
+    counters = get_change_counters()
+    key = json.dumps([request.path, sorted(request.args.items(multi=True)), 'admin_logged_in' in session,
+                      [counters.get(name, 0) for name in counter_names]], ensure_ascii=False)
+    etag = hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        payload = build()
+        if isinstance(payload, tuple):
+            return payload
+        response = jsonify(payload)
+    response.set_etag(etag)
+    # 저장은 하되 쓸 때마다 ETag 로 확인 (관리자/조장마다 응답이 다름)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+def find_team(team_id):
+    """캐시된 조 목록에서 id 로 찾기 (없으면 None)"""
+    return next((team for team in get_teams_ordered() if team.id == team_id), None)
+
+def authorize_team(team_id):
+    """관리자이거나 조장 이름이 맞으면 조 반환, 아니면 오류 응답"""
+    team = find_team(team_id)
+    if team is None:
+        return None, api_error('조를 찾을 수 없습니다.', 404)
+    if 'admin_logged_in' not in session and team.leader_name != api_leader_name():
+        return None, api_error('조장 이름이 일치하지 않습니다.', 403)
+    return team, None
+
+@app.route(f'{API_PREFIX}/teams')
+def api_teams():
+    """조 목록 [{id, name}] (관리자는 예산/사용액 포함)"""
+    def build():
+        teams = get_teams_ordered()
+        if 'admin_logged_in' not in session:
+            return {'teams': [{'id': team.id, 'name': team.name} for team in teams]}
+        summary, total_budget, total_spent, total_remaining = build_budget_summary(teams)
+        return {'teams': [{'id': team.id, 'name': team.name, 'leader_name': team.leader_name,
+                           'department_budget': team.department_budget, 'student_budget': team.student_budget,
+                           'total_budget': info['total_budget'], 'total_spent': info['total_spent'],
+                           'remaining': info['remaining']} for team, info in zip(teams, summary)],
+                'total_budget': total_budget, 'total_spent': total_spent, 'total_remaining': total_remaining}
+    return api_response([TEAMS_CACHE_KEY, PURCHASES_CACHE_KEY], build)
+
+@app.route(f'{API_PREFIX}/teams/<int:team_id>/balance')
+def api_team_balance(team_id):
+    """조 잔액 (/check_balance 와 같은 계산) - 관리자 또는 ?leader_name= 이 맞는 조장"""
+    def build():
+        team, error = authorize_team(team_id)
+        if error:
+            return error
+        team_spent = get_team_spent(team.id)
+        department_spent = team_spent.get('department', 0)
+        student_spent = team_spent.get('student', 0)
+        return {'team_id': team.id, 'team_name': team.name,
+                'department_budget': team.department_budget, 'student_budget': team.student_budget,
+                'department_spent': department_spent, 'student_spent': student_spent,
+                'department_remaining': team.department_budget - department_spent,
+                'student_remaining': team.student_budget - student_spent}
+    return api_response([TEAMS_CACHE_KEY, PURCHASES_CACHE_KEY], build)
+
+@app.route(f'{API_PREFIX}/purchases')
+def api_purchases():
+    """구매내역 목록 (최신순). 필터: team_id, status=approved|pending, store, budget_type, kind=single|multi,
+    limit(최대 API_PURCHASE_LIMIT), offset. 관리자가 아니면 team_id + leader_name 필수"""
+    try:
+        team_id = request.args.get('team_id', type=int)
+        limit = min(max(int(request.args.get('limit', 100)), 1), API_PURCHASE_LIMIT)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return api_error('limit/offset 은 숫자여야 합니다.', 400)
+    kind = request.args.get('kind')
+    if request.args.get('status') not in (None, 'approved', 'pending') or kind not in (None, 'single', 'multi'):
+        return api_error('status 는 approved/pending, kind 는 single/multi 만 가능합니다.', 400)
+    if 'admin_logged_in' not in session and team_id is None:
+        return api_error('team_id 와 leader_name 이 필요합니다.', 403)
+    filters = listing_filters()
+    
+    def filtered(query, model):
+        query = apply_listing_filters(query, model, filters)
+        return query.order_by(model.created_at.desc(), model.id.desc()).offset(offset).limit(limit)
+    
+    def build():
+        if team_id is not None:
+            _, error = authorize_team(team_id)
+            if error:
+                return error
+        payload = {'limit': limit, 'offset': offset}
+        if kind != 'multi':
+            payload['purchases'] = [serialize_purchase(p) for p in filtered(Purchase.query, Purchase)]
+        if kind != 'single':
+            multi_purchases = filtered(MultiPurchase.query.options(db.selectinload(MultiPurchase.items)), MultiPurchase)
+            payload['multi_purchases'] = [serialize_multi_purchase(mp) for mp in multi_purchases]
+        return payload
+    return api_response([TEAMS_CACHE_KEY, PURCHASES_CACHE_KEY], build)
+
+@app.route('/backup_status')
+def backup_status():
+    """백그라운드 백업 큐 상태 (큐 길이, 마지막 성공 시각)"""
+    if 'admin_logged_in' not in session:
+        return redirect(url_for('admin'))
+    
+    status = backup_worker.status()
+    status['async'] = BACKUP_ASYNC
+    return jsonify(status)
+
+@app.route('/health')
+def health():
+    """시작 상태 (준비 완료 200, 복원 중/실패 503) - DB를 조회하지 않음"""
+    status = startup_task.status()
+    status['mode'] = STARTUP_MODE
+    status['ready'] = startup_ready()
+    return jsonify(status), 200 if status['ready'] else 503
+
+def pool_status():
+    """연결 풀 현황 {size, checked_out, checked_in, overflow} (SQLite 메모리 DB 처럼 크기가 없는 풀은 빈 dict)"""
+    pool = db.engine.pool
+    if not hasattr(pool, 'size'):
+        return {}
+    return {'size': pool.size(), 'checked_out': pool.checkedout(), 'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)}
+
+def check_database():
+    """DB 연결 확인 (SELECT 1) → 결과 dict"""
+    started = time.perf_counter()
+    try:
+        db.session.execute(db.text('SELECT 1'))
+        return {'ok': True, 'seconds': round(time.perf_counter() - started, 4)}
+    except Exception as e:
+        db.session.rollback()
+        return {'ok': False, 'seconds': round(time.perf_counter() - started, 4), 'error': str(e)}
+
+@app.route('/healthz')
+def healthz():
+    """생존 확인 - 프로세스가 응답하고 DB에 연결되면 200"""
+    database = check_database()
+    database['pool'] = pool_status()
+    return jsonify({'status': 'ok' if database['ok'] else 'error', 'database': database}), 200 if database['ok'] else 503
+
+@app.route('/readyz')
+def readyz():
+    """준비 확인 - DB 연결 + 부팅 작업(복원) 완료면 200"""
+    database = check_database()
+    ready = database['ok'] and startup_ready()
+    return jsonify({'status': 'ready' if ready else 'not_ready', 'database': database,
+                    'startup': startup_task.state}), 200 if ready else 503
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 지표 (텍스트 형식)"""
+    status = backup_worker.status()
+    BACKUP_QUEUE_DEPTH.set(status['queue_depth'])
+    BACKUP_DROPPED.set(status['dropped_count'])
+    STARTUP_READY.set(1 if startup_ready() else 0)
+    pool = pool_status()
+    if pool:
+        DB_POOL_SIZE.set(pool['size'])
+        for state in ('checked_out', 'checked_in', 'overflow'):
+            DB_POOL_CONNECTIONS.set(pool[state], state=state)
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
 @app.route('/logout')
 def logout():
     session.pop('admin_logged_in', None)
     flash('로그아웃되었습니다.', 'info')
     return redirect(url_for('index'))
 
-def migrate_existing_data():
-    """기존 데이터에 새로운 필드 추가 (마이그레이션)"""
-    with app.app_context():
-        try:
-            # 먼저 새로운 컬럼이 있는지 확인
-            with db.engine.connect() as conn:
-                result = conn.execute(db.text("PRAGMA table_info(team)"))
-                columns = [row[1] for row in result]
-            
-            # original_department_budget 컬럼이 없으면 추가
-            if 'original_department_budget' not in columns:
-                with db.engine.connect() as conn:
-                    conn.execute(db.text("ALTER TABLE team ADD COLUMN original_department_budget INTEGER DEFAULT 0"))
-                    conn.commit()
-                print("original_department_budget 컬럼을 추가했습니다.")
-            
-            # original_student_budget 컬럼이 없으면 추가
-            if 'original_student_budget' not in columns:
-                with db.engine.connect() as conn:
-                    conn.execute(db.text("ALTER TABLE team ADD COLUMN original_student_budget INTEGER DEFAULT 0"))
-                    conn.commit()
-                print("original_student_budget 컬럼을 추가했습니다.")
-            
-            # Purchase 테이블의 attachment_filename 컬럼 확인 및 추가
-            with db.engine.connect() as conn:
-                result = conn.execute(db.text("PRAGMA table_info(purchase)"))
-                purchase_columns = [row[1] for row in result]
-            
-            if 'attachment_filename' not in purchase_columns:
-                with db.engine.connect() as conn:
-                    conn.execute(db.text("ALTER TABLE purchase ADD COLUMN attachment_filename VARCHAR(255)"))
-                    conn.commit()
-                print("attachment_filename 컬럼을 추가했습니다.")
-            
-            # 새로운 테이블들 생성 (MultiPurchase, MultiPurchaseItem) - 기존 데이터 보존
-            # db.create_all()은 init_db()에서만 호출
-            print("테이블 구조 확인 완료.")
-            
-            # 기존 데이터에 원래 예산 값 설정
-            teams = Team.query.all()
-            for team in teams:
-                if team.original_department_budget == 0:
-                    team.original_department_budget = team.department_budget
-                if team.original_student_budget == 0:
-                    team.original_student_budget = team.student_budget
-            
+# DB 마이그레이션 (migrations.py) - 기존 DB 에 새 컬럼/테이블/인덱스를 버전 순서대로 한 번씩 추가
+# 새 DB 는 create_all 이 모델대로 이미 만들므로 각 단계는 건너뛰고 버전만 기록됨
+def migration_original_budgets(connection):
+    """조의 원래 예산 컬럼 추가 후 현재 예산으로 채움"""
+    if not has_table(connection, 'team'):
+        return
+    add_column(connection, 'team', 'original_department_budget', 'INTEGER DEFAULT 0')
+    add_column(connection, 'team', 'original_student_budget', 'INTEGER DEFAULT 0')
+    connection.execute(db.text("UPDATE team SET original_department_budget = department_budget "
+                               "WHERE original_department_budget = 0 OR original_department_budget IS NULL"))
+    connection.execute(db.text("UPDATE team SET original_student_budget = student_budget "
+                               "WHERE original_student_budget = 0 OR original_student_budget IS NULL"))
+
+def migration_attachments(connection):
+    """견적서 첨부파일 컬럼"""
+    add_column(connection, 'purchase', 'attachment_filename', 'VARCHAR(255)')
+    add_column(connection, 'multi_purchase', 'attachment_filename', 'VARCHAR(255)')
+
+def migration_runtime_tables(connection):
+    """캐시 버전/예산 장부 테이블"""
+    CacheVersion.__table__.create(connection, checkfirst=True)
+    TeamLedger.__table__.create(connection, checkfirst=True)
+
+def migration_seed_cache_versions(connection):
+    """변경 카운터 행을 미리 만들어 둠 (첫 쓰기부터 UPDATE 만 하도록)"""
+    table = CacheVersion.__table__
+    existing = set(connection.execute(db.select(table.c.name)).scalars())
+    for name in sorted({TEAMS_CACHE_KEY, PURCHASES_CACHE_KEY} - existing):
+        connection.execute(table.insert().values(name=name, version=0))
+
+MODEL_INDEXES = {index.name: index for model in (Purchase, MultiPurchase, MultiPurchaseItem, OtherRequest)
+                 for index in model.__table__.indexes}
+
+def migration_indexes(*names):
+    """모델에 선언한 인덱스 중 names 를 (없으면) 생성"""
+    def upgrade(connection):
+        for name in names:
+            create_index(connection, MODEL_INDEXES[name])
+    return upgrade
+
+MIGRATIONS = [
+    Migration(1, 'team 원래 예산 컬럼', migration_original_budgets),
+    Migration(2, '첨부파일 컬럼', migration_attachments),
+    Migration(3, '캐시 버전/장부 테이블', migration_runtime_tables),
+    Migration(4, '관리자 목록 (created_at, id) 인덱스',
+              migration_indexes('ix_purchase_created_at_id', 'ix_multi_purchase_created_at_id')),
+    Migration(5, '조/승인 상태/예산 유형 조회 인덱스',
+              migration_indexes('ix_purchase_team_approval', 'ix_multi_purchase_team_approval',
+                                'ix_multi_purchase_item_multi_purchase_id', 'ix_other_request_team_id')),
+    Migration(6, '변경 카운터 행 미리 생성', migration_seed_cache_versions),
+]
+MIGRATIONS_BY_VERSION = {migration.version: migration for migration in MIGRATIONS}
+
+def migrate_database():
+    """적용 안 된 마이그레이션 실행 후, 장부가 비어 있으면 구매내역에서 채움 → 적용한 버전 목록"""
+    applied = migrate(db.engine, MIGRATIONS)
+    if TeamLedger.query.first() is None and Team.query.first() is not None:
+        reconcile_ledger()
+    return applied
+
+RESTORE_BATCH_SIZE = 1000
+
+def reset_id_sequences(tables):
+    """id를 직접 넣어 삽입한 뒤 PostgreSQL 시퀀스를 MAX(id) 다음 값으로 맞춤 (SQLite는 필요 없음)"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM \"{table.name}\"), 0) + 1, false)"
+        ))
+
+@contextmanager
+def timed_stage(timings, name):
+    """복원 단계별 소요 시간 누적"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0) + time.perf_counter() - started
+
+def report_restore_timings(timings):
+    logger.info("⏱️ 복원 단계별 시간: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()),
+                extra={'restore_seconds': {name: round(seconds, 3) for name, seconds in timings.items()}})
+
+def bulk_replace_tables(tables, table_batches):
+    """tables(외래키 의존 순서)를 역순으로 비우고 (테이블, 행 dict 목록)을 순서대로 일괄 삽입. 커밋은 호출자가"""
+    # 장부는 조를 참조하므로 먼저 비우고, 복원 후 reconcile_ledger()로 다시 계산
+    db.session.execute(db.delete(TeamLedger.__table__))
+    for table in reversed(tables):
+        db.session.execute(db.delete(table))
+    
+    counts = {table.name: 0 for table in tables}
+    for table, mappings in table_batches:
+        for start in range(0, len(mappings), RESTORE_BATCH_SIZE):
+            db.session.execute(table.insert(), mappings[start:start + RESTORE_BATCH_SIZE])
+        counts[table.name] += len(mappings)
+    
+    reset_id_sequences(tables)
+    # 일괄 삽입은 세션 flush 이벤트를 거치지 않으므로 변경 카운터는 직접 올림
+    bump_cache_version(db.session.connection(), TEAMS_CACHE_KEY)
+    bump_cache_version(db.session.connection(), PURCHASES_CACHE_KEY)
+    return counts
+
+def snapshot_batches(content, tables):
+    """압축 스냅샷 레코드를 (테이블, 행 dict 목록)으로 변환"""
+    for name, columns, rows in iter_snapshot(content):
+        table = tables.get(name)
+        if table is None or not rows:
+            continue
+        # 스키마가 바뀌어 없어진 열은 버리고, 날짜 열은 datetime 으로 되돌림
+        indexes = [(i, column) for i, column in enumerate(columns) if column in table.c]
+        datetime_columns = {column for _, column in indexes if isinstance(table.c[column].type, db.DateTime)}
+        mappings = []
+        for row in rows:
+            mapping = {column: row[i] for i, column in indexes}
+            for column in datetime_columns:
+                if mapping[column] is not None:
+                    mapping[column] = datetime.fromisoformat(mapping[column])
+            mappings.append(mapping)
+        yield table, mappings
+
+def restore_from_snapshot(content, timings=None):
+    """압축 스냅샷에서 모든 테이블을 일괄 삽입(executemany)으로 복원 - 한 트랜잭션"""
+    timings = {} if timings is None else timings
+    tables = {model.__table__.name: model.__table__ for model in SNAPSHOT_MODELS}
+    try:
+        with timed_stage(timings, 'load'):
+            counts = bulk_replace_tables(list(tables.values()), snapshot_batches(content, tables))
             db.session.commit()
-            print("기존 데이터 마이그레이션이 완료되었습니다.")
-            
-        except Exception as e:
-            print(f"마이그레이션 중 오류 발생: {e}")
-            # 오류 발생 시에도 데이터를 보존하고 계속 진행
-            print("마이그레이션을 건너뛰고 계속 진행합니다.")
+        logger.info("✅ 스냅샷 복원 완료: " + ", ".join(f"{name} {count}개" for name, count in counts.items()))
+        return True
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"❌ 스냅샷 복원 오류: {e}")
+        return False
+
+# JSON 백업 행 → 테이블 행 변환 (필수 값이 없거나 형식이 틀리면 KeyError/ValueError/TypeError)
+def parse_backup_datetime(value):
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S') if value else datetime.utcnow()
+
+def team_row_from_backup(data):
+    return {
+        'id': int(data['id']),
+        'name': str(data['name']),
+        'leader_name': data.get('leader_name') or '',
+        'department_budget': int(data['department_budget']),
+        'student_budget': int(data['student_budget']),
+        'original_department_budget': int(data.get('original_department_budget', data['department_budget'])),
+        'original_student_budget': int(data.get('original_student_budget', data['student_budget'])),
+    }
+
+def purchase_row_from_backup(data):
+    return {
+        'id': int(data['id']),
+        'team_id': int(data['team_id']),
+        'item_name': str(data['item_name']),
+        'quantity': int(data['quantity']),
+        'estimated_cost': int(data.get('estimated_cost', data.get('total_amount'))),
+        'link': data.get('link') or '',
+        'store': str(data['store']),
+        'is_approved': bool(data['is_approved']),
+        'budget_type': data.get('budget_type', 'department'),
+        'attachment_filename': data.get('attachment_filename'),
+        'created_at': parse_backup_datetime(data.get('request_date')),
+    }
+
+def multi_purchase_row_from_backup(data):
+    return {
+        'id': int(data['id']),
+        'team_id': int(data['team_id']),
+        'store': str(data['store']),
+        'total_cost': int(data.get('total_cost', data.get('total_amount'))),
+        'attachment_filename': data.get('attachment_filename'),
+        'is_approved': bool(data['is_approved']),
+        'budget_type': data.get('budget_type'),
+        'created_at': parse_backup_datetime(data.get('request_date')),
+    }
+
+def multi_purchase_item_row_from_backup(data, multi_purchase_id):
+    row = {
+        'multi_purchase_id': multi_purchase_id,
+        'item_name': str(data['item_name']),
+        'quantity': int(data['quantity']),
+        'unit_price': int(data['unit_price']),
+    }
+    if data.get('id') is not None:
+        row['id'] = int(data['id'])
+    return row
+
+def other_request_row_from_backup(data):
+    return {
+        'id': int(data['id']),
+        'team_id': int(data['team_id']),
+        'content': str(data['content']),
+        'created_at': parse_backup_datetime(data.get('request_date')),
+    }
+
+# 복원 대상 JSON 파일과 채우는 모델 (외래키 의존 순서, 다중 구매 품목은 다중 구매 파일에 포함)
+RESTORE_FILES = [
+    ('teams.json', 'teams', [Team]),
+    ('purchases.json', 'purchases', [Purchase]),
+    ('multi_purchases.json', 'multi_purchases', [MultiPurchase, MultiPurchaseItem]),
+    ('other_requests.json', 'other_requests', [OtherRequest]),
+]
+
+def validate_backup_rows(records):
+    """백업 JSON 목록을 테이블 행으로 변환·검증. ({테이블: 행 목록}, 건너뛴 행 수) 반환"""
+    skipped = []
+    
+    def convert(convert_func, data, *args):
+        try:
+            return convert_func(data, *args)
+        except (KeyError, ValueError, TypeError) as e:
+            skipped.append(e)
+            return None
+    
+    teams = [row for row in (convert(team_row_from_backup, d) for d in records['teams.json']) if row]
+    team_ids = {row['id'] for row in teams}
+    
+    def owned_by_known_team(row):
+        if row is None:
+            return False
+        if row['team_id'] not in team_ids:
+            skipped.append(ValueError(f"알 수 없는 team_id {row['team_id']}"))
+            return False
+        return True
+    
+    purchases = [row for row in (convert(purchase_row_from_backup, d) for d in records['purchases.json'])
+                 if owned_by_known_team(row)]
+    
+    multi_purchases, multi_purchase_items = [], []
+    for data in records['multi_purchases.json']:
+        row = convert(multi_purchase_row_from_backup, data)
+        if not owned_by_known_team(row):
+            continue
+        items = [convert(multi_purchase_item_row_from_backup, item, row['id']) for item in data.get('items', [])]
+        multi_purchases.append(row)
+        multi_purchase_items.extend(item for item in items if item)
+    # 품목 id 가 없는 예전 백업이 섞여 있으면 executemany 열을 맞추기 위해 모두 새로 발급
+    if any('id' not in item for item in multi_purchase_items):
+        for item in multi_purchase_items:
+            item.pop('id', None)
+    
+    other_requests = [row for row in (convert(other_request_row_from_backup, d) for d in records['other_requests.json'])
+                      if owned_by_known_team(row)]
+    
+    if skipped:
+        logger.warning(f"⚠️ 형식이 맞지 않는 백업 행 {len(skipped)}개를 건너뜁니다 (예: {skipped[0]})")
+    return {
+        Team.__table__: teams,
+        Purchase.__table__: purchases,
+        MultiPurchase.__table__: multi_purchases,
+        MultiPurchaseItem.__table__: multi_purchase_items,
+        OtherRequest.__table__: other_requests,
+    }, len(skipped)
+
+def download_journals():
+    """GitHub 의 변경분 저널 {테이블: 내용}, 복원을 멈춰야 하면 None
+    incremental 모드는 네 저널을 받고 없는 저널(404)은 변경 없음, 그 밖의 다운로드 실패는 복원 중단.
+    full 모드는 저널을 쓰지 않으므로 GitHub 폴더에 내용이 있는 저널(incremental 에서 바꾼 직후 등)만 받고,
+    받지 못해도 저널 없이 스냅샷/JSON 으로 복원"""
+    keys = [key for _, key, _ in RESTORE_FILES]
+    journals = {key: '' for key in keys}
+    if BACKUP_MODE != 'incremental':
+        listing = list_github_backup_files()
+        if listing is None:
+            logger.warning("⚠️ GitHub 백업 폴더 목록을 받지 못해 저널 없이 복원합니다.")
+            return journals
+        keys = [key for key in keys if listing.get(journal_filename(key))]
+    
+    journals.update({key: download_from_github(journal_filename(key), missing_ok=True) for key in keys})
+    failed = [journal_filename(key) for key, content in journals.items() if content is None]
+    if not failed:
+        return journals
+    if BACKUP_MODE == 'incremental':
+        logger.warning(f"⚠️ {', '.join(failed)} 을 받지 못해 복원을 건너뜁니다 (기존 데이터 유지).")
+        return None
+    logger.warning(f"⚠️ {', '.join(failed)} 을 받지 못해 저널 없이 복원합니다.")
+    return {key: '' for key in journals}
 
 def restore_from_json():
-    """JSON 백업 파일에서 데이터 복원"""
+    """JSON 백업 파일에서 모든 테이블 복원 (BACKUP_SNAPSHOT=1이면 압축 스냅샷을 먼저 시도)
+    
+    다운로드 → 파싱 → 검증 → 일괄 삽입(한 트랜잭션) → 장부 재계산 순서로 진행하고 단계별 시간을 출력.
+    백업은 항상 네 파일을 함께 올리므로, 하나라도 받지 못하면 아무것도 바꾸지 않음 (전부 아니면 전무).
+    증분 백업(BACKUP_MODE=incremental)의 저널(<테이블>.journal.jsonl)이 있으면 JSON 행에 순서대로 적용 (download_journals 참고).
+    """
+    global _full_backup_requested
+    timings = {}
     try:
-        print("🔄 JSON 백업에서 데이터 복원 시도...")
+        # 마지막 전체 백업 이후의 변경분
+        with timed_stage(timings, 'download'):
+            journals = download_journals()
+        if journals is None:
+            return False
+        has_journal = any(journals.values())
+        
+        if BACKUP_SNAPSHOT and has_journal:
+            logger.info("저널 변경분이 있어 스냅샷 대신 JSON 백업 + 저널로 복원합니다.")
+        elif BACKUP_SNAPSHOT:
+            logger.info("🔄 압축 스냅샷에서 데이터 복원 시도...")
+            with timed_stage(timings, 'download'):
+                snapshot_content = download_from_github(SNAPSHOT_FILENAME, binary=True)
+            if snapshot_content and restore_from_snapshot(snapshot_content, timings):
+                with timed_stage(timings, 'ledger'):
+                    reconcile_ledger()
+                report_restore_timings(timings)
+                return True
+            logger.warning("⚠️ 스냅샷 복원 실패 - JSON 백업으로 복원합니다.")
+        
+        logger.info("🔄 JSON 백업에서 데이터 복원 시도...")
+        with timed_stage(timings, 'download'):
+            contents = {filename: download_from_github(filename) for filename, _, _ in RESTORE_FILES}
+        missing = [filename for filename, content in contents.items() if not content]
+        if missing:
+            # 조만 바꾸고 구매내역은 예전 것으로 남기면 외래키가 어긋나므로 기존 데이터를 그대로 둠
+            logger.warning(f"⚠️ {', '.join(missing)} 을 받지 못해 복원을 건너뜁니다 (기존 데이터 유지).")
+            return False
         
-        # GitHub에서 팀 데이터 다운로드
-        teams_content = download_from_github('teams.json')
-        if teams_content:
-            teams_data = json.loads(teams_content)
-            
-            for team_data in teams_data.get('teams', []):
-                existing_team = Team.query.get(team_data['id'])
-                if existing_team:
-                    # 기존 팀 업데이트
-                    existing_team.leader_name = team_data['leader_name']
-                    existing_team.department_budget = team_data['department_budget']
-                    existing_team.student_budget = team_data['student_budget']
-                    if hasattr(existing_team, 'original_department_budget'):
-                        existing_team.original_department_budget = team_data.get('original_department_budget', team_data['department_budget'])
-                    if hasattr(existing_team, 'original_student_budget'):
-                        existing_team.original_student_budget = team_data.get('original_student_budget', team_data['student_budget'])
-                else:
-                    # 새 팀 생성
-                    team = Team(
-                        id=team_data['id'],
-                        name=team_data['name'],
-                        leader_name=team_data['leader_name'],
-                        department_budget=team_data['department_budget'],
-                        student_budget=team_data['student_budget']
-                    )
-                    if hasattr(team, 'original_department_budget'):
-                        team.original_department_budget = team_data.get('original_department_budget', team_data['department_budget'])
-                    if hasattr(team, 'original_student_budget'):
-                        team.original_student_budget = team_data.get('original_student_budget', team_data['student_budget'])
-                    db.session.add(team)
-            
-            db.session.commit()
-            print(f"✅ {len(teams_data.get('teams', []))}개 팀 데이터 복원 완료!")
+        tables = [model.__table__ for _, _, models in RESTORE_FILES for model in models]
         
-        # GitHub에서 구매내역 다운로드
-        purchases_content = download_from_github('purchases.json')
-        if purchases_content:
-            purchases_data = json.loads(purchases_content)
-            
-            # 기존 구매내역 모두 삭제 (새 데이터베이스이므로)
-            Purchase.query.delete()
-            
-            for purchase_data in purchases_data.get('purchases', []):
-                purchase = Purchase(
-                    id=purchase_data['id'],
-                    team_id=purchase_data['team_id'],
-                    item_name=purchase_data['item_name'],
-                    quantity=purchase_data['quantity'],
-                    estimated_cost=purchase_data['total_amount'],
-                    link=purchase_data.get('link', ''),
-                    store=purchase_data['store'],
-                    is_approved=purchase_data['is_approved'],
-                    budget_type=purchase_data.get('budget_type', 'department'),
-                    attachment_filename=purchase_data.get('attachment_filename'),
-                    request_date=datetime.strptime(purchase_data['request_date'], '%Y-%m-%d %H:%M:%S')
-                )
-                db.session.add(purchase)
-            
+        with timed_stage(timings, 'parse'):
+            records = {filename: json.loads(contents[filename]).get(key, []) for filename, key, _ in RESTORE_FILES}
+            del contents
+            if has_journal:
+                records = {filename: replay_lines(records[filename], journals[key].splitlines())
+                           for filename, key, _ in RESTORE_FILES}
+                logger.info("🔁 저널 변경분 적용: " + ", ".join(
+                    f"{key} {sum(1 for line in journals[key].splitlines() if line.strip())}개"
+                    for _, key, _ in RESTORE_FILES if journals[key]))
+        
+        with timed_stage(timings, 'validate'):
+            rows, skipped = validate_backup_rows(records)
+            del records
+        
+        with timed_stage(timings, 'load'):
+            counts = bulk_replace_tables(tables, [(table, rows[table]) for table in tables])
             db.session.commit()
-            print(f"✅ {len(purchases_data.get('purchases', []))}개 구매내역 복원 완료!")
+        logger.info("✅ JSON 복원 완료: " + ", ".join(f"{name} {count}개" for name, count in counts.items())
+              + (f" (건너뜀 {skipped}개)" if skipped else ""))
+        
+        if has_journal:
+            # 로컬 저널을 GitHub 저널과 맞추고(빈 로컬 저널로 덮어 올리지 않도록), 다음 백업은 전체 스냅샷으로 압축
+            change_journal.load(journals)
+            _full_backup_requested = True
         
+        # 복원된 구매내역 기준으로 장부 재계산
+        with timed_stage(timings, 'ledger'):
+            reconcile_ledger()
+        
+        report_restore_timings(timings)
         return True
         
     except Exception as e:
-        print(f"❌ JSON 복원 오류: {e}")
+        db.session.rollback()
+        logger.exception(f"❌ JSON 복원 오류: {e}")
         return False
 
 def init_db():
     """데이터베이스 초기화 (GitHub 복원 우선, 실패 시 기존 데이터 유지)"""
     with app.app_context():
         try:
-            print("📝 데이터베이스 초기화 시작...")
+            logger.info("📝 데이터베이스 초기화 시작...")
             
             # 1. 테이블 생성
             db.create_all()
-            print("테이블 생성 완료")
+            logger.info("테이블 생성 완료")
             
             # 2. GitHub에서 데이터 복원 시도
-            print("🔄 GitHub에서 데이터 복원 시도...")
+            logger.info("🔄 GitHub에서 데이터 복원 시도...")
             restore_success = restore_from_json()
             
             # 3. 복원 결과 확인
             existing_teams = Team.query.count()
             if existing_teams == 0:
-                print("⚠️ GitHub 복원 실패 - 초기 팀 데이터를 생성합니다.")
+                logger.warning("⚠️ GitHub 복원 실패 - 초기 팀 데이터를 생성합니다.")
                 teams_data = [
                     {'name': '월요일 1조', 'department_budget': 600000, 'student_budget': 500000, 'original_department_budget': 600000, 'original_student_budget': 500000},
                     {'name': '월요일 2조', 'department_budget': 700000, 'student_budget': 500000, 'original_department_budget': 700000, 'original_student_budget': 500000},
@@ -1262,25 +2444,38 @@ def init_db():
                     team = Team(**team_data)
                     db.session.add(team)
                 db.session.commit()
-                print("초기 팀 데이터가 생성되었습니다.")
+                logger.info("초기 팀 데이터가 생성되었습니다.")
             else:
-                print(f"✅ GitHub에서 {existing_teams}개 팀 데이터 복원 완료!")
+                logger.info(f"✅ GitHub에서 {existing_teams}개 팀 데이터 복원 완료!")
                 # 복원된 팀 정보 출력
                 for team in Team.query.all():
-                    print(f"  - {team.name}: 조장={team.leader_name or '미설정'}")
+                    logger.debug(f"  - {team.name}: 조장={team.leader_name or '미설정'}")
                 
                 # 복원 성공 시 기존 데이터 유지 메시지
-                print("🎉 기존 데이터가 성공적으로 복원되었습니다!")
+                logger.info("🎉 기존 데이터가 성공적으로 복원되었습니다!")
             
-            print("🎉 데이터베이스 초기화 완료!")
+            logger.info("🎉 데이터베이스 초기화 완료!")
             
-            # 4. 현재 상태를 GitHub에 백업
-            print("🔄 현재 상태를 GitHub에 백업...")
-            backup_to_json()
+            # 4. 현재 상태를 GitHub에 백업 (BACKUP_ASYNC=1이면 백그라운드 워커가 처리해 시작을 막지 않음)
+            logger.info("🔄 현재 상태를 GitHub에 백업...")
+            schedule_backup('init_db')
             
         except Exception as e:
-            print(f"❌ 데이터베이스 초기화 중 오류: {e}")
-            print("오류 발생했지만 계속 진행합니다.")
+            logger.exception(f"❌ 데이터베이스 초기화 중 오류: {e}")
+            logger.warning("오류 발생했지만 계속 진행합니다.")
+
+def run_startup(task):
+    """부팅 작업: 테이블 생성 후, RESTORE_ON_BOOT 이거나 팀 데이터가 없을 때만 복원/시드"""
+    with app.app_context():
+        db.create_all()
+        migrate_database()
+        task.mark('schema')
+        if RESTORE_ON_BOOT or Team.query.count() == 0:
+            # 사용자가 명시적으로 요청했거나 최초 1회 초기 시드가 필요한 경우에만 GitHub 복원 로직 수행
+            init_db()
+            task.mark('restore')
+
+startup_task = StartupTask(run_startup)
 
 # view_data 라우트는 이미 정의되어 있음 (중복 제거)
 
@@ -1291,6 +2486,7 @@ def reset_database():
     
     try:
         # 모든 데이터 삭제
+        TeamLedger.query.delete()
         MultiPurchaseItem.query.delete()
         MultiPurchase.query.delete()
         Purchase.query.delete()
@@ -1315,13 +2511,18 @@ def reset_database():
         for team in default_teams:
             db.session.add(team)
         
+        # 일괄 삭제는 세션 이벤트에 잡히지 않으므로 변경 카운터는 직접 올림
+        bump_cache_version(db.session.connection(), TEAMS_CACHE_KEY)
+        bump_cache_version(db.session.connection(), PURCHASES_CACHE_KEY)
         db.session.commit()
+        # 다음 백업은 변경분 대신 전체 스냅샷으로
+        request_full_backup()
         flash('데이터베이스가 성공적으로 초기화되었습니다.', 'success')
         
     except Exception as e:
         db.session.rollback()
         flash('데이터베이스 초기화 중 오류가 발생했습니다.', 'error')
-        print(f"❌ 데이터베이스 초기화 오류: {e}")
+        logger.exception(f"❌ 데이터베이스 초기화 오류: {e}")
     
     return redirect(url_for('admin'))
 
@@ -1442,7 +2643,7 @@ def export_text():
         
     except Exception as e:
         flash('데이터 내보내기 중 오류가 발생했습니다.', 'error')
-        print(f"❌ 텍스트 내보내기 오류: {e}")
+        logger.exception(f"❌ 텍스트 내보내기 오류: {e}")
         return redirect(url_for('admin'))
 
 @app.route('/export_excel_text')
@@ -1510,41 +2711,48 @@ def export_excel_text():
         return render_template('export_text.html', text_content=text_content, current_time=current_time)
         
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"❌ 엑셀 텍스트 내보내기 오류: {e}")
-        print(f"❌ 상세 오류: {error_details}")
+        logger.exception(f"❌ 엑셀 텍스트 내보내기 오류: {e}")
         flash(f'데이터 내보내기 중 오류가 발생했습니다: {str(e)}', 'error')
         return redirect(url_for('admin'))
 
+def rewind_request_files(attempt):
+    """다시 실행하기 전: 이전 시도가 저장한 첨부파일을 지우고(커밋되지 않았으므로) 업로드 스트림을 처음으로"""
+    DB_LOCK_RETRIES.inc(route=request.endpoint or 'unknown')
+    for file_path in g.pop('saved_uploads', []):
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 재시도 전 첨부파일 삭제 실패: {e}", extra={'file_path': file_path})
+    for file in request.files.values():
+        file.stream.seek(0)
+
+def retry_locked_writes():
+    """SQLite: 쓰기 라우트(POST + 복원 중 막는 GET 쓰기)를 잠금 재시도로 감쌈
+    커밋 시점에 잠금 오류가 나면 세션을 롤백하고 라우트 전체를 다시 실행 (읽은 값도 새로 읽도록)"""
+    if not IS_SQLITE or SQLITE_WRITE_RETRIES <= 0:
+        return
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()
+                 if 'POST' in rule.methods or rule.endpoint in WARMING_WRITE_ENDPOINTS}
+    for endpoint in endpoints:
+        app.view_functions[endpoint] = retry_locked(app.view_functions[endpoint], db.session.rollback,
+                                                    retries=SQLITE_WRITE_RETRIES, base_delay=SQLITE_RETRY_BASE_MS / 1000,
+                                                    on_retry=rewind_request_files)
+
+retry_locked_writes()
+
 if __name__ == '__main__':
     # 테이블만 생성(데이터 보존). 필요할 때만 복원/시드
-    with app.app_context():
-        db.create_all()
-        restore_flag = os.environ.get('RESTORE_ON_BOOT', '0').lower() in ('1', 'true', 'yes')
-        if restore_flag:
-            # 사용자가 명시적으로 요청한 경우에만 GitHub 복원 로직 수행
-            init_db()
-        else:
-            # 팀 데이터가 전혀 없을 때 최초 1회 초기 시드
-            if Team.query.count() == 0:
-                init_db()
-
-    print("=" * 60)
-    print("🎓 예산 관리 시스템 (Flask)이 시작되었습니다!")
-    print("=" * 60)
-    print(f"🌐 접속 주소: http://127.0.0.1:{PORT}")
-    print(f"🌐 또는: http://localhost:{PORT}")
-    print("=" * 60)
-    print("✅ 모든 기능이 사용 가능합니다!")
-    print("   - 구매내역 업로드")
-    print("   - 조별 잔여금액 확인")
-    print("   - 관리자 모드 (MSE3105 / KHU)")
-    print("   - 데이터베이스 보기 (다운로드 기능 제거됨)")
-    print("=" * 60)
+    if STARTUP_MODE == 'lazy':
+        # 바로 포트를 열고 복원은 백그라운드에서 (진행 상태는 /health)
+        startup_task.start()
+        logger.info("⏳ lazy 시작: 복원이 끝날 때까지 읽기 전용으로 응답합니다 (/health 로 확인)")
+    else:
+        startup_task.run()
 
     # Render 배포를 위한 포트 설정
     port = int(os.environ.get('PORT', PORT))
+    logger.info(f"🎓 예산 관리 시스템 (Flask)이 시작되었습니다! 접속 주소: http://127.0.0.1:{port}",
+                extra={'port': port, 'startup_mode': STARTUP_MODE})
     # 운영 환경에서는 디버그 모드 비활성화
     debug_mode = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
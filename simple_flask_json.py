@@ -5,10 +5,12 @@ JSON 파일 기반 Flask 서버 (데이터 영구 보존)
 
 from flask import Flask, render_template, request, redirect, url_for, flash, session
 import os
-import json
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import uuid
+from json_storage import JsonStorage
+from json_event_store import JsonEventStore, insert, update, delete
+from json_stats import apply_team_usage
 # 기본 설정 (config.py 의존성 제거)
 HOST = '0.0.0.0'
 PORT = 5000
@@ -22,7 +24,7 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
 # JSON 파일 경로 설정
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DATA_DIR = os.environ.get('JSON_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
 TEAMS_FILE = os.path.join(DATA_DIR, 'teams.json')
 PURCHASES_FILE = os.path.join(DATA_DIR, 'purchases.json')
 MULTI_PURCHASES_FILE = os.path.join(DATA_DIR, 'multi_purchases.json')
@@ -30,6 +32,21 @@ OTHER_REQUESTS_FILE = os.path.join(DATA_DIR, 'other_requests.json')
 
 print(f"📁 JSON 데이터 디렉토리: {DATA_DIR}")
 
+# 파일 잠금 + 원자적 저장 (여러 gunicorn 워커가 같은 파일을 고쳐도 변경이 사라지지 않도록)
+storage = JsonStorage(DATA_DIR)
+
+# 변경은 events.jsonl 에 한 줄씩 추가하고, JSON_COMPACT_EVERY 줄마다 위 스냅샷 파일들로 압축
+JSON_COMPACT_EVERY = int(os.environ.get('JSON_COMPACT_EVERY', '500'))
+COLLECTION_FILES = {
+    'teams': TEAMS_FILE,
+    'purchases': PURCHASES_FILE,
+    'multi_purchases': MULTI_PURCHASES_FILE,
+    'other_requests': OTHER_REQUESTS_FILE,
+}
+COLLECTION_BY_FILE = {path: collection for collection, path in COLLECTION_FILES.items()}
+event_store = JsonEventStore(storage, COLLECTION_FILES, os.path.join(DATA_DIR, 'events.jsonl'),
+                             compact_every=JSON_COMPACT_EVERY)
+
 # 파일 업로드 설정
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx'}
@@ -49,39 +66,37 @@ def allowed_file(filename):
 
 # JSON 파일 읽기/쓰기 함수들
 def load_json(file_path):
-    """JSON 파일 로드"""
+    """컬렉션 로드 (스냅샷 + 이벤트 로그 재생 결과, 기존과 같은 {키: 목록} 형태)"""
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        collection = COLLECTION_BY_FILE[file_path]
+        return {collection: event_store.rows(collection)}
     except Exception as e:
         print(f"❌ JSON 파일 로드 오류 ({file_path}): {e}")
         return {}
 
 def save_json(file_path, data):
-    """JSON 파일 저장"""
+    """컬렉션 전체 교체 (초기화용, 스냅샷으로 바로 압축됨)"""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        collection = COLLECTION_BY_FILE[file_path]
+        event_store.replace(collection, data.get(collection, []))
         return True
     except Exception as e:
         print(f"❌ JSON 파일 저장 오류 ({file_path}): {e}")
         return False
 
-def get_next_id(data_list, id_key='id'):
-    """다음 ID 생성"""
-    if not data_list:
-        return 1
-    return max(item.get(id_key, 0) for item in data_list) + 1
-
 def init_data():
     """데이터 초기화 (기존 데이터 보존)"""
     print("🔄 데이터 초기화 시작...")
     
     # data 디렉토리 생성
     os.makedirs(DATA_DIR, exist_ok=True)
+    with storage.locked():
+        _init_data_files()
     
+    print("🎉 데이터 초기화 완료!")
+
+def _init_data_files():
+    """팀/구매 데이터 파일이 없으면 기본값으로 생성 (init_data 에서 잠금 안에서 호출)"""
     # 팀 데이터 확인 및 초기화
     teams_data = load_json(TEAMS_FILE)
     if not teams_data.get('teams'):
@@ -114,8 +129,6 @@ def init_data():
         if not data.get(key):
             data = {key: []}
             save_json(file_path, data)
-    
-    print("🎉 데이터 초기화 완료!")
 
 # 라우트들
 @app.route('/')
@@ -126,6 +139,7 @@ def index():
     return render_template('index.html', teams=teams)
 
 @app.route('/upload', methods=['POST'])
+@storage.exclusive
 def upload():
     """구매내역 업로드"""
     try:
@@ -147,8 +161,7 @@ def upload():
                 file.save(os.path.join(app.config['UPLOAD_FOLDER'], attachment_filename))
         
         # 팀 정보 로드
-        teams_data = load_json(TEAMS_FILE)
-        team = next((t for t in teams_data['teams'] if t['id'] == team_id), None)
+        team = event_store.get('teams', team_id)
         if not team:
             flash('팀을 찾을 수 없습니다.', 'error')
             return redirect(url_for('index'))
@@ -167,9 +180,8 @@ def upload():
                 return redirect(url_for('index'))
         
         # 구매내역 저장
-        purchases_data = load_json(PURCHASES_FILE)
         purchase = {
-            'id': get_next_id(purchases_data['purchases']),
+            'id': event_store.next_id('purchases'),
             'team_id': team_id,
             'item_name': item_name,
             'price': price,
@@ -184,8 +196,7 @@ def upload():
             'is_approved': False
         }
         
-        purchases_data['purchases'].append(purchase)
-        save_json(PURCHASES_FILE, purchases_data)
+        event_store.commit(insert('purchases', purchase))
         
         flash('구매내역이 성공적으로 등록되었습니다!', 'success')
         return redirect(url_for('index'))
@@ -198,6 +209,7 @@ def upload():
 # 다중 품목 업로드 기능 제거 (단순화)
 
 @app.route('/other_request', methods=['POST'])
+@storage.exclusive
 def other_request():
     """기타 요청 등록"""
     try:
@@ -206,16 +218,14 @@ def other_request():
         description = request.form.get('description', '').strip()
         
         # 팀 정보 로드
-        teams_data = load_json(TEAMS_FILE)
-        team = next((t for t in teams_data['teams'] if t['id'] == team_id), None)
+        team = event_store.get('teams', team_id)
         if not team:
             flash('팀을 찾을 수 없습니다.', 'error')
             return redirect(url_for('index'))
         
         # 기타 요청 저장
-        other_requests_data = load_json(OTHER_REQUESTS_FILE)
         other_request = {
-            'id': get_next_id(other_requests_data['other_requests']),
+            'id': event_store.next_id('other_requests'),
             'team_id': team_id,
             'request_type': request_type,
             'description': description,
@@ -224,8 +234,7 @@ def other_request():
             'is_approved': False
         }
         
-        other_requests_data['other_requests'].append(other_request)
-        save_json(OTHER_REQUESTS_FILE, other_requests_data)
+        event_store.commit(insert('other_requests', other_request))
         
         flash('기타 요청이 성공적으로 등록되었습니다!', 'success')
         return redirect(url_for('index'))
@@ -252,34 +261,8 @@ def admin():
     multi_purchases = multi_purchases_data.get('multi_purchases', [])
     other_requests = other_requests_data.get('other_requests', [])
     
-    # 팀별 구매내역 통계 계산
-    for team in teams:
-        team['used_department'] = 0
-        team['used_student'] = 0
-        
-        # 일반 구매내역
-        for purchase in purchases:
-            if purchase['team_id'] == team['id'] and purchase['is_approved']:
-                if purchase['budget_type'] == 'department':
-                    team['used_department'] += purchase['total_amount']
-                else:
-                    team['used_student'] += purchase['total_amount']
-        
-        # 다중 구매내역
-        for multi_purchase in multi_purchases:
-            if multi_purchase['team_id'] == team['id'] and multi_purchase['is_approved']:
-                if multi_purchase['budget_type'] == 'department':
-                    team['used_department'] += multi_purchase['total_amount']
-                else:
-                    team['used_student'] += multi_purchase['total_amount']
-        
-        # 잔여 예산 계산
-        team['remaining_department'] = team['department_budget'] - team['used_department']
-        team['remaining_student'] = team['student_budget'] - team['used_student']
-        team['total_budget'] = team['department_budget'] + team['student_budget']
-        team['total_used'] = team['used_department'] + team['used_student']
-        team['total_remaining'] = team['total_budget'] - team['total_used']
-        team['remaining_rate'] = (team['total_remaining'] / team['total_budget'] * 100) if team['total_budget'] > 0 else 0
+    # 팀별 구매내역 통계 계산 ((팀, 예산 종류)별 승인 금액을 한 번에 합산)
+    apply_team_usage(teams, purchases, multi_purchases)
     
     return render_template('admin.html', teams=teams, purchases=purchases, multi_purchases=multi_purchases, other_requests=other_requests)
 
@@ -305,14 +288,14 @@ def logout():
     return redirect(url_for('index'))
 
 @app.route('/approve_purchase/<int:purchase_id>')
+@storage.exclusive
 def approve_purchase(purchase_id):
     """구매내역 승인"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        purchases_data = load_json(PURCHASES_FILE)
-        purchase = next((p for p in purchases_data['purchases'] if p['id'] == purchase_id), None)
+        purchase = event_store.get('purchases', purchase_id)
         
         if not purchase:
             flash('구매내역을 찾을 수 없습니다.', 'error')
@@ -323,8 +306,7 @@ def approve_purchase(purchase_id):
             return redirect(url_for('admin'))
         
         # 팀 정보 로드
-        teams_data = load_json(TEAMS_FILE)
-        team = next((t for t in teams_data['teams'] if t['id'] == purchase['team_id']), None)
+        team = event_store.get('teams', purchase['team_id'])
         if not team:
             flash('팀을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
@@ -339,19 +321,13 @@ def approve_purchase(purchase_id):
                 flash('학생지원사업 예산이 부족합니다.', 'error')
                 return redirect(url_for('admin'))
         
-        # 구매내역 승인
-        purchase['is_approved'] = True
-        purchase['status'] = '승인됨'
-        purchase['approved_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # 팀 예산 차감
-        if purchase['budget_type'] == 'department':
-            team['department_budget'] -= purchase['total_amount']
-        else:
-            team['student_budget'] -= purchase['total_amount']
-        
-        save_json(PURCHASES_FILE, purchases_data)
-        save_json(TEAMS_FILE, teams_data)
+        # 구매내역 승인 + 팀 예산 차감 (한 줄로 기록)
+        budget_field = 'department_budget' if purchase['budget_type'] == 'department' else 'student_budget'
+        event_store.commit(
+            update('purchases', purchase_id, is_approved=True, status='승인됨',
+                   approved_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            update('teams', team['id'], **{budget_field: team[budget_field] - purchase['total_amount']})
+        )
         
         flash('구매내역이 승인되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -362,34 +338,30 @@ def approve_purchase(purchase_id):
         return redirect(url_for('admin'))
 
 @app.route('/cancel_purchase/<int:purchase_id>')
+@storage.exclusive
 def cancel_purchase(purchase_id):
     """구매내역 취소"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        purchases_data = load_json(PURCHASES_FILE)
-        purchase = next((p for p in purchases_data['purchases'] if p['id'] == purchase_id), None)
+        purchase = event_store.get('purchases', purchase_id)
         
         if not purchase:
             flash('구매내역을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
         
+        changes = [delete('purchases', purchase_id)]
         if purchase['is_approved']:
             # 팀 정보 로드
-            teams_data = load_json(TEAMS_FILE)
-            team = next((t for t in teams_data['teams'] if t['id'] == purchase['team_id']), None)
+            team = event_store.get('teams', purchase['team_id'])
             if team:
                 # 예산 복원
-                if purchase['budget_type'] == 'department':
-                    team['department_budget'] += purchase['total_amount']
-                else:
-                    team['student_budget'] += purchase['total_amount']
-                save_json(TEAMS_FILE, teams_data)
+                budget_field = 'department_budget' if purchase['budget_type'] == 'department' else 'student_budget'
+                changes.append(update('teams', team['id'], **{budget_field: team[budget_field] + purchase['total_amount']}))
         
-        # 구매내역 삭제
-        purchases_data['purchases'] = [p for p in purchases_data['purchases'] if p['id'] != purchase_id]
-        save_json(PURCHASES_FILE, purchases_data)
+        # 구매내역 삭제 (예산 복원과 함께 한 줄로 기록)
+        event_store.commit(*changes)
         
         flash('구매내역이 취소되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -400,14 +372,14 @@ def cancel_purchase(purchase_id):
         return redirect(url_for('admin'))
 
 @app.route('/approve_multi_purchase/<int:purchase_id>')
+@storage.exclusive
 def approve_multi_purchase(purchase_id):
     """다중 구매내역 승인"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        multi_purchases_data = load_json(MULTI_PURCHASES_FILE)
-        multi_purchase = next((p for p in multi_purchases_data['multi_purchases'] if p['id'] == purchase_id), None)
+        multi_purchase = event_store.get('multi_purchases', purchase_id)
         
         if not multi_purchase:
             flash('구매내역을 찾을 수 없습니다.', 'error')
@@ -418,8 +390,7 @@ def approve_multi_purchase(purchase_id):
             return redirect(url_for('admin'))
         
         # 팀 정보 로드
-        teams_data = load_json(TEAMS_FILE)
-        team = next((t for t in teams_data['teams'] if t['id'] == multi_purchase['team_id']), None)
+        team = event_store.get('teams', multi_purchase['team_id'])
         if not team:
             flash('팀을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
@@ -434,19 +405,13 @@ def approve_multi_purchase(purchase_id):
                 flash('학생지원사업 예산이 부족합니다.', 'error')
                 return redirect(url_for('admin'))
         
-        # 다중 구매내역 승인
-        multi_purchase['is_approved'] = True
-        multi_purchase['status'] = '승인됨'
-        multi_purchase['approved_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # 팀 예산 차감
-        if multi_purchase['budget_type'] == 'department':
-            team['department_budget'] -= multi_purchase['total_amount']
-        else:
-            team['student_budget'] -= multi_purchase['total_amount']
-        
-        save_json(MULTI_PURCHASES_FILE, multi_purchases_data)
-        save_json(TEAMS_FILE, teams_data)
+        # 다중 구매내역 승인 + 팀 예산 차감 (한 줄로 기록)
+        budget_field = 'department_budget' if multi_purchase['budget_type'] == 'department' else 'student_budget'
+        event_store.commit(
+            update('multi_purchases', purchase_id, is_approved=True, status='승인됨',
+                   approved_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            update('teams', team['id'], **{budget_field: team[budget_field] - multi_purchase['total_amount']})
+        )
         
         flash('다중 구매내역이 승인되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -457,34 +422,30 @@ def approve_multi_purchase(purchase_id):
         return redirect(url_for('admin'))
 
 @app.route('/cancel_multi_purchase/<int:purchase_id>')
+@storage.exclusive
 def cancel_multi_purchase(purchase_id):
     """다중 구매내역 취소"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        multi_purchases_data = load_json(MULTI_PURCHASES_FILE)
-        multi_purchase = next((p for p in multi_purchases_data['multi_purchases'] if p['id'] == purchase_id), None)
+        multi_purchase = event_store.get('multi_purchases', purchase_id)
         
         if not multi_purchase:
             flash('구매내역을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
         
+        changes = [delete('multi_purchases', purchase_id)]
         if multi_purchase['is_approved']:
             # 팀 정보 로드
-            teams_data = load_json(TEAMS_FILE)
-            team = next((t for t in teams_data['teams'] if t['id'] == multi_purchase['team_id']), None)
+            team = event_store.get('teams', multi_purchase['team_id'])
             if team:
                 # 예산 복원
-                if multi_purchase['budget_type'] == 'department':
-                    team['department_budget'] += multi_purchase['total_amount']
-                else:
-                    team['student_budget'] += multi_purchase['total_amount']
-                save_json(TEAMS_FILE, teams_data)
+                budget_field = 'department_budget' if multi_purchase['budget_type'] == 'department' else 'student_budget'
+                changes.append(update('teams', team['id'], **{budget_field: team[budget_field] + multi_purchase['total_amount']}))
         
-        # 다중 구매내역 삭제
-        multi_purchases_data['multi_purchases'] = [p for p in multi_purchases_data['multi_purchases'] if p['id'] != purchase_id]
-        save_json(MULTI_PURCHASES_FILE, multi_purchases_data)
+        # 다중 구매내역 삭제 (예산 복원과 함께 한 줄로 기록)
+        event_store.commit(*changes)
         
         flash('다중 구매내역이 취소되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -495,14 +456,14 @@ def cancel_multi_purchase(purchase_id):
         return redirect(url_for('admin'))
 
 @app.route('/approve_other_request/<int:request_id>')
+@storage.exclusive
 def approve_other_request(request_id):
     """기타 요청 승인"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        other_requests_data = load_json(OTHER_REQUESTS_FILE)
-        other_request = next((r for r in other_requests_data['other_requests'] if r['id'] == request_id), None)
+        other_request = event_store.get('other_requests', request_id)
         
         if not other_request:
             flash('기타 요청을 찾을 수 없습니다.', 'error')
@@ -513,11 +474,8 @@ def approve_other_request(request_id):
             return redirect(url_for('admin'))
         
         # 기타 요청 승인
-        other_request['is_approved'] = True
-        other_request['status'] = '승인됨'
-        other_request['approved_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        save_json(OTHER_REQUESTS_FILE, other_requests_data)
+        event_store.commit(update('other_requests', request_id, is_approved=True, status='승인됨',
+                                  approved_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
         
         flash('기타 요청이 승인되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -528,22 +486,21 @@ def approve_other_request(request_id):
         return redirect(url_for('admin'))
 
 @app.route('/cancel_other_request/<int:request_id>')
+@storage.exclusive
 def cancel_other_request(request_id):
     """기타 요청 취소"""
     if 'admin_logged_in' not in session:
         return redirect(url_for('admin'))
     
     try:
-        other_requests_data = load_json(OTHER_REQUESTS_FILE)
-        other_request = next((r for r in other_requests_data['other_requests'] if r['id'] == request_id), None)
+        other_request = event_store.get('other_requests', request_id)
         
         if not other_request:
             flash('기타 요청을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
         
         # 기타 요청 삭제
-        other_requests_data['other_requests'] = [r for r in other_requests_data['other_requests'] if r['id'] != request_id]
-        save_json(OTHER_REQUESTS_FILE, other_requests_data)
+        event_store.commit(delete('other_requests', request_id))
         
         flash('기타 요청이 취소되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -554,6 +511,7 @@ def cancel_other_request(request_id):
         return redirect(url_for('admin'))
 
 @app.route('/update_team_leader', methods=['POST'])
+@storage.exclusive
 def update_team_leader():
     """팀 조장 정보 업데이트"""
     if 'admin_logged_in' not in session:
@@ -563,15 +521,13 @@ def update_team_leader():
         team_id = int(request.form.get('team_id'))
         leader_name = request.form.get('leader_name', '').strip()
         
-        teams_data = load_json(TEAMS_FILE)
-        team = next((t for t in teams_data['teams'] if t['id'] == team_id), None)
+        team = event_store.get('teams', team_id)
         
         if not team:
             flash('팀을 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin'))
         
-        team['leader_name'] = leader_name
-        save_json(TEAMS_FILE, teams_data)
+        event_store.commit(update('teams', team_id, leader_name=leader_name))
         
         flash(f'{team["name"]}의 조장이 {leader_name or "미설정"}으로 변경되었습니다.', 'success')
         return redirect(url_for('admin'))
@@ -600,6 +556,7 @@ def view_data():
                          other_requests=other_requests_data.get('other_requests', []))
 
 @app.route('/reset_database', methods=['POST'])
+@storage.exclusive
 def reset_database():
     """데이터베이스 초기화"""
     if 'admin_logged_in' not in session:
@@ -0,0 +1,81 @@
+"""
+SQLite 성능 모드 (WAL, PRAGMA, 잠금 재시도)
+
+로컬/단일 서버에서 SQLite 파일 DB 를 여러 gunicorn 워커가 함께 쓸 때를 위한 설정입니다.
+- 연결마다 PRAGMA 적용: journal_mode=WAL(읽기가 쓰기를 기다리지 않음), synchronous=NORMAL(WAL 에서 안전한 수준),
+  busy_timeout(잠금을 바로 실패하지 않고 기다림), mmap_size, cache_size
+- 그래도 "database is locked" 로 실패한 쓰기 요청은 롤백 후 지수 백오프(+지터)로 라우트를 다시 실행
+환경 변수: SQLITE_TUNING=0 이면 PRAGMA 를 바꾸지 않음, 각 값은 SQLITE_* 로 조정
+"""
+
+import functools
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked', 'database schema is locked')
+
+
+def sqlite_pragmas(env=os.environ):
+    """적용할 [(PRAGMA 이름, 값)] - SQLITE_TUNING=0 이면 빈 목록"""
+    if env.get('SQLITE_TUNING', '1') != '1':
+        return []
+    return [
+        ('journal_mode', env.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', env.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', int(env.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))),
+        ('mmap_size', int(env.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))),
+        ('cache_size', int(env.get('SQLITE_CACHE_SIZE', '-20000'))),  # 음수는 KiB 단위 (약 20MB)
+    ]
+
+
+def install_pragmas(pragmas):
+    """새 SQLite 연결마다 PRAGMA 실행 (다른 DB 연결은 건드리지 않음)"""
+    if not pragmas:
+        return
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    event.listen(Engine, 'connect', apply_pragmas)
+
+
+def is_locked_error(error):
+    return isinstance(error, OperationalError) and any(message in str(error.orig) for message in LOCKED_MESSAGES)
+
+
+def retry_locked(view, rollback, retries=3, base_delay=0.05, on_retry=None):
+    """잠금 오류면 rollback() 후 base_delay × 2^n (×0.5~1.5 지터) 만큼 쉬고 view 를 최대 retries 번 다시 실행"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return view(*args, **kwargs)
+            except OperationalError as e:
+                if not is_locked_error(e) or attempt >= retries:
+                    raise
+                rollback()
+                attempt += 1
+                delay = base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning(f"⏳ SQLite 잠금 - {delay * 1000:.0f}ms 뒤 다시 시도 ({attempt}/{retries})",
+                               extra={'retry_attempt': attempt, 'retry_delay_ms': round(delay * 1000, 1)})
+                if on_retry:
+                    on_retry(attempt)
+                time.sleep(delay)
+    return wrapper
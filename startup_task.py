@@ -0,0 +1,132 @@
+"""
+부팅 작업 (GitHub 복원 등)을 백그라운드에서 실행
+
+서버는 바로 요청을 받고, 복원이 끝날 때까지는 "warming"(읽기 전용) 상태로 응답합니다.
+상태: idle(시작 전) → warming(실행 중) → ready(완료) 또는 failed(예외)
+단계별 소요 시간(stages)을 기록해 /health 에서 보여줍니다.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTask:
+    """부팅 작업을 한 번 실행하고 진행 상태를 보관"""
+
+    def __init__(self, func, name='startup'):
+        self.func = func
+        self.name = name
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        # 상태 정보
+        self.state = 'idle'
+        self.stage = None
+        self.stages = {}
+        self.schema_ready = False
+        self.started_at = None
+        self.finished_at = None
+        self.duration = None
+        self.error = None
+        self._started = None
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    @property
+    def done(self):
+        """끝났는지 (성공/실패 모두)"""
+        return self.state in ('ready', 'failed')
+
+    def start(self):
+        """백그라운드 스레드로 실행 (프로세스별로 한 번만, 이미 시작했으면 아무 것도 안 함)"""
+        if self._pid == os.getpid():
+            return False
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            self._reset()
+            self._pid = os.getpid()
+            self._begin()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            return True
+
+    def run(self):
+        """현재 스레드에서 바로 실행 (기존처럼 부팅을 막는 방식)"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return self.ready
+            self._reset()
+            self._pid = os.getpid()
+            self._begin()
+        self._run()
+        return self.ready
+
+    def wait(self, timeout=None):
+        """끝날 때까지 기다림 (시간 안에 끝나면 True)"""
+        return self._done.wait(timeout)
+
+    def mark(self, stage):
+        """단계 하나가 끝났음을 기록 (부팅 작업 안에서 호출, 시작 후 경과 초)"""
+        if self._started is None:
+            return
+        self.stages[stage] = round(time.perf_counter() - self._started, 3)
+        self.stage = stage
+        if stage == 'schema':
+            self.schema_ready = True
+
+    def status(self):
+        """/health 용 상태 dict"""
+        elapsed = self.duration
+        if elapsed is None and self._started is not None:
+            elapsed = round(time.perf_counter() - self._started, 3)
+        return {
+            'state': self.state,
+            'stage': self.stage,
+            'stages': dict(self.stages),
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M:%S') if self.finished_at else None,
+            'seconds': elapsed,
+            'error': self.error,
+        }
+
+    # 내부
+    def _reset(self):
+        # fork 된 자식은 부모의 진행 상태를 물려받지 않고 처음부터 다시 실행
+        self._done = threading.Event()
+        self.stage = None
+        self.stages = {}
+        self.schema_ready = False
+        self.finished_at = None
+        self.duration = None
+        self.error = None
+
+    def _begin(self):
+        self.state = 'warming'
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+
+    def _run(self):
+        try:
+            self.func(self)
+            self.state = 'ready'
+        except Exception as e:
+            self.error = str(e)
+            self.state = 'failed'
+            logger.exception(f"❌ 부팅 작업 실패: {e}")
+        finally:
+            self.schema_ready = True
+            self.duration = round(time.perf_counter() - self._started, 3)
+            self.finished_at = datetime.now()
+            self._done.set()
+            logger.info(f"⏱️ 부팅 작업 {self.state} ({self.duration:.2f}초)",
+                        extra={'startup_state': self.state, 'seconds': self.duration, 'stages': dict(self.stages)})